@@ -0,0 +1,137 @@
+"""
+Microbenchmark de serialización de listados grandes (services/serialization.py).
+
+Monta una app FastAPI mínima con los mismos modelos de respuesta que main.py y
+sirve N filas en memoria (sin DynamoDB) por dos caminos:
+  - estándar: response_model + JSONResponse (y, en /student/tasks, los modelos
+    intermedios TaskInDB/StudentTask que construía el endpoint);
+  - rápido: trusted_response (recorte a los campos del modelo + FastJSONResponse).
+Las peticiones pasan por httpx.ASGITransport, así que se mide también el trabajo
+del framework. Se informa del tiempo por respuesta y por item.
+
+Uso (desde la raíz del repositorio):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_serialization [--rows 10000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+
+from models.schemas import UserForList, Subject, TaskInDB, StudentTask, SubmissionInDB, SubmissionStatus
+from services import serialization
+from services.storage import parse_task_dates
+
+
+def build_rows(rows: int):
+    now = datetime.utcnow()
+    users = [{"user_id": f"user-{i}", "nombre": f"Estudiante {i}", "rol": "estudiante", "ultimo_acceso": Decimal(i)} for i in range(rows)]
+    subjects = [{"subject_id": f"subject-{i}", "nombre_materia": f"Materia {i}", "descripcion": "Descripción de prueba",
+                 "teacher_id": f"teacher-{i % 50}"} for i in range(rows)]
+    board_entries = []
+    for i in range(rows):
+        entry = {"task_id": f"task-{i}", "subject_id": f"subject-{i % 40}", "titulo": f"Tarea {i}",
+                 "fecha_creacion": (now - timedelta(days=20)).isoformat(),
+                 "fecha_entrega": (now + timedelta(days=i % 30 - 15)).isoformat(),
+                 "fecha_caducidad": (now + timedelta(days=i % 30 - 8)).isoformat()}
+        if i % 2:
+            entry["submission"] = {"submission_id": f"sub-{i}", "task_id": f"task-{i}", "user_id": "user-1",
+                                   "subject_id": entry["subject_id"], "fecha_entrega": now.isoformat(),
+                                   "s3_object_name": f"entregas/{i}.pdf", "s3_object_names": [f"entregas/{i}.pdf"]}
+        board_entries.append(entry)
+    return users, subjects, board_entries
+
+
+def status_for(task, submitted, now):
+    if submitted:
+        return SubmissionStatus.entregado
+    return SubmissionStatus.pendiente if now <= task["fecha_entrega"] else SubmissionStatus.caducado
+
+
+def build_app(users, subjects, board_entries):
+    app = FastAPI()
+
+    @app.get("/standard/users", response_model=List[UserForList])
+    def standard_users():
+        return users
+
+    @app.get("/fast/users", response_model=List[UserForList])
+    def fast_users():
+        return serialization.trusted_response(users, UserForList)
+
+    @app.get("/standard/subjects", response_model=List[Subject])
+    def standard_subjects():
+        return subjects
+
+    @app.get("/fast/subjects", response_model=List[Subject])
+    def fast_subjects():
+        return serialization.trusted_response(subjects, Subject)
+
+    @app.get("/standard/student-tasks", response_model=List[StudentTask])
+    def standard_student_tasks():
+        now = datetime.utcnow()
+        result = []
+        for entry in board_entries:
+            task = TaskInDB(**parse_task_dates(dict(entry)))
+            submission = entry.get("submission")
+            status = status_for(task.dict(), submission is not None, now)
+            result.append(StudentTask(**task.dict(), status=status, submission=submission))
+        return result
+
+    @app.get("/fast/student-tasks", response_model=List[StudentTask])
+    def fast_student_tasks():
+        now = datetime.utcnow()
+        result = []
+        for entry in board_entries:
+            task = parse_task_dates(dict(entry))
+            submission = entry.get("submission")
+            task["status"] = status_for(task, submission is not None, now)
+            task["submission"] = serialization.shape(SubmissionInDB, submission) if submission else None
+            result.append(task)
+        return serialization.trusted_response(result, StudentTask)
+
+    return app
+
+
+async def measure(client, path, repeat):
+    await client.get(path) # Calentamiento
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(path)
+        durations.append(time.perf_counter() - started)
+        response.raise_for_status()
+    durations.sort()
+    return durations[len(durations) // 2], len(response.content)
+
+
+async def run(args):
+    import httpx
+
+    serialization.FAST_RESPONSES = True # trusted_response lee el indicador en cada llamada
+    app = build_app(*build_rows(args.rows))
+    transport = httpx.ASGITransport(app=app)
+    print(f"{args.rows} filas por respuesta, mediana de {args.repeat} repeticiones "
+          f"(orjson {'disponible' if serialization.orjson else 'NO instalado: se usa json'})")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("users", "subjects", "student-tasks"):
+            standard, standard_size = await measure(client, f"/standard/{name}", args.repeat)
+            fast, fast_size = await measure(client, f"/fast/{name}", args.repeat)
+            print(f"  {name:<14} estándar {standard * 1000:8.1f} ms ({standard / args.rows * 1e6:6.2f} µs/item, {standard_size} B)"
+                  f" | rápido {fast * 1000:8.1f} ms ({fast / args.rows * 1e6:6.2f} µs/item, {fast_size} B)"
+                  f" | x{standard / fast:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark de arranque: tiempo de importación de la app y tiempo hasta la primera petición.
+
+Cada medida se toma en un proceso nuevo, como en un contenedor recién lanzado:
+  - importación: `python -X importtime -c "import main"`; se informa del total y
+    de los módulos más caros (acumulado y propio);
+  - primera petición: importar main y servir GET /users por httpx.ASGITransport,
+    en frío (los clientes se crean dentro de la petición) y tras services/storage.py
+    prewarm() (lo que hace el arranque de main.py en segundo plano).
+Con el mock en memoria (moto) el mock se arranca antes de medir, así que no cuenta.
+
+benchmarks/startup_baseline.json guarda una ejecución de referencia; por defecto
+se compara con ella y el proceso termina con código 1 si alguna medida empeora
+más de --tolerance y de --min-delta-ms (las medidas de pocos milisegundos son ruidosas).
+
+Uso (desde la raíz del repositorio):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_startup [--repeat 5] [--backend sqlite]
+    python -m benchmarks.bench_startup --write-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+_PROJECT_PREFIXES = ("main", "services", "models", "core")
+
+# Se ejecuta en el proceso hijo: imprime un JSON con los tiempos en segundos
+_FIRST_REQUEST_SCRIPT = """
+import asyncio, json, os, sys, time
+if os.environ.get("MINIMOODLE_STORAGE_STANDIN") == "moto":
+    from services.local_standin import start_local_standin
+    start_local_standin()
+started = time.perf_counter()
+import httpx
+import main
+from services import storage
+timings = {"import": time.perf_counter() - started}
+if sys.argv[1] == "prewarm":
+    timings["prewarm"] = storage.prewarm()
+
+async def run():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("first_request", "second_request"):
+            t = time.perf_counter()
+            response = await client.get("/users")
+            response.raise_for_status()
+            timings[name] = time.perf_counter() - t
+
+asyncio.run(run())
+print(json.dumps(timings))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Procesos por medida (se usa la mediana)")
+    parser.add_argument("--backend", choices=("dynamodb", "sqlite"), default="dynamodb",
+                        help="dynamodb usa el mock en memoria (moto)")
+    parser.add_argument("--top", type=int, default=15, help="Módulos a mostrar en el perfil de importación")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento relativo admitido frente a la referencia")
+    parser.add_argument("--min-delta-ms", type=float, default=10, help="Empeoramiento absoluto mínimo para contar como regresión")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--write-baseline", action="store_true", help="Guarda esta ejecución como referencia")
+    return parser.parse_args()
+
+
+def child_environment(args, directory: str):
+    env = dict(os.environ, PYTHONPATH=ROOT, MINIMOODLE_STARTUP_PREWARM="0")
+    if args.backend == "sqlite":
+        env.update(
+            MINIMOODLE_STORAGE_BACKEND="sqlite",
+            MINIMOODLE_SQLITE_PATH=os.path.join(directory, "startup.db"),
+            MINIMOODLE_OBJECT_STORE_PATH=os.path.join(directory, "objects"),
+        )
+    else:
+        env["MINIMOODLE_STORAGE_STANDIN"] = "moto"
+        for variable in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+            env.setdefault(variable, "standin")
+    return env
+
+
+# --- Perfil de importación ---
+def import_profile(env):
+    """Ejecuta `-X importtime` una vez. Devuelve {módulo: (propio_us, acumulado_us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def summarize_imports(profiles: list, top: int):
+    names = set.intersection(*(set(profile) for profile in profiles))
+    median = {
+        name: (statistics.median(p[name][0] for p in profiles), statistics.median(p[name][1] for p in profiles))
+        for name in names
+    }
+    by_cumulative = sorted(median.items(), key=lambda item: item[1][1], reverse=True)
+    by_self = sorted(median.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "total_ms": median["main"][1] / 1000,
+        "project_ms": {
+            name: round(cumulative / 1000, 2) for name, (_, cumulative) in by_cumulative
+            if name.split(".")[0] in _PROJECT_PREFIXES
+        },
+        "top_cumulative_ms": {name: round(cumulative / 1000, 2) for name, (_, cumulative) in by_cumulative[:top]},
+        "top_self_ms": {name: round(own / 1000, 2) for name, (own, _) in by_self[:top]},
+    }
+
+
+# --- Primera petición ---
+def first_request(env, mode: str):
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_REQUEST_SCRIPT, mode],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize_requests(runs: list):
+    return {name: round(statistics.median(run[name] for run in runs) * 1000, 2) for name in runs[0] if runs[0][name] is not None}
+
+
+# --- Comparación ---
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float):
+    """Imprime las diferencias con la referencia y devuelve las medidas que empeoran más de lo admitido."""
+    checks = [("importación total", results["imports"]["total_ms"], baseline["imports"]["total_ms"])]
+    for mode in ("cold", "prewarmed"):
+        for name, value in results["requests"][mode].items():
+            reference = baseline["requests"].get(mode, {}).get(name)
+            if reference:
+                checks.append((f"{mode}.{name}", value, reference))
+    regressions = []
+    print(f"\n{'medida':<32}{'referencia':>12}{'actual':>12}{'cambio':>10}")
+    for name, value, reference in checks:
+        change = (value - reference) / reference
+        regressed = change > tolerance and value - reference > min_delta_ms
+        marker = "  <-- empeora" if regressed else ""
+        print(f"{name:<32}{reference:>10.1f}ms{value:>10.1f}ms{change:>+10.0%}{marker}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="minimoodle-startup-") as directory:
+        env = child_environment(args, directory)
+        profiles = [import_profile(env) for _ in range(args.repeat)]
+        cold = [first_request(env, "cold") for _ in range(args.repeat)]
+        prewarmed = [first_request(env, "prewarm") for _ in range(args.repeat)]
+
+    results = {
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "repeat": args.repeat,
+        "imports": summarize_imports(profiles, args.top),
+        "requests": {"cold": summarize_requests(cold), "prewarmed": summarize_requests(prewarmed)},
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.write_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nReferencia guardada en {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo hay referencia en {args.baseline} (usa --write-baseline)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("backend") != args.backend:
+        print(f"\nLa referencia es del backend {baseline.get('backend')}; no se compara")
+        return 0
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Microbenchmark de la caché de tokens verificados (services/auth.py).
+
+Compara, por petición, el coste de verificar el JWT desde cero (HMAC + TokenData)
+con el de resolverlo desde la caché. Se incluye el caso antiguo de doble
+verificación (role_checker + current_user) como referencia.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_token_cache [--iterations 20000]
+"""
+import argparse
+import timeit
+from datetime import timedelta
+
+from services.auth import create_access_token, decode_token, verify_token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "bench-user", "rol": "estudiante"}, expires_delta=timedelta(minutes=60))
+    verify_token(token) # Calienta la caché
+
+    cases = {
+        "sin caché, 2 decodificaciones/petición": lambda: (decode_token(token), decode_token(token)),
+        "sin caché, 1 decodificación/petición": lambda: decode_token(token),
+        "con caché (acierto)": lambda: verify_token(token),
+    }
+    baseline = None
+    for name, func in cases.items():
+        per_call = min(timeit.repeat(func, number=args.iterations, repeat=3)) / args.iterations
+        baseline = baseline or per_call
+        print(f"{name:<40} {per_call * 1e6:9.2f} µs/petición  (x{baseline / per_call:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Benchmark reproducible de la API sobre un sustituto local de DynamoDB/S3.
+
+Siembra un conjunto de datos sintético de tamaño configurable, ejecuta la app
+ASGI en el mismo proceso (sin red) y mide, por endpoint, latencia p50/p99,
+rendimiento y llamadas a AWS por petición (leídas de la cabecera Server-Timing).
+Los resultados se guardan en JSON para compararlos entre commits.
+
+Por defecto usa el mock en memoria (moto). Con --endpoint-url apunta a un
+DynamoDB Local/LocalStack cuyas tablas se crean con services/tables.py, y con
+--backend sqlite mide el backend embebido (services/backends/sqlite.py) sobre una
+base de datos temporal.
+
+Uso (desde la raíz del repositorio):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.run_benchmarks --scale small
+    python -m benchmarks.run_benchmarks --students 20000 --subjects 400 --tasks-per-subject 30 \\
+        --endpoint-url http://localhost:8000
+    python -m benchmarks.run_benchmarks --scale small --backend sqlite
+    python -m benchmarks.run_benchmarks --scale small --compare benchmarks/results/<anterior>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCALES = {
+    "small": dict(students=2000, subjects=40, tasks_per_subject=10, subjects_per_student=4),
+    "medium": dict(students=5000, subjects=100, tasks_per_subject=20, subjects_per_student=6),
+    "full": dict(students=20000, subjects=400, tasks_per_subject=30, subjects_per_student=6),
+}
+ENDPOINTS = ("student_tasks", "teacher_submissions", "users", "login")
+_CALLS_RE = re.compile(r'^(\w+);dur=([\d.]+);desc="(\d+) llamadas')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small", help="Tamaño predefinido del conjunto de datos")
+    parser.add_argument("--students", type=int)
+    parser.add_argument("--subjects", type=int)
+    parser.add_argument("--tasks-per-subject", type=int)
+    parser.add_argument("--subjects-per-student", type=int)
+    parser.add_argument("--submission-rate", type=float, default=0.6, help="Fracción de tareas ya entregadas")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users-limit", type=int, help="Si se indica, GET /users pide páginas de este tamaño")
+    parser.add_argument("--endpoint-url", help="DynamoDB/S3 local en lugar del mock en memoria")
+    parser.add_argument("--backend", choices=("dynamodb", "sqlite"), default="dynamodb", help="Backend de tablas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto benchmarks/results/<commit>-<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+    for name, value in SCALES[args.scale].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    return args
+
+
+def configure_environment(args):
+    """Debe ejecutarse antes de importar la app: services/storage.py lee la configuración al importarse."""
+    if args.backend == "sqlite":
+        directory = tempfile.mkdtemp(prefix="minimoodle-bench-")
+        os.environ["MINIMOODLE_STORAGE_BACKEND"] = "sqlite"
+        os.environ["MINIMOODLE_SQLITE_PATH"] = os.path.join(directory, "bench.db")
+        os.environ["MINIMOODLE_OBJECT_STORE_PATH"] = os.path.join(directory, "objects")
+    elif args.endpoint_url:
+        os.environ["MINIMOODLE_AWS_ENDPOINT_URL"] = args.endpoint_url
+        for variable in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+            os.environ.setdefault(variable, "local")
+    else:
+        os.environ["MINIMOODLE_STORAGE_STANDIN"] = "moto"
+
+
+# --- Datos sintéticos ---
+def seed_dataset(args):
+    """Genera y escribe el conjunto de datos con BatchWriteItem. Devuelve los ids necesarios para las peticiones."""
+    from services.storage import batch_write_items, get_backend, to_epoch
+    from services.projections import board_item
+    from services.tables import create_tables
+    from core.config import (
+        DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS, DYNAMODB_TABLE_TASKS,
+        DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS, DYNAMODB_TABLE_TASK_BOARDS
+    )
+    if args.endpoint_url and get_backend().name == "dynamodb":
+        create_tables(get_backend().resource.meta.client)
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    teachers = [f"bench-teacher-{i}" for i in range(max(1, args.subjects // 4))]
+    students = [f"bench-student-{i}" for i in range(args.students)]
+    users = [{"user_id": t, "nombre": f"Docente {i}", "rol": "docente"} for i, t in enumerate(teachers)]
+    users += [{"user_id": s, "nombre": f"Estudiante {i}", "rol": "estudiante"} for i, s in enumerate(students)]
+    users.append({"user_id": "bench-admin", "nombre": "Admin", "rol": "administrador"})
+
+    subjects, tasks, tasks_by_subject = [], [], {}
+    for i in range(args.subjects):
+        subject_id = f"bench-subject-{i}"
+        subjects.append({"subject_id": subject_id, "teacher_id": teachers[i % len(teachers)],
+                         "nombre_materia": f"Materia {i}", "descripcion": "Benchmark"})
+        for j in range(args.tasks_per_subject):
+            entrega = now + timedelta(days=rng.randint(-30, 30))
+            task_id = f"bench-task-{i}-{j}"
+            tasks.append({"task_id": task_id, "subject_id": subject_id, "titulo": f"Tarea {j}",
+                          "fecha_creacion": to_epoch(entrega - timedelta(days=14)),
+                          "fecha_entrega": to_epoch(entrega),
+                          "fecha_caducidad": to_epoch(entrega + timedelta(days=7))})
+            tasks_by_subject.setdefault(subject_id, []).append(tasks[-1])
+
+    # Los tableros (services/projections.py) se construyen en memoria junto con el resto de datos
+    enrollments, submissions, boards = [], [], []
+    for student in students:
+        for subject in rng.sample(subjects, min(args.subjects_per_student, len(subjects))):
+            enrollments.append({"subject_id": subject["subject_id"], "user_id": student})
+            submissions_by_task = {}
+            for task in tasks_by_subject[subject["subject_id"]]:
+                task_id = task["task_id"]
+                if rng.random() < args.submission_rate:
+                    submissions_by_task[task_id] = {
+                        "submission_id": f"bench-sub-{student}-{task_id}", "task_id": task_id,
+                        "user_id": student, "subject_id": subject["subject_id"],
+                        "fecha_entrega": now.isoformat(),
+                        "s3_object_name": f"entregas/{subject['subject_id']}/{task_id}/{student}/entrega.pdf",
+                    }
+            submissions.extend(submissions_by_task.values())
+            boards.append(board_item(student, subject["subject_id"], tasks_by_subject[subject["subject_id"]], submissions_by_task))
+
+    started = time.perf_counter()
+    for table_name, items in ((DYNAMODB_TABLE_USERS, users), (DYNAMODB_TABLE_SUBJECTS, subjects),
+                              (DYNAMODB_TABLE_TASKS, tasks), (DYNAMODB_TABLE_ENROLLMENTS, enrollments),
+                              (DYNAMODB_TABLE_SUBMISSIONS, submissions), (DYNAMODB_TABLE_TASK_BOARDS, boards)):
+        failed = batch_write_items(table_name, items=items)
+        print(f"  {table_name}: {len(items) - len(failed)} items", file=sys.stderr)
+    print(f"  siembra completada en {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {
+        "students": students,
+        "tasks": [(t["task_id"], subjects[int(t["subject_id"].rsplit("-", 1)[1])]["teacher_id"]) for t in tasks],
+        "sizes": {"users": len(users), "subjects": len(subjects), "tasks": len(tasks),
+                  "enrollments": len(enrollments), "submissions": len(submissions)},
+    }
+
+
+# --- Generación de peticiones ---
+def build_requests(endpoint, dataset, args, rng):
+    from services.auth import create_access_token
+
+    def bearer(user_id, rol):
+        return {"Authorization": "Bearer " + create_access_token({"sub": user_id, "rol": rol}, expires_delta=timedelta(hours=1))}
+
+    requests = []
+    for _ in range(args.requests):
+        if endpoint == "student_tasks":
+            requests.append(("GET", "/student/tasks", bearer(rng.choice(dataset["students"]), "estudiante"), None))
+        elif endpoint == "teacher_submissions":
+            task_id, teacher_id = rng.choice(dataset["tasks"])
+            requests.append(("GET", f"/teacher/tasks/{task_id}/submissions", bearer(teacher_id, "docente"), None))
+        elif endpoint == "users":
+            path = f"/users?limit={args.users_limit}" if args.users_limit else "/users"
+            requests.append(("GET", path, {}, None))
+        elif endpoint == "login":
+            requests.append(("POST", "/login/select-user", {}, {"user_id": rng.choice(dataset["students"])}))
+    return requests
+
+
+def storage_calls(server_timing: str):
+    """Número de llamadas a AWS declaradas en la cabecera Server-Timing."""
+    calls = 0
+    for entry in (server_timing or "").split(", "):
+        match = _CALLS_RE.match(entry)
+        if match:
+            calls += int(match.group(3))
+    return calls
+
+
+async def run_endpoint(client, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, calls, errors = [], [], 0
+
+    async def one(method, path, headers, body):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, path, headers=headers, json=body)
+            latencies.append(time.perf_counter() - started)
+            calls.append(storage_calls(response.headers.get("server-timing")))
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "throughput_rps": round(len(requests) / elapsed, 1),
+        "storage_calls_per_request": round(statistics.mean(calls), 2),
+    }
+
+
+async def run_all(args, dataset):
+    import httpx
+    from main import app
+
+    rng = random.Random(args.seed + 1)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in ENDPOINTS:
+            requests = build_requests(endpoint, dataset, args, rng)
+            await run_endpoint(client, requests[: max(1, len(requests) // 10)], args.concurrency) # Calentamiento
+            results[endpoint] = await run_endpoint(client, requests, args.concurrency)
+            print(f"  {endpoint:<22} {results[endpoint]}", file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def compare(current, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nComparación con {previous['commit']} ({previous_path}):")
+    for endpoint, metrics in current["results"].items():
+        before = previous["results"].get(endpoint)
+        if not before:
+            continue
+        deltas = []
+        for metric in ("p50_ms", "p99_ms", "throughput_rps", "storage_calls_per_request"):
+            if before.get(metric):
+                change = (metrics[metric] - before[metric]) / before[metric] * 100
+                deltas.append(f"{metric} {before[metric]} -> {metrics[metric]} ({change:+.1f}%)")
+        print(f"  {endpoint:<22} " + "; ".join(deltas))
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    sys.path.insert(0, os.getcwd())
+
+    print("Sembrando datos...", file=sys.stderr)
+    dataset = seed_dataset(args)
+    print("Ejecutando peticiones...", file=sys.stderr)
+    results = asyncio.run(run_all(args, dataset))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "backend": "sqlite" if args.backend == "sqlite" else args.endpoint_url or "moto",
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "dataset": dataset["sizes"],
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"{report['commit']}-{datetime.utcnow():%Y%m%d%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"\nResultados guardados en {output}", file=sys.stderr)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,95 @@ import os
 SECRET_KEY = "tu-super-secreto-string-aleatorio-diferente"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+TOKEN_CACHE_MAXSIZE = 10000 # Tokens JWT ya verificados que se mantienen en memoria
 AWS_REGION = "us-east-1"
+# Entornos locales: endpoint alternativo (DynamoDB Local, LocalStack...) o "moto" para un mock en memoria
+AWS_ENDPOINT_URL = os.getenv("MINIMOODLE_AWS_ENDPOINT_URL") or None
+STORAGE_STANDIN = os.getenv("MINIMOODLE_STORAGE_STANDIN", "")
+# Backend de tablas: "dynamodb" o "sqlite" (embebido, para despliegues de un solo nodo)
+STORAGE_BACKEND = os.getenv("MINIMOODLE_STORAGE_BACKEND", "dynamodb")
+SQLITE_PATH = os.getenv("MINIMOODLE_SQLITE_PATH", "minimoodle.db")
+# Almacén de archivos: "s3" o "filesystem" (por defecto, filesystem junto a sqlite)
+OBJECT_STORE = os.getenv("MINIMOODLE_OBJECT_STORE", "filesystem" if STORAGE_BACKEND == "sqlite" else "s3")
+OBJECT_STORE_PATH = os.getenv("MINIMOODLE_OBJECT_STORE_PATH", "minimoodle-objects")
+OBJECT_STORE_BASE_URL = os.getenv("MINIMOODLE_OBJECT_STORE_BASE_URL", "http://localhost:8000") # URL pública de esta API
 DYNAMODB_TABLE_USERS = "Minimoodle-Usuarios"
 DYNAMODB_TABLE_SUBJECTS = "Minimoodle-Materias"
 DYNAMODB_TABLE_TASKS = "Minimoodle-Tareas"
 DYNAMODB_TABLE_ENROLLMENTS = "Minimoodle-Inscripciones"
 DYNAMODB_TABLE_SUBMISSIONS = "Minimoodle-Submissions"
+DYNAMODB_TABLE_TASK_BOARDS = "Minimoodle-TableroEstudiante" # Proyección por (estudiante, materia)
+DYNAMODB_TABLE_VERSIONS = "Minimoodle-Versiones" # Sellos de versión para los ETag (services/versions.py)
 S3_BUCKET_TASKS = "mini-moodle-backend"
+S3_DELETE_MAX_KEYS = 1000 # Límite de DeleteObjects
+UPLOAD_BATCH_MAX_FILES = 50 # Archivos por petición en POST /tasks/{task_id}/upload-urls
+
+# Subidas multiparte (POST /tasks/{task_id}/multipart-uploads)
+MULTIPART_PART_SIZE_MIN = 5 * 1024 * 1024 # Límite de S3 para todas las partes salvo la última
+MULTIPART_PART_SIZE = 8 * 1024 * 1024 # Tamaño base; crece para no pasar de MULTIPART_MAX_PARTS
+MULTIPART_MAX_PARTS = 10000 # Límite de S3
+MULTIPART_MAX_FILE_SIZE = 5 * 1024 ** 4 # 5 TiB, límite de S3
+MULTIPART_URLS_PER_REQUEST = 1000 # URLs de partes firmadas por petición
+MULTIPART_URL_EXPIRATION = 24 * 3600 # segundos
+
+# Flujos Server-Sent Events (services/events.py)
+SSE_QUEUE_SIZE = 100 # Eventos pendientes por cliente antes de reenviarle el estado completo
+SSE_HEARTBEAT_SECONDS = 15 # Comentario periódico para que los proxies no cierren la conexión
+
+# Descarga en ZIP de las entregas de una tarea (services/archive.py)
+ARCHIVE_PREFETCH_WINDOW = 8 # Objetos que se piden por adelantado mientras se escribe el actual
+ARCHIVE_CHUNK_SIZE = 1024 * 1024 # Bloque de lectura de cada objeto y de envío de la respuesta
+ARCHIVE_COMPRESSLEVEL = 1 # Deflate rápido: la mayoría de las entregas (PDF, imágenes) ya van comprimidas
+
+# Lecturas y escrituras por lotes (BatchGetItem admite como máximo 100 claves por llamada)
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_ITEMS = 25 # Límite de BatchWriteItem
+BATCH_MAX_RETRIES = 5
+BATCH_MAX_WORKERS = 8
+BATCH_RETRY_BASE_DELAY = 0.05 # segundos; se duplica en cada reintento
+
+# Paginación de los endpoints de listado (?limit=&cursor=)
+PAGE_DEFAULT_LIMIT = 100
+PAGE_MAX_LIMIT = 1000
+
+# Arranque: crear clientes y abrir conexiones en segundo plano antes de la primera petición
+STARTUP_PREWARM = os.getenv("MINIMOODLE_STARTUP_PREWARM", "1") == "1"
+
+# Capa de acceso asíncrona (services/async_storage.py): llamadas simultáneas a AWS
+ASYNC_STORAGE_MAX_CONCURRENCY = 32
+
+# Respuestas JSON con orjson y sin doble validación en los listados (services/serialization.py)
+FAST_RESPONSES = os.getenv("MINIMOODLE_FAST_RESPONSES", "") == "1"
+
+# ETag de GET /student/tasks: el estado de las tareas depende de la hora, así que
+# la etiqueta cambia al menos cada ETAG_TIME_BUCKET_SECONDS
+ETAG_TIME_BUCKET_SECONDS = 60
+
+# Caché de lectura en memoria (LRU + TTL) por tabla; TTL en segundos
+CACHE_USERS_MAXSIZE = 10000
+CACHE_USERS_TTL = 300
+CACHE_SUBJECTS_MAXSIZE = 2000
+CACHE_SUBJECTS_TTL = 60
+CACHE_TASKS_MAXSIZE = 20000
+CACHE_TASKS_TTL = 60
+
+# Importación masiva (services/bulk_import.py)
+IMPORT_MAX_WORKERS = 8
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# Copias completas de las tablas (services/snapshot.py)
+SNAPSHOT_DIR = os.getenv("MINIMOODLE_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_SEGMENTS = 8 # Segmentos de scan paralelo por tabla (TotalSegments)
+SNAPSHOT_WORKERS = 16 # Hilos compartidos por todos los segmentos de todas las tablas
+SNAPSHOT_RESTORE_BATCH = 1000 # Items por llamada a batch_write_items al restaurar
+
+# Perfilado de peticiones (services/profiling.py)
+PROFILE_TOKEN = os.getenv("MINIMOODLE_PROFILE_TOKEN", "") # Valor de la cabecera X-Debug-Profile; vacío = desactivada
+PROFILE_SAMPLE_RATE = float(os.getenv("MINIMOODLE_PROFILE_SAMPLE_RATE", "0")) # Fracción de peticiones perfiladas al azar
+PROFILE_INTERVAL_SECONDS = 0.005
+PROFILE_DIR = os.getenv("MINIMOODLE_PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = 200 # Perfiles conservados en disco (los más antiguos se borran)
+
+# Trabajos en segundo plano (services/jobs.py)
+JOBS_MAX_WORKERS = 4
+JOBS_MAX_KEPT = 500 # Trabajos terminados que se conservan para consultar su estado
@@ -1,16 +1,72 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from boto3.dynamodb.conditions import Key
+import asyncio
+from contextlib import asynccontextmanager
+import csv
+import io
+import json
+import os
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
 # Importaciones de nuestro proyecto
-from models.schemas import *
+from models.schemas import (
+    BatchUploadURLRequest, Enrollment, FileName, ImportKind, JobInfo, MultipartCompleteRequest, MultipartPartURLsRequest,
+    MultipartUploadRequest, Role, StudentTask, Subject, SubmissionInDB, SubmissionStatus, TaskCreate, TaskInDB,
+    TeacherSubmissionView, Token, TokenData, UploadURLRequest, UserCreate, UserForList, UserInDB, UserSelect
+)
+from services.archive import iter_zip, task_archive_entries
 from services.auth import create_access_token, role_checker, get_current_user
-from services.storage import *
-from core.config import *
+from services import events
+from services.bulk_import import import_stream, detect_format
+from services.cascade import delete_task_cascade, delete_subject_cascade
+from services.jobs import submit_job, get_job
+from services.metrics import MetricsMiddleware, render_prometheus
+from services import profiling
+from services.snapshot import export_snapshot, list_snapshots, restore_snapshot
+from services.serialization import FastJSONResponse, shape, trusted_response
+from services import singleflight
+from services.projections import (
+    get_student_boards, rebuild_board, rebuild_boards, add_task_to_boards,
+    set_board_submission, remove_board_submission
+)
+from services.versions import (
+    SCOPE_USERS, SCOPE_SUBJECTS, SCOPE_TASKS, enrollments_scope, submissions_scope,
+    bump, bumping, current_versions, etag_for, etag_matches
+)
+from services.storage import (
+    cache_stats, get_object_store, iter_query_pages, multipart_plan, parse_task_dates, prewarm, submission_id_for,
+    submission_object_names, task_to_item
+)
+from services import async_storage as db
+from core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES, DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS, DYNAMODB_TABLE_TASKS,
+    DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS, S3_BUCKET_TASKS, UPLOAD_BATCH_MAX_FILES,
+    PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, FAST_RESPONSES, STARTUP_PREWARM, ETAG_TIME_BUCKET_SECONDS,
+    MULTIPART_MAX_PARTS, MULTIPART_MAX_FILE_SIZE, MULTIPART_URLS_PER_REQUEST, SSE_HEARTBEAT_SECONDS, SNAPSHOT_DIR
+)
 
-app = FastAPI(title="Minimoodle API - Funcionalidad Completa")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Al arrancar lanza en segundo plano la creación de los clientes de almacenamiento
+    (services/storage.py, prewarm): el proceso acepta peticiones de inmediato y las
+    primeras no pagan la resolución de credenciales ni la apertura de conexiones.
+    """
+    if STARTUP_PREWARM:
+        app.state.prewarm = asyncio.create_task(db.run_sync(prewarm))
+    yield
+
+app = FastAPI(
+    title="Minimoodle API - Funcionalidad Completa",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if FAST_RESPONSES else JSONResponse,
+)
 
 # --- Configuración de CORS ---
 origins = [
@@ -24,18 +80,66 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag", "X-Profile-Id"],
 )
+# Llamadas a DynamoDB/S3 por petición: cabecera Server-Timing y /metrics
+app.add_middleware(MetricsMiddleware)
+# Perfilado por muestreo bajo demanda (cabecera X-Debug-Profile) o al azar: /admin/profiles
+app.add_middleware(profiling.ProfilingMiddleware)
+
 # --- Endpoints de Utilidad ---
 @app.get("/", status_code=status.HTTP_200_OK)
 def health_check(): return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+async def not_modified(request: Request, response: Response, scopes: list, *parts):
+    """
+    Fija en `response` el ETag del listado, calculado con los sellos de versión de
+    `scopes` (services/versions.py). Devuelve una respuesta 304 si el cliente ya
+    tiene esa versión (If-None-Match), o None si hay que generar el listado.
+    """
+    versions = await db.run_sync(current_versions, scopes)
+    if versions is None:
+        return None # Sin sellos no hay ETag: se responde siempre completo
+    headers = {
+        "ETag": etag_for(versions, request.url.path, request.url.query, FAST_RESPONSES, *parts),
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+async def list_table(table_name: str, response: Response, limit: Optional[int], cursor: Optional[str]):
+    """
+    Lista una tabla completa o, si se indica `limit`, una sola página.
+    El cursor para pedir la página siguiente se devuelve en la cabecera X-Next-Cursor.
+    """
+    if limit is None and cursor is None:
+        return await db.scan_items(table_name)
+    try:
+        items, next_cursor = await db.scan_page(table_name, limit or PAGE_DEFAULT_LIMIT, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido.")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
 # --- Endpoints de Autenticación ---
 @app.get("/users", response_model=List[UserForList])
-def get_user_list(): return scan_items(DYNAMODB_TABLE_USERS)
+async def get_user_list(request: Request, response: Response, limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT), cursor: Optional[str] = None):
+    cached = await not_modified(request, response, [SCOPE_USERS])
+    if cached:
+        return cached
+    return trusted_response(await list_table(DYNAMODB_TABLE_USERS, response, limit, cursor), UserForList, response)
 
 @app.post("/login/select-user", response_model=Token)
 async def login_via_selection(selected_user: UserSelect):
-    user_dict = get_item(DYNAMODB_TABLE_USERS, {'user_id': selected_user.user_id})
+    user_dict = await db.get_item(DYNAMODB_TABLE_USERS, {'user_id': selected_user.user_id})
     if not user_dict: raise HTTPException(status_code=404, detail="Usuario no encontrado")
     user = UserInDB(**user_dict)
     expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -43,38 +147,93 @@ async def login_via_selection(selected_user: UserSelect):
     return {"access_token": token, "token_type": "bearer"}
 
 # --- Endpoints de Estudiante ---
+def compute_task_status(fecha_entrega: datetime, fecha_caducidad: datetime, submitted: bool, now: datetime):
+    """Calcula el estado de una tarea para un estudiante en el instante `now`."""
+    if submitted:
+        return SubmissionStatus.entregado
+    if now > fecha_caducidad:
+        return SubmissionStatus.inactivo
+    if now > fecha_entrega:
+        return SubmissionStatus.caducado
+    return SubmissionStatus.pendiente
+
 @app.get("/student/tasks", response_model=List[StudentTask], dependencies=[Depends(role_checker([Role.student]))])
-def get_student_tasks(current_user: TokenData = Depends(get_current_user)):
-    student_subjects = get_student_subjects(current_user.user_id)
+async def get_student_tasks(request: Request, response: Response, current_user: TokenData = Depends(get_current_user)):
+    """
+    Devuelve todas las tareas de un estudiante, con su estado actual.
+    Lee los tableros materializados del estudiante (una query, ver
+    services/projections.py); solo el estado depende de la hora y se calcula aquí.
+    """
+    user_id = current_user.user_id
+    cached = await not_modified(
+        request, response, [SCOPE_TASKS, enrollments_scope(user_id), submissions_scope(user_id)],
+        user_id, int(time.time() // ETAG_TIME_BUCKET_SECONDS) # El estado cambia con la hora
+    )
+    if cached:
+        return cached
+    boards = await db.run_sync(get_student_boards, current_user.user_id)
     all_tasks = []
-    for enrollment in student_subjects:
-        subject_tasks = get_tasks_for_subject(enrollment['subject_id'])
-        for task_data in subject_tasks:
-            task = TaskInDB(**get_task_by_id_from_db(task_data['task_id']))
-            submission = get_submission(current_user.user_id, task.task_id)
-            
-            status = SubmissionStatus.pendiente
-            now = datetime.utcnow()
-            if submission:
-                status = SubmissionStatus.entregado
-            elif now > task.fecha_caducidad:
-                status = SubmissionStatus.inactivo
-            elif now > task.fecha_entrega:
-                status = SubmissionStatus.caducado
-
-            all_tasks.append(StudentTask(**task.dict(), status=status, submission=submission))
-    return all_tasks
+    now = datetime.utcnow()
+    for board in boards:
+        for entry in board['tasks'].values():
+            # Los datos del tablero ya tienen la forma de StudentTask: se completan sin copiar a modelos
+            task = parse_task_dates(dict(entry))
+            submission = entry.get('submission')
+            task['status'] = compute_task_status(task['fecha_entrega'], task['fecha_caducidad'], submission is not None, now)
+            task['submission'] = shape(SubmissionInDB, submission) if submission else None
+            all_tasks.append(task)
+    all_tasks.sort(key=lambda t: t['fecha_entrega'])
+    return trusted_response(all_tasks, StudentTask, response)
+
+async def _student_tasks_in_window(user_id: str, query, days: int):
+    """
+    Tareas de las materias del estudiante que devuelve `query` (una función de
+    rango de fechas de services/storage.py) para [ahora, ahora + days], con su estado.
+    """
+    now = datetime.utcnow()
+    until = now + timedelta(days=days)
+    enrollments, submissions = await asyncio.gather(
+        db.get_student_subjects(user_id),
+        db.get_submissions_for_student(user_id),
+    )
+    # Una query por materia con el rango de fechas resuelto en el GSI
+    tasks_per_subject = await asyncio.gather(*(query(en['subject_id'], now, until) for en in enrollments))
+    submissions_by_task = {s['task_id']: s for s in submissions}
+    result = []
+    for subject_tasks in tasks_per_subject:
+        for task in subject_tasks:
+            parse_task_dates(task)
+            submission = submissions_by_task.get(task['task_id'])
+            task['status'] = compute_task_status(task['fecha_entrega'], task['fecha_caducidad'], submission is not None, now)
+            task['submission'] = shape(SubmissionInDB, submission) if submission else None
+            result.append(task)
+    result.sort(key=lambda t: t['fecha_entrega'])
+    return result
+
+@app.get("/student/tasks/upcoming", response_model=List[StudentTask], dependencies=[Depends(role_checker([Role.student]))])
+async def get_student_upcoming_tasks(days: int = Query(7, ge=1, le=365), current_user: TokenData = Depends(get_current_user)):
+    """Tareas del estudiante cuya fecha de entrega cae en los próximos `days` días."""
+    return trusted_response(await _student_tasks_in_window(current_user.user_id, db.get_tasks_due_between, days), StudentTask)
+
+@app.get("/student/tasks/overdue", response_model=List[StudentTask], dependencies=[Depends(role_checker([Role.student]))])
+async def get_student_overdue_tasks(days: int = Query(7, ge=1, le=365), current_user: TokenData = Depends(get_current_user)):
+    """
+    Tareas atrasadas y sin entregar que aún admiten entrega tardía y cuya fecha
+    de caducidad cae en los próximos `days` días.
+    """
+    tasks = await _student_tasks_in_window(current_user.user_id, db.get_overdue_tasks_closing_between, days)
+    return trusted_response([task for task in tasks if task['submission'] is None], StudentTask)
 
 @app.post("/tasks/{file_name}/{task_id}/upload-url", 
             dependencies=[Depends(get_current_user)])
-def get_upload_url(task_id: str, file_name: str, request_body: UploadURLRequest, current_user: TokenData = Depends(get_current_user)):
+async def get_upload_url(task_id: str, file_name: FileName, request_body: UploadURLRequest, current_user: TokenData = Depends(get_current_user)):
     """
     Genera una URL segura para que CUALQUIER usuario autenticado suba un archivo.
     Ahora recibe el content_type desde el frontend.
     """
     
     # 1. Obtener la tarea de la base de datos
-    task = get_task_by_id_from_db(task_id)
+    task = await db.get_task_by_id_from_db(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Tarea no encontrada.")
 
@@ -82,195 +241,496 @@ def get_upload_url(task_id: str, file_name: str, request_body: UploadURLRequest,
     object_name = f"entregas/{task['subject_id']}/{task_id}/{current_user.user_id}/{file_name}"
     
     # 3. Pasar el content_type a la función de storage para que la firma sea correcta
-    url = create_presigned_url(S3_BUCKET_TASKS, object_name, content_type=request_body.content_type)
+    url = await db.create_presigned_url(S3_BUCKET_TASKS, object_name, content_type=request_body.content_type)
     
     if url is None:
         raise HTTPException(status_code=500, detail="No se pudo generar la URL de subida.")
         
     # 4. Registrar la entrega solo si el usuario es un estudiante
-    if current_user.rol == Role.student:
-        submission = SubmissionInDB(
-            submission_id=str(uuid.uuid4()),
-            task_id=task_id,
-            user_id=current_user.user_id,
-            subject_id=task['subject_id'],
-            s3_object_name=object_name
-        )
-        create_submission_db(submission)
+    await _record_submission(task, current_user, [object_name])
     
     return {"upload_url": url}
 
+@app.post("/tasks/{task_id}/upload-urls", dependencies=[Depends(get_current_user)])
+async def get_upload_urls(task_id: str, request_body: BatchUploadURLRequest, current_user: TokenData = Depends(get_current_user)):
+    """
+    Versión por lotes de get_upload_url para entregas de varios archivos:
+    una sola lectura de la tarea, todas las URLs firmadas en una pasada y
+    un único registro de entrega con la lista de objetos.
+    """
+    if not 1 <= len(request_body.files) <= UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Se deben indicar entre 1 y {UPLOAD_BATCH_MAX_FILES} archivos.")
+
+    task = await db.get_task_by_id_from_db(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada.")
+
+    prefix = f"entregas/{task['subject_id']}/{task_id}/{current_user.user_id}"
+    objects = [(f"{prefix}/{f.file_name}", f.content_type) for f in request_body.files]
+    urls = await db.create_presigned_urls(S3_BUCKET_TASKS, objects)
+    if urls is None:
+        raise HTTPException(status_code=500, detail="No se pudieron generar las URLs de subida.")
+
+    # Registrar la entrega solo si el usuario es un estudiante
+    await _record_submission(task, current_user, [object_name for object_name, _ in objects])
+
+    return {"upload_urls": [
+        {"file_name": f.file_name, "upload_url": url} for f, url in zip(request_body.files, urls)
+    ]}
+
+async def _record_submission(task: dict, current_user: TokenData, object_names: list):
+    """Registra (o reescribe) la entrega del estudiante con sus objetos; los demás roles no entregan."""
+    if current_user.rol != Role.student:
+        return
+    submission = SubmissionInDB(
+        submission_id=submission_id_for(current_user.user_id, task['task_id']), # Reintentos: mismo item
+        task_id=task['task_id'],
+        user_id=current_user.user_id,
+        subject_id=task['subject_id'],
+        s3_object_name=object_names[0],
+        s3_object_names=object_names
+    )
+    submission_item = await db.create_submission_db(submission)
+    if submission_item:
+        await db.run_sync(set_board_submission, submission_item)
+        await db.run_sync(bump, submissions_scope(current_user.user_id))
+        await _publish_submission("submission_created", task, current_user.user_id, submission_item)
+
+# --- Subidas multiparte (archivos grandes) ---
+# No se guarda estado en el servidor: el upload_id y el nombre del archivo
+# identifican la subida en S3, y la clave del objeto incluye el usuario, así que
+# nadie puede continuar ni completar la subida de otro.
+async def _multipart_object_name(task_id: str, file_name: str, current_user: TokenData):
+    task = await db.get_task_by_id_from_db(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada.")
+    return task, f"entregas/{task['subject_id']}/{task_id}/{current_user.user_id}/{file_name}"
+
+def _check_part_numbers(part_numbers: list):
+    if not 1 <= len(part_numbers) <= MULTIPART_URLS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Se deben pedir entre 1 y {MULTIPART_URLS_PER_REQUEST} partes.")
+    if any(not 1 <= number <= MULTIPART_MAX_PARTS for number in part_numbers):
+        raise HTTPException(status_code=400, detail=f"Los números de parte van de 1 a {MULTIPART_MAX_PARTS}.")
+
+@app.post("/tasks/{task_id}/multipart-uploads", status_code=status.HTTP_201_CREATED, dependencies=[Depends(get_current_user)])
+async def start_multipart_upload(task_id: str, request_body: MultipartUploadRequest, current_user: TokenData = Depends(get_current_user)):
+    """
+    Inicia la subida multiparte de un archivo grande. El tamaño de parte se
+    calcula a partir del tamaño declarado; la respuesta incluye las URLs de las
+    primeras partes (hasta MULTIPART_URLS_PER_REQUEST), que el cliente puede
+    subir en paralelo. Cada PUT devuelve una cabecera ETag que hay que enviar
+    al completar. La entrega se registra solo al completar.
+    """
+    if request_body.size > MULTIPART_MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="El archivo supera el tamaño máximo admitido.")
+    task, object_name = await _multipart_object_name(task_id, request_body.file_name, current_user)
+    part_size, part_count = multipart_plan(request_body.size)
+
+    upload_id = await db.start_multipart_upload(S3_BUCKET_TASKS, object_name, request_body.content_type)
+    if upload_id is None:
+        raise HTTPException(status_code=500, detail="No se pudo iniciar la subida.")
+    part_numbers = list(range(1, min(part_count, MULTIPART_URLS_PER_REQUEST) + 1))
+    urls = await db.create_presigned_part_urls(S3_BUCKET_TASKS, object_name, upload_id, part_numbers)
+    if urls is None:
+        await db.abort_multipart_upload(S3_BUCKET_TASKS, object_name, upload_id)
+        raise HTTPException(status_code=500, detail="No se pudieron generar las URLs de subida.")
+    return {
+        "upload_id": upload_id,
+        "object_name": object_name,
+        "part_size": part_size,
+        "part_count": part_count,
+        "parts": [{"part_number": number, "upload_url": url} for number, url in zip(part_numbers, urls)],
+    }
+
+@app.post("/tasks/{task_id}/multipart-uploads/{upload_id}/part-urls", dependencies=[Depends(get_current_user)])
+async def get_multipart_part_urls(task_id: str, upload_id: str, request_body: MultipartPartURLsRequest, current_user: TokenData = Depends(get_current_user)):
+    """URLs de más partes (o nuevas URLs para reintentar partes cuya URL caducó)."""
+    _check_part_numbers(request_body.part_numbers)
+    _, object_name = await _multipart_object_name(task_id, request_body.file_name, current_user)
+    urls = await db.create_presigned_part_urls(S3_BUCKET_TASKS, object_name, upload_id, request_body.part_numbers)
+    if urls is None:
+        raise HTTPException(status_code=500, detail="No se pudieron generar las URLs de subida.")
+    return {"parts": [
+        {"part_number": number, "upload_url": url} for number, url in zip(request_body.part_numbers, urls)
+    ]}
+
+@app.post("/tasks/{task_id}/multipart-uploads/{upload_id}/complete", dependencies=[Depends(get_current_user)])
+async def complete_multipart_upload(task_id: str, upload_id: str, request_body: MultipartCompleteRequest, current_user: TokenData = Depends(get_current_user)):
+    """Une las partes subidas y, si el objeto queda creado, registra la entrega."""
+    parts = sorted((part.part_number, part.etag) for part in request_body.parts)
+    if not 1 <= len(parts) <= MULTIPART_MAX_PARTS:
+        raise HTTPException(status_code=400, detail=f"Se deben indicar entre 1 y {MULTIPART_MAX_PARTS} partes.")
+    task, object_name = await _multipart_object_name(task_id, request_body.file_name, current_user)
+    if not await db.complete_multipart_upload(S3_BUCKET_TASKS, object_name, upload_id, parts):
+        raise HTTPException(status_code=400, detail="No se pudo completar la subida: faltan partes o no coinciden.")
+    await _record_submission(task, current_user, [object_name])
+    return {"object_name": object_name}
+
+@app.delete("/tasks/{task_id}/multipart-uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(get_current_user)])
+async def abort_multipart_upload(task_id: str, upload_id: str, file_name: FileName, current_user: TokenData = Depends(get_current_user)):
+    """Cancela una subida multiparte y libera las partes ya subidas."""
+    _, object_name = await _multipart_object_name(task_id, file_name, current_user)
+    if not await db.abort_multipart_upload(S3_BUCKET_TASKS, object_name, upload_id):
+        raise HTTPException(status_code=500, detail="No se pudo cancelar la subida.")
+    return
+
 @app.delete("/student/submissions/{submission_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(role_checker([Role.student]))])
-def delete_submission(submission_id: str, current_user: TokenData = Depends(get_current_user)):
+async def delete_submission(submission_id: str, current_user: TokenData = Depends(get_current_user)):
     """Permite a un estudiante eliminar su propia entrega."""
-    submission = get_item(DYNAMODB_TABLE_SUBMISSIONS, {'submission_id': submission_id})
+    submission = await db.get_item(DYNAMODB_TABLE_SUBMISSIONS, {'submission_id': submission_id})
     if not submission or submission['user_id'] != current_user.user_id:
         raise HTTPException(status_code=404, detail="Entrega no encontrada o no tienes permiso.")
     
-    task = get_task_by_id_from_db(submission['task_id'])
+    task = await db.get_task_by_id_from_db(submission['task_id'])
     if datetime.utcnow() > task['fecha_caducidad']:
         raise HTTPException(status_code=403, detail="No se puede eliminar una entrega después de la fecha de caducidad.")
 
-    delete_s3_object(S3_BUCKET_TASKS, submission['s3_object_name'])
-    delete_submission_db(submission_id)
+    await asyncio.gather(
+        db.delete_s3_objects(S3_BUCKET_TASKS, submission_object_names(submission)),
+        db.delete_submission_db(submission_id),
+        db.run_sync(remove_board_submission, submission),
+    )
+    await db.run_sync(bump, submissions_scope(current_user.user_id))
+    await _publish_submission("submission_deleted", task, current_user.user_id, None)
     return
 
+async def _write_request_body(request: Request, writer):
+    """Copia el cuerpo de la petición en `writer` (open_for_write u open_part_for_write) desde el pool, sin bloquear el event loop."""
+    async with db.open_in_pool(writer) as f:
+        async for chunk in request.stream():
+            await db.run_sync(f.write, chunk)
+    return f
+
+@app.put("/local-objects/{bucket_name}/{object_name:path}", status_code=status.HTTP_200_OK, include_in_schema=False)
+async def put_local_object(
+    bucket_name: str, object_name: str, request: Request, expires: int, signature: str,
+    upload_id: Optional[str] = Query(None, alias="uploadId"), part_number: Optional[int] = Query(None, alias="partNumber")
+):
+    """
+    Destino de las URLs de subida cuando OBJECT_STORE es "filesystem": hace el papel
+    de S3 y acepta el PUT solo con la firma y el Content-Type con los que se generó.
+    Con uploadId y partNumber recibe una parte de una subida multiparte y, como
+    UploadPart, devuelve su ETag en la cabecera.
+    """
+    object_store = get_object_store()
+    if object_store.name != "filesystem":
+        raise HTTPException(status_code=404, detail="Not Found")
+    if upload_id is not None and part_number is not None:
+        if not object_store.verify_part(bucket_name, object_name, upload_id, part_number, expires, signature):
+            raise HTTPException(status_code=403, detail="Firma no válida o caducada.")
+        if not await db.run_sync(object_store.has_upload, bucket_name, object_name, upload_id):
+            raise HTTPException(status_code=404, detail="La subida no existe.")
+        try:
+            part = await _write_request_body(request, object_store.open_part_for_write(upload_id, part_number))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Subida no válida.")
+        return Response(status_code=status.HTTP_200_OK, headers={"ETag": part.etag})
+    content_type = request.headers.get('content-type', '')
+    if not object_store.verify(bucket_name, object_name, content_type, expires, signature):
+        raise HTTPException(status_code=403, detail="Firma no válida o caducada.")
+    try:
+        await _write_request_body(request, object_store.open_for_write(bucket_name, object_name))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Clave de objeto no válida.")
+    return Response(status_code=status.HTTP_200_OK)
+
 @app.post("/student/enroll", status_code=status.HTTP_201_CREATED, dependencies=[Depends(role_checker([Role.student]))])
-def student_enroll_in_subject(subject: Subject, current_user: TokenData = Depends(get_current_user)):
+async def student_enroll_in_subject(subject: Subject, current_user: TokenData = Depends(get_current_user)):
     """Permite a un estudiante inscribirse en una materia."""
     enrollment_data = {"user_id": current_user.user_id, "subject_id": subject.subject_id}
-    if is_student_enrolled(**enrollment_data):
+    # Escritura condicional: una sola llamada y sin carrera entre peticiones simultáneas
+    if not await db.put_item_if_absent(DYNAMODB_TABLE_ENROLLMENTS, enrollment_data):
         raise HTTPException(status_code=409, detail="Ya estás inscrito en esta materia.")
-    put_item(DYNAMODB_TABLE_ENROLLMENTS, enrollment_data)
+    await db.run_sync(rebuild_board, **enrollment_data)
+    await db.run_sync(bump, enrollments_scope(current_user.user_id))
     return {"message": "Inscripción exitosa."}
 
 @app.get("/student/subjects", response_model=List[Subject], dependencies=[Depends(role_checker([Role.student]))])
-def get_enrolled_subjects(current_user: TokenData = Depends(get_current_user)):
+async def get_enrolled_subjects(request: Request, response: Response, current_user: TokenData = Depends(get_current_user)):
     """Devuelve las materias en las que un estudiante está inscrito."""
-    enrollments = get_student_subjects(current_user.user_id)
-    subjects = [get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': en['subject_id']}) for en in enrollments]
-    return [s for s in subjects if s] # Filtra por si alguna materia fue eliminada
-
-@app.get("/student/tasks", response_model=List[StudentTask], dependencies=[Depends(role_checker([Role.student]))])
-def get_student_tasks(current_user: TokenData = Depends(get_current_user)):
-    """Devuelve todas las tareas de un estudiante, con su estado actual."""
-    student_subjects = get_student_subjects(current_user.user_id)
-    all_tasks = []
-    for enrollment in student_subjects:
-        subject_tasks = get_tasks_for_subject(enrollment['subject_id'])
-        for task_data in subject_tasks:
-            task = TaskInDB(**get_task_by_id_from_db(task_data['task_id']))
-            submission = get_submission(current_user.user_id, task.task_id)
-            
-            status = SubmissionStatus.pendiente
-            now = datetime.utcnow()
-            if submission:
-                status = SubmissionStatus.entregado
-            elif now > task.fecha_caducidad:
-                status = SubmissionStatus.inactivo
-            elif now > task.fecha_entrega:
-                status = SubmissionStatus.caducado
-
-            all_tasks.append(StudentTask(**task.dict(), status=status, submission=submission))
-    return all_tasks
+    user_id = current_user.user_id
+    cached = await not_modified(request, response, [SCOPE_SUBJECTS, enrollments_scope(user_id)], user_id)
+    if cached:
+        return cached
+    return trusted_response(await db.get_student_subject_items(user_id), Subject, response)
 
 # --- Nuevos Endpoints para Docentes ---
 
 @app.get("/teacher/subjects", response_model=List[Subject], dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
-def get_teacher_subjects(current_user: TokenData = Depends(get_current_user)):
+async def get_teacher_subjects(current_user: TokenData = Depends(get_current_user)):
     """Devuelve las materias que un docente tiene asignadas."""
-    return get_subjects_by_teacher(current_user.user_id)
+    return trusted_response(await db.get_subjects_by_teacher(current_user.user_id), Subject)
 
 @app.get("/teacher/subjects/{subject_id}/tasks", response_model=List[TaskInDB], dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
-def get_tasks_for_a_subject(subject_id: str, current_user: TokenData = Depends(get_current_user)):
+async def get_tasks_for_a_subject(subject_id: str, current_user: TokenData = Depends(get_current_user)):
     """Devuelve las tareas de una materia específica que un docente imparte."""
-    subject = get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id})
+    # El permiso y las tareas se consultan en paralelo; las tareas se descartan si no hay permiso
+    subject, tasks_data = await asyncio.gather(
+        db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id}),
+        db.get_tasks_for_subject(subject_id),
+    )
     if not subject or subject.get('teacher_id') != current_user.user_id:
         raise HTTPException(status_code=403, detail="No tienes permiso para ver las tareas de esta materia.")
-    
-    tasks_data = get_tasks_for_subject(subject_id)
+
+    tasks = await db.batch_get_map(DYNAMODB_TABLE_TASKS, 'task_id', [task['task_id'] for task in tasks_data])
     # Convertir las fechas de string a datetime para el modelo de respuesta
-    tasks = [get_task_by_id_from_db(task['task_id']) for task in tasks_data]
-    return tasks
+    return trusted_response([parse_task_dates(tasks[task['task_id']]) for task in tasks_data if task['task_id'] in tasks], TaskInDB)
+
+async def _subject_tasks_in_window(subject_id: str, current_user: TokenData, query, days: int):
+    now = datetime.utcnow()
+    subject, tasks = await asyncio.gather(
+        db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id}),
+        query(subject_id, now, now + timedelta(days=days)),
+    )
+    if not subject or subject.get('teacher_id') != current_user.user_id:
+        raise HTTPException(status_code=403, detail="No tienes permiso para ver las tareas de esta materia.")
+    return sorted((parse_task_dates(task) for task in tasks), key=lambda t: t['fecha_entrega'])
+
+@app.get("/teacher/subjects/{subject_id}/tasks/upcoming", response_model=List[TaskInDB], dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
+async def get_subject_upcoming_tasks(subject_id: str, days: int = Query(7, ge=1, le=365), current_user: TokenData = Depends(get_current_user)):
+    """Tareas de la materia cuya fecha de entrega cae en los próximos `days` días."""
+    return trusted_response(await _subject_tasks_in_window(subject_id, current_user, db.get_tasks_due_between, days), TaskInDB)
+
+@app.get("/teacher/subjects/{subject_id}/tasks/overdue", response_model=List[TaskInDB], dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
+async def get_subject_overdue_tasks(subject_id: str, days: int = Query(7, ge=1, le=365), current_user: TokenData = Depends(get_current_user)):
+    """Tareas de la materia con la entrega vencida que aún admiten entregas y caducan en los próximos `days` días."""
+    return trusted_response(await _subject_tasks_in_window(subject_id, current_user, db.get_overdue_tasks_closing_between, days), TaskInDB)
 
 @app.get("/teacher/tasks/{task_id}/submissions", response_model=List[TeacherSubmissionView], dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
-def get_submissions_for_a_task(task_id: str, current_user: TokenData = Depends(get_current_user)):
+async def get_submissions_for_a_task(task_id: str, current_user: TokenData = Depends(get_current_user)):
     """Devuelve todas las entregas de una tarea con el estado y nombre del estudiante."""
-    task = get_task_by_id_from_db(task_id)
+    task = await db.get_task_by_id_from_db(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Tarea no encontrada.")
-    
-    subject = get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': task['subject_id']})
+
+    subject, roster = await asyncio.gather(
+        db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': task['subject_id']}),
+        db.get_task_roster(task_id, task['subject_id']),
+    )
     if not subject or subject.get('teacher_id') != current_user.user_id:
         raise HTTPException(status_code=403, detail="No tienes permiso para ver las entregas de esta tarea.")
 
-    submissions_data = get_submissions_for_task(task_id)
-    enrolled_students = get_students_for_subject(task['subject_id'])
-    
-    response = []
-    submitted_user_ids = {s['user_id'] for s in submissions_data}
-
-    # Procesar estudiantes que han entregado
-    for sub_data in submissions_data:
-        student = get_item(DYNAMODB_TABLE_USERS, {'user_id': sub_data['user_id']})
-        if student:
-            response.append(TeacherSubmissionView(
-                submission=sub_data,
-                student_name=student['nombre'],
-                status=SubmissionStatus.entregado
-            ))
-
-    # Procesar estudiantes que no han entregado
     now = datetime.utcnow()
-    for student_enrollment in enrolled_students:
-        if student_enrollment['user_id'] not in submitted_user_ids:
-            student = get_item(DYNAMODB_TABLE_USERS, {'user_id': student_enrollment['user_id']})
-            if student:
-                status = SubmissionStatus.pendiente
-                if now > datetime.fromisoformat(task['fecha_caducidad']):
-                    status = SubmissionStatus.inactivo
-                elif now > datetime.fromisoformat(task['fecha_entrega']):
-                    status = SubmissionStatus.caducado
-                
-                # Creamos una "entrega falsa" para la vista
-                fake_submission = SubmissionInDB(
-                    submission_id="N/A", task_id=task_id, user_id=student['user_id'],
-                    subject_id=task['subject_id'], s3_object_name="N/A"
-                )
-                response.append(TeacherSubmissionView(
-                    submission=fake_submission,
-                    student_name=student['nombre'],
-                    status=status
-                ))
-
-    return response
+    return [_submission_view(task, student, sub_data, now) for student, sub_data in roster]
+
+def _submission_view(task: dict, student: dict, sub_data: Optional[dict], now: datetime):
+    """Fila de la vista del docente para un estudiante, haya entregado (sub_data) o no."""
+    if sub_data:
+        # Estudiantes que han entregado
+        return TeacherSubmissionView(
+            submission=sub_data,
+            student_name=student['nombre'],
+            status=SubmissionStatus.entregado
+        )
+    # Creamos una "entrega falsa" para la vista
+    fake_submission = SubmissionInDB(
+        submission_id="N/A", task_id=task['task_id'], user_id=student['user_id'],
+        subject_id=task['subject_id'], s3_object_name="N/A"
+    )
+    return TeacherSubmissionView(
+        submission=fake_submission,
+        student_name=student['nombre'],
+        status=compute_task_status(task['fecha_entrega'], task['fecha_caducidad'], False, now)
+    )
+
+# --- Entregas en vivo (Server-Sent Events) ---
+def _submissions_topic(task_id: str):
+    return f"submissions:{task_id}"
+
+def _sse(event_type: str, data):
+    return f"event: {event_type}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+async def _publish_submission(event_type: str, task: dict, user_id: str, sub_data: Optional[dict]):
+    """Difunde la fila actualizada del estudiante a los paneles abiertos de la tarea (si hay alguno)."""
+    topic = _submissions_topic(task['task_id'])
+    if not events.has_subscribers(topic):
+        return
+    student = await db.get_item(DYNAMODB_TABLE_USERS, {'user_id': user_id})
+    if student:
+        events.publish(topic, event_type, _submission_view(task, student, sub_data, datetime.utcnow()))
+
+async def _submission_events(task: dict):
+    """
+    Estado completo al conectar y, después, los cambios publicados. Con la cola
+    llena (cliente lento) se reenvía el estado completo. La suscripción empieza
+    antes de leer el estado, así que ninguna escritura queda entre ambos.
+    """
+    with events.subscribe(_submissions_topic(task['task_id'])) as subscription:
+        event = events.RESYNC
+        while True:
+            if event is events.RESYNC:
+                # Sin agrupar con lecturas en curso: debe empezar después de suscribirse
+                roster = await db.get_task_roster(task['task_id'], task['subject_id'])
+                now = datetime.utcnow()
+                yield _sse("snapshot", [_submission_view(task, student, sub_data, now) for student, sub_data in roster])
+            elif event is None:
+                yield ": ping\n\n"
+            else:
+                yield _sse(*event)
+            event = await subscription.get(SSE_HEARTBEAT_SECONDS)
+
+@app.get("/teacher/tasks/{task_id}/submissions/events", dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
+async def stream_submissions_for_a_task(task_id: str, current_user: TokenData = Depends(get_current_user)):
+    """
+    Versión en vivo de /teacher/tasks/{task_id}/submissions (text/event-stream):
+    un evento "snapshot" con todas las filas y después "submission_created" y
+    "submission_deleted" con la fila del estudiante afectado, en lugar de
+    consultar la lista una y otra vez.
+    """
+    task = await db.get_task_by_id_from_db(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada.")
+    subject = await db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': task['subject_id']})
+    if not subject or subject.get('teacher_id') != current_user.user_id:
+        raise HTTPException(status_code=403, detail="No tienes permiso para ver las entregas de esta tarea.")
+    return StreamingResponse(
+        _submission_events(task), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/teacher/tasks/{task_id}/submissions/archive", dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
+async def download_task_submissions(task_id: str, current_user: TokenData = Depends(get_current_user)):
+    """
+    Descarga en un ZIP (en streaming) todos los archivos entregados en la tarea,
+    en una carpeta por estudiante. Ver services/archive.py.
+    """
+    task = await db.get_task_by_id_from_db(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada.")
+
+    subject, submissions = await asyncio.gather(
+        db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': task['subject_id']}),
+        db.get_submissions_for_task(task_id),
+    )
+    if not subject or subject.get('teacher_id') != current_user.user_id:
+        raise HTTPException(status_code=403, detail="No tienes permiso para ver las entregas de esta tarea.")
+
+    students = await db.batch_get_map(DYNAMODB_TABLE_USERS, 'user_id', list({s['user_id'] for s in submissions}))
+    entries = task_archive_entries(submissions, students)
+    return StreamingResponse(
+        db.iterate(iter_zip(entries)), media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="entregas-{task_id}.zip"'},
+    )
+
+async def _gradebook_stream(subject_id: str, tasks: list, fmt: str):
+    """
+    Genera la matriz estudiantes x tareas de una materia por bloques. La cabecera
+    sale de inmediato; las entregas de cada tarea se reducen a {user_id: fecha} y
+    las inscripciones se recorren página a página, resolviendo los nombres por
+    lotes, así que la memoria no depende del número de estudiantes.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    if fmt == 'csv':
+        writer.writerow(['user_id', 'nombre'] + [task['titulo'] for task in tasks] + ['entregadas'])
+        yield flush()
+
+    now = datetime.utcnow()
+    # Estado de quien no ha entregado: depende solo de la tarea y la hora
+    pending_status = [compute_task_status(t['fecha_entrega'], t['fecha_caducidad'], False, now) for t in tasks]
+    submission_dates = await asyncio.gather(*(db.get_submission_dates_for_task(t['task_id']) for t in tasks))
+
+    enrollment_pages = iter_query_pages(DYNAMODB_TABLE_ENROLLMENTS, Key('subject_id').eq(subject_id))
+    async for enrollments in db.iterate(enrollment_pages):
+        students = await db.batch_get_map(DYNAMODB_TABLE_USERS, 'user_id', [en['user_id'] for en in enrollments])
+        for enrollment in enrollments:
+            student = students.get(enrollment['user_id'])
+            if not student:
+                continue # Usuario eliminado
+            user_id = student['user_id']
+            dates = [task_dates.get(user_id) for task_dates in submission_dates]
+            statuses = [SubmissionStatus.entregado if date else status for date, status in zip(dates, pending_status)]
+            submitted = sum(1 for date in dates if date)
+            if fmt == 'csv':
+                writer.writerow([user_id, student['nombre']] + [status.value for status in statuses] + [submitted])
+            else:
+                buffer.write(json.dumps({
+                    'user_id': user_id, 'nombre': student['nombre'], 'entregadas': submitted,
+                    'tareas': {
+                        task['task_id']: {'status': status.value, 'fecha_entrega': date}
+                        for task, status, date in zip(tasks, statuses, dates)
+                    },
+                }, ensure_ascii=False) + "\n")
+        yield flush()
+
+@app.get("/teacher/subjects/{subject_id}/gradebook", dependencies=[Depends(role_checker([Role.teacher, Role.admin]))])
+async def get_subject_gradebook(subject_id: str, format: str = Query("csv", pattern="^(csv|ndjson)$"), current_user: TokenData = Depends(get_current_user)):
+    """
+    Exporta en streaming (CSV o NDJSON) el estado de cada estudiante en cada
+    tarea de la materia, en lugar de consultar /teacher/tasks/{task_id}/submissions
+    tarea por tarea.
+    """
+    subject, tasks_data = await asyncio.gather(
+        db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id}),
+        db.get_tasks_for_subject(subject_id),
+    )
+    if not subject or subject.get('teacher_id') != current_user.user_id:
+        raise HTTPException(status_code=403, detail="No tienes permiso para ver las calificaciones de esta materia.")
+
+    tasks = await db.batch_get_map(DYNAMODB_TABLE_TASKS, 'task_id', [task['task_id'] for task in tasks_data])
+    ordered_tasks = sorted((parse_task_dates(task) for task in tasks.values()), key=lambda t: (t['fecha_entrega'], t['task_id']))
+    media_type = "text/csv; charset=utf-8" if format == 'csv' else "application/x-ndjson"
+    return StreamingResponse(
+        _gradebook_stream(subject_id, ordered_tasks, format), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="calificaciones-{subject_id}.{format}"'},
+    )
 
 
 # --- Endpoints de Docente y Administrador ---
 @app.post("/tasks", response_model=TaskInDB, status_code=201, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def create_task(task: TaskCreate):
+async def create_task(task: TaskCreate):
     if task.fecha_caducidad <= task.fecha_entrega:
         raise HTTPException(status_code=400, detail="La fecha de caducidad debe ser posterior a la fecha de entrega.")
     new_task = TaskInDB(task_id=str(uuid.uuid4()), **task.dict())
-    # Convertir datetimes a strings para DynamoDB
-    task_dict = new_task.dict()
-    task_dict['fecha_creacion'] = new_task.fecha_creacion.isoformat()
-    task_dict['fecha_entrega'] = new_task.fecha_entrega.isoformat()
-    task_dict['fecha_caducidad'] = new_task.fecha_caducidad.isoformat()
-    created_task = put_item(DYNAMODB_TABLE_TASKS, task_dict)
+    # Fechas en segundos epoch: son claves de ordenación de los GSIs de fechas
+    task_dict = task_to_item(new_task)
+    created_task = await db.put_item(DYNAMODB_TABLE_TASKS, task_dict)
     if not created_task: raise HTTPException(status_code=500, detail="No se pudo crear la tarea.")
+    # Los tableros de los inscritos se actualizan en segundo plano (uno por estudiante)
+    submit_job("board_add_task", bumping(add_task_to_boards, SCOPE_TASKS), task_dict)
     return new_task
 
 @app.post("/enrollments", status_code=status.HTTP_201_CREATED, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def enroll_student(enrollment: Enrollment):
+async def enroll_student(enrollment: Enrollment):
     """Permite a un admin/docente inscribir a un estudiante en una materia."""
-    if is_student_enrolled(enrollment.user_id, enrollment.subject_id):
+    if not await db.put_item_if_absent(DYNAMODB_TABLE_ENROLLMENTS, enrollment.dict()):
         raise HTTPException(status_code=409, detail="El estudiante ya está inscrito en esta materia.")
-    put_item(DYNAMODB_TABLE_ENROLLMENTS, enrollment.dict())
+    await db.run_sync(rebuild_board, enrollment.user_id, enrollment.subject_id)
+    await db.run_sync(bump, enrollments_scope(enrollment.user_id))
     return {"message": "Estudiante inscrito con éxito."}
 
 @app.get("/subjects/{subject_id}/students", response_model=List[UserInDB], dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def get_subject_students(subject_id: str):
+async def get_subject_students(subject_id: str):
     """Devuelve los estudiantes inscritos en una materia."""
-    enrollments = get_students_for_subject(subject_id)
-    users = [get_item(DYNAMODB_TABLE_USERS, {'user_id': en['user_id']}) for en in enrollments]
-    return [u for u in users if u] # Filtra por si algún usuario fue eliminado
+    enrollments = await db.get_students_for_subject(subject_id)
+    users = await db.batch_get_map(DYNAMODB_TABLE_USERS, 'user_id', [en['user_id'] for en in enrollments])
+    # Los usuarios eliminados no aparecen en el resultado del lote
+    return trusted_response([users[en['user_id']] for en in enrollments if en['user_id'] in users], UserInDB)
 
 
 # --- Endpoints Exclusivos de Administrador (CRUD completo) ---
 @app.post("/admin/users", response_model=UserInDB, status_code=201, dependencies=[Depends(role_checker([Role.admin]))])
-def admin_create_user(user: UserCreate):
+async def admin_create_user(user: UserCreate):
     user_id = str(uuid.uuid4())
     user_in_db = UserInDB(user_id=user_id, **user.dict())
-    return put_item(DYNAMODB_TABLE_USERS, user_in_db.dict())
+    created = await db.put_item(DYNAMODB_TABLE_USERS, user_in_db.dict())
+    await db.run_sync(bump, SCOPE_USERS)
+    return created
 
 @app.delete("/admin/users/{user_id}", status_code=204, dependencies=[Depends(role_checker([Role.admin]))])
-def admin_delete_user(user_id: str):
-    delete_item(DYNAMODB_TABLE_USERS, {'user_id': user_id})
+async def admin_delete_user(user_id: str):
+    await db.delete_item(DYNAMODB_TABLE_USERS, {'user_id': user_id})
+    await db.run_sync(bump, SCOPE_USERS)
     return
 
 @app.post("/admin/subjects", response_model=Subject, status_code=201, dependencies=[Depends(role_checker([Role.admin]))])
-def admin_create_subject(subject: Subject):
+async def admin_create_subject(subject: Subject):
     """Crea una nueva materia."""
     subject.subject_id = str(uuid.uuid4())
     
@@ -278,49 +738,151 @@ def admin_create_subject(subject: Subject):
     # para evitar errores al guardar en DynamoDB.
     item_to_save = {k: v for k, v in subject.dict().items() if v is not None}
     
-    put_item(DYNAMODB_TABLE_SUBJECTS, item_to_save)
+    await db.put_item(DYNAMODB_TABLE_SUBJECTS, item_to_save)
+    await db.run_sync(bump, SCOPE_SUBJECTS)
     return subject
 
 @app.get("/admin/subjects", response_model=List[Subject], dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def admin_get_all_subjects():
-    return scan_items(DYNAMODB_TABLE_SUBJECTS)
+async def admin_get_all_subjects(request: Request, response: Response, limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT), cursor: Optional[str] = None):
+    cached = await not_modified(request, response, [SCOPE_SUBJECTS])
+    if cached:
+        return cached
+    return trusted_response(await list_table(DYNAMODB_TABLE_SUBJECTS, response, limit, cursor), Subject, response)
 
 @app.get("/admin/subjects/{subject_id}", response_model=Subject, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def admin_get_subject(subject_id: str):
-    subject = get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id})
+async def admin_get_subject(subject_id: str):
+    subject = await db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id})
     if not subject: raise HTTPException(status_code=404, detail="Materia no encontrada")
     return subject
 
 @app.put("/admin/subjects/{subject_id}", response_model=Subject, dependencies=[Depends(role_checker([Role.admin]))])
-def admin_update_subject(subject_id: str, subject: Subject):
+async def admin_update_subject(subject_id: str, subject: Subject):
     subject.subject_id = subject_id
     item_to_save = {k: v for k, v in subject.dict().items() if v is not None}
-    return put_item(DYNAMODB_TABLE_SUBJECTS, item_to_save)
+    updated = await db.put_item(DYNAMODB_TABLE_SUBJECTS, item_to_save)
+    await db.run_sync(bump, SCOPE_SUBJECTS)
+    return updated
 
-@app.delete("/admin/subjects/{subject_id}", status_code=204, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def admin_delete_subject(subject_id: str):
-    delete_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id})
-    return
+@app.delete("/admin/subjects/{subject_id}", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
+async def admin_delete_subject(subject_id: str):
+    """
+    Elimina la materia al instante y lanza en segundo plano el borrado de sus
+    tareas, entregas, inscripciones y archivos. El progreso se consulta en /admin/jobs/{job_id}.
+    """
+    await db.delete_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id})
+    await db.run_sync(bump, SCOPE_SUBJECTS)
+    return submit_job("delete_subject", bumping(delete_subject_cascade, SCOPE_TASKS), subject_id)
 
-@app.delete("/admin/tasks/{task_id}", status_code=204, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def admin_delete_task(task_id: str):
-    # En una app real, también deberías eliminar las entregas asociadas
-    delete_item(DYNAMODB_TABLE_TASKS, {'task_id': task_id})
-    return
+@app.delete("/admin/tasks/{task_id}", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
+async def admin_delete_task(task_id: str):
+    """
+    Elimina la tarea al instante y lanza en segundo plano el borrado de sus
+    entregas y archivos. El progreso se consulta en /admin/jobs/{job_id}.
+    """
+    task = await db.get_item(DYNAMODB_TABLE_TASKS, {'task_id': task_id})
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada.")
+    await db.delete_item(DYNAMODB_TABLE_TASKS, {'task_id': task_id})
+    return submit_job("delete_task", bumping(delete_task_cascade, SCOPE_TASKS), task_id, task['subject_id'])
+
+@app.get("/admin/jobs/{job_id}", response_model=JobInfo, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
+def admin_get_job(job_id: str):
+    """Estado y progreso de un trabajo en segundo plano."""
+    job = get_job(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
+@app.post("/admin/snapshots", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(role_checker([Role.admin]))])
+def admin_create_snapshot():
+    """
+    Exporta todas las tablas a SNAPSHOT_DIR/<fecha> con scans paralelos
+    (services/snapshot.py). El progreso se consulta en /admin/jobs/{job_id}.
+    """
+    name = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    job = submit_job("snapshot_export", export_snapshot, os.path.join(SNAPSHOT_DIR, name))
+    return {"snapshot": name, "job_id": job.job_id}
+
+@app.get("/admin/snapshots", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_list_snapshots():
+    """Copias disponibles, la más reciente primero, con los items por tabla."""
+    return list_snapshots()
+
+@app.post("/admin/snapshots/{name}/restore", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(role_checker([Role.admin]))])
+def admin_restore_snapshot(name: str):
+    """Restaura una copia con escrituras por lotes. El progreso se consulta en /admin/jobs/{job_id}."""
+    if name not in {snapshot["name"] for snapshot in list_snapshots()}:
+        raise HTTPException(status_code=404, detail="Copia no encontrada.")
+    job = submit_job("snapshot_restore", restore_snapshot, os.path.join(SNAPSHOT_DIR, name))
+    return {"snapshot": name, "job_id": job.job_id}
+
+@app.post("/admin/import/{kind}", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_bulk_import(kind: ImportKind, file: UploadFile = File(...), format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")):
+    """
+    Importa usuarios, materias o inscripciones desde un CSV o NDJSON.
+    El archivo se procesa fila a fila y se escribe con BatchWriteItem;
+    la respuesta incluye los errores por fila. Los tableros de las inscripciones
+    importadas se construyen después en segundo plano (projection_job_id).
+    """
+    if kind != ImportKind.enrollments:
+        report = import_stream(kind, file.file, format or detect_format(file.filename))
+        bump(SCOPE_USERS if kind == ImportKind.users else SCOPE_SUBJECTS)
+        return report
+    written = []
+    report = import_stream(kind, file.file, format or detect_format(file.filename), written.extend)
+    pairs = [(en['user_id'], en['subject_id']) for en in written]
+    scopes = [enrollments_scope(user_id) for user_id, _ in pairs]
+    report["projection_job_id"] = submit_job("rebuild_boards", bumping(lambda job: rebuild_boards(pairs, job), *scopes)).job_id
+    return report
+
+@app.get("/admin/cache/stats", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_cache_stats():
+    """Contadores de la caché de lectura de usuarios, materias y tareas."""
+    return cache_stats()
+
+@app.get("/admin/storage/coalescing", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_coalescing_stats():
+    """Lecturas concurrentes idénticas agrupadas: llamadas, ejecutadas y ahorradas por operación."""
+    return singleflight.stats()
+
+@app.get("/admin/profiles", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_list_profiles():
+    """Perfiles de peticiones guardados (services/profiling.py), el más reciente primero."""
+    return profiling.list_profiles()
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_get_profile(profile_id: str, format: str = Query("speedscope", pattern="^(speedscope|collapsed)$")):
+    """Un perfil en formato speedscope (JSON) o como pilas colapsadas (texto)."""
+    try:
+        speedscope = profiling.load_speedscope(profile_id)
+    except ValueError:
+        speedscope = None
+    if speedscope is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado.")
+    if format == "collapsed":
+        return PlainTextResponse(profiling.to_collapsed(speedscope))
+    return JSONResponse(speedscope, headers={"Content-Disposition": f'inline; filename="{profile_id}.speedscope.json"'})
+
+@app.get("/admin/events", dependencies=[Depends(role_checker([Role.admin]))])
+def admin_event_stats():
+    """Clientes conectados a los flujos Server-Sent Events, por tema."""
+    return events.stats()
 
 # --- Nuevo Endpoint para Administradores ---
 @app.post("/admin/subjects/{subject_id}/assign/{teacher_id}", response_model=Subject, dependencies=[Depends(role_checker([Role.admin, Role.teacher]))])
-def assign_teacher_to_subject(subject_id: str, teacher_id: str):
+async def assign_teacher_to_subject(subject_id: str, teacher_id: str):
     """Asigna un docente a una materia."""
-    subject = get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id})
-    teacher = get_item(DYNAMODB_TABLE_USERS, {'user_id': teacher_id})
+    subject, teacher = await asyncio.gather(
+        db.get_item(DYNAMODB_TABLE_SUBJECTS, {'subject_id': subject_id}),
+        db.get_item(DYNAMODB_TABLE_USERS, {'user_id': teacher_id}),
+    )
 
     if not subject: raise HTTPException(status_code=404, detail="Materia no encontrada.")
     if not teacher or teacher['rol'] != 'docente':
         raise HTTPException(status_code=404, detail="Docente no encontrado o el usuario no es un docente.")
 
     subject['teacher_id'] = teacher_id
-    put_item(DYNAMODB_TABLE_SUBJECTS, subject)
+    await db.put_item(DYNAMODB_TABLE_SUBJECTS, subject)
+    await db.run_sync(bump, SCOPE_SUBJECTS)
     return subject
 
 # --- Punto de entrada para Uvicorn ---
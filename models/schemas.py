@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -19,9 +19,45 @@ class UserInDB(UserBase):
     user_id: str
     rol: Role
 
+def _check_file_name(name: str):
+    """
+    El nombre se pega al final de la clave entregas/{materia}/{tarea}/{usuario}/:
+    un solo segmento, sin separadores ni caracteres de control, para que nadie
+    pueda firmar una clave fuera de su propio prefijo.
+    """
+    if name in ('', '.', '..') or '/' in name or '\\' in name or any(ord(c) < 32 or ord(c) == 127 for c in name):
+        raise ValueError("Nombre de archivo no válido")
+    return name
+
+FileName = Annotated[str, AfterValidator(_check_file_name)]
+
 class UploadURLRequest(BaseModel):
     content_type: str
 
+class UploadFileSpec(BaseModel):
+    file_name: FileName
+    content_type: str
+
+class BatchUploadURLRequest(BaseModel):
+    files: List[UploadFileSpec]
+
+class MultipartUploadRequest(BaseModel):
+    file_name: FileName
+    content_type: str
+    size: int = Field(gt=0) # Tamaño declarado en bytes; decide el tamaño de parte
+
+class MultipartPartURLsRequest(BaseModel):
+    file_name: FileName
+    part_numbers: List[int]
+
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: str # Cabecera ETag de la respuesta al PUT de la parte
+
+class MultipartCompleteRequest(BaseModel):
+    file_name: FileName
+    parts: List[CompletedPart]
+
 # --- Modelos de Materia ---
 class Subject(BaseModel):
     subject_id: Optional[str] = None
@@ -43,6 +79,8 @@ class SubmissionInDB(BaseModel):
     subject_id: str
     fecha_entrega: datetime = Field(default_factory=datetime.utcnow)
     s3_object_name: str
+    # Entregas de varios archivos: todas las claves de S3 (s3_object_name es la primera)
+    s3_object_names: List[str] = []
 
 # --- Añade este nuevo modelo para las respuestas de la API ---
 class TeacherSubmissionView(BaseModel):
@@ -73,6 +111,28 @@ class Enrollment(BaseModel):
 
 
 
+# --- Trabajos en segundo plano ---
+class JobStatus(str, Enum):
+    pending = "pendiente"
+    running = "en_curso"
+    completed = "completado"
+    failed = "error"
+
+class JobInfo(BaseModel):
+    job_id: str
+    kind: str
+    status: JobStatus = JobStatus.pending
+    progress: Dict[str, int] = {}
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+# --- Importación masiva ---
+class ImportKind(str, Enum):
+    users = "users"
+    subjects = "subjects"
+    enrollments = "enrollments"
+
 # --- Modelos para Respuestas de API ---
 class StudentTask(TaskInDB):
     status: SubmissionStatus
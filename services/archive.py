@@ -0,0 +1,135 @@
+"""
+Descarga en un solo ZIP de todos los archivos entregados en una tarea.
+
+El ZIP se genera en streaming: zipfile escribe en un destino sin seek (con
+descriptores de datos tras cada archivo) y los bytes se entregan a la respuesta
+por bloques de ARCHIVE_CHUNK_SIZE. Mientras se copia un objeto, un pool pide
+por adelantado los ARCHIVE_PREFETCH_WINDOW siguientes (GetObject y su primer
+bloque), así que la latencia de S3 se solapa sin guardar archivos completos en
+memoria ni en disco: la memoria depende de la ventana, no del tamaño del curso.
+"""
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from services.storage import open_s3_object, submission_object_names
+from core.config import S3_BUCKET_TASKS, ARCHIVE_PREFETCH_WINDOW, ARCHIVE_CHUNK_SIZE, ARCHIVE_COMPRESSLEVEL
+
+MISSING_FILES_NAME = "faltantes.txt"
+# Por encima de este tamaño la entrada se escribe con ZIP64 (el límite de ZIP clásico es 4 GiB)
+_ZIP64_THRESHOLD = zipfile.ZIP64_LIMIT // 2
+
+class _Sink:
+    """Destino de zipfile sin seek: acumula los bytes hasta que el generador los entrega."""
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+def _safe_name(name: str):
+    name = name.replace('/', '_').replace('\\', '_').strip()
+    return '_' if name in ('', '.', '..') else name
+
+def _safe_path(path: str):
+    """Ruta relativa dentro de la carpeta del estudiante: sin '.', '..' ni partes vacías (evita zip-slip)."""
+    parts = [_safe_name(part) for part in path.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    return '/'.join(parts) or '_'
+
+def task_archive_entries(submissions: list, students: dict):
+    """
+    [(ruta en el ZIP, clave del objeto)] de cada archivo entregado, con una carpeta
+    por estudiante (su nombre; se añade el user_id si dos estudiantes se llaman igual).
+    `students` es {user_id: usuario}; los usuarios eliminados quedan con su user_id.
+    """
+    names = {}
+    for submission in submissions:
+        student = students.get(submission['user_id'])
+        names[submission['user_id']] = _safe_name(student['nombre']) if student else submission['user_id']
+    repeated = {name for name, count in Counter(names.values()).items() if count > 1}
+
+    entries = []
+    for submission in sorted(submissions, key=lambda s: (names[s['user_id']].lower(), s['user_id'])):
+        user_id = submission['user_id']
+        folder = names[user_id] if names[user_id] not in repeated else f"{names[user_id]} ({user_id})"
+        prefix = f"entregas/{submission['subject_id']}/{submission['task_id']}/{user_id}/"
+        for object_name in submission_object_names(submission):
+            file_name = object_name[len(prefix):] if object_name.startswith(prefix) else object_name.rsplit('/', 1)[-1]
+            entries.append((f"{folder}/{_safe_path(file_name)}", object_name))
+    return entries
+
+def _prefetch(object_name: str):
+    """Abre el objeto y lee su primer bloque. None si el objeto no existe."""
+    opened = open_s3_object(S3_BUCKET_TASKS, object_name)
+    if opened is None:
+        return None
+    size, body = opened
+    try:
+        return size, body, body.read(ARCHIVE_CHUNK_SIZE)
+    except BaseException:
+        body.close()
+        raise
+
+def _discard(future):
+    """Cierra el objeto de una descarga anticipada que ya no se va a usar."""
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result()[1].close()
+
+def iter_zip(entries: list):
+    """
+    Genera el ZIP de `entries` [(ruta en el ZIP, clave del objeto)] por bloques de bytes.
+    Las entregas registradas cuyo archivo no llegó a subirse se listan en faltantes.txt.
+    """
+    sink = _Sink()
+    missing = []
+    remaining = iter(entries)
+    pending = deque()
+    pool = ThreadPoolExecutor(max_workers=ARCHIVE_PREFETCH_WINDOW, thread_name_prefix="archive")
+
+    def refill():
+        while len(pending) < ARCHIVE_PREFETCH_WINDOW:
+            entry = next(remaining, None)
+            if entry is None:
+                return
+            pending.append((entry[0], pool.submit(_prefetch, entry[1])))
+
+    try:
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=ARCHIVE_COMPRESSLEVEL) as archive:
+            refill()
+            while pending:
+                arcname, future = pending.popleft()
+                refill()
+                fetched = future.result()
+                if fetched is None:
+                    missing.append(arcname)
+                    continue
+                size, body, chunk = fetched
+                try:
+                    with archive.open(arcname, 'w', force_zip64=size > _ZIP64_THRESHOLD) as entry:
+                        while chunk:
+                            entry.write(chunk)
+                            if sink.size >= ARCHIVE_CHUNK_SIZE:
+                                yield sink.take()
+                            chunk = body.read(ARCHIVE_CHUNK_SIZE)
+                finally:
+                    body.close()
+            if missing:
+                archive.writestr(MISSING_FILES_NAME, "\n".join(missing) + "\n")
+        yield sink.take()
+    finally:
+        # Cliente desconectado o error: se descartan las descargas anticipadas
+        for _, future in pending:
+            future.add_done_callback(_discard)
+        pool.shutdown(wait=False, cancel_futures=True)
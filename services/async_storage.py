@@ -0,0 +1,123 @@
+"""
+Contraparte asíncrona de services/storage.py, con los mismos nombres de función.
+
+Cada llamada se ejecuta en un pool de hilos propio (no en el threadpool de
+Starlette), de modo que los endpoints `async def` pueden lanzar lecturas
+independientes en paralelo con asyncio.gather. Un semáforo limita las llamadas
+simultáneas a ASYNC_STORAGE_MAX_CONCURRENCY para no saturar DynamoDB.
+La API síncrona de services/storage.py sigue disponible para scripts.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from services import profiling, storage
+from services.singleflight import AsyncSingleFlight, call_key
+from core.config import ASYNC_STORAGE_MAX_CONCURRENCY
+
+_executor = ThreadPoolExecutor(max_workers=ASYNC_STORAGE_MAX_CONCURRENCY, thread_name_prefix="storage")
+# Un semáforo por event loop: asyncio.Semaphore queda ligado al loop en el que se usa
+_semaphores = weakref.WeakKeyDictionary()
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(ASYNC_STORAGE_MAX_CONCURRENCY)
+    return semaphore
+
+async def run_sync(func, *args, **kwargs):
+    """Ejecuta una función síncrona de acceso a datos en el pool, respetando el límite de concurrencia."""
+    async with _semaphore():
+        loop = asyncio.get_running_loop()
+        # Se propaga el contexto (contextvars) de la petición al hilo de trabajo
+        call = functools.partial(contextvars.copy_context().run, profiling.bind(func), *args, **kwargs)
+        return await loop.run_in_executor(_executor, call)
+
+_EXHAUSTED = object()
+
+async def iterate(iterator):
+    """
+    Recorre un iterador síncrono (p. ej. iter_query_pages) sin bloquear el bucle
+    de eventos: cada next() se ejecuta en el pool. Útil para respuestas en streaming.
+    """
+    iterator = iter(iterator)
+    while True:
+        value = await run_sync(next, iterator, _EXHAUSTED)
+        if value is _EXHAUSTED:
+            return
+        yield value
+
+@contextlib.asynccontextmanager
+async def open_in_pool(manager):
+    """
+    Versión asíncrona de un context manager síncrono (p. ej. open_for_write):
+    la entrada y la salida se ejecutan en el pool. Lo que devuelve se usa
+    también con run_sync.
+    """
+    value = await run_sync(manager.__enter__)
+    try:
+        yield value
+    except BaseException as e:
+        if not await run_sync(manager.__exit__, type(e), e, e.__traceback__):
+            raise
+    else:
+        await run_sync(manager.__exit__, None, None, None)
+
+def _async_version(name, coalesce=False):
+    """
+    Crea la versión asíncrona de storage.<name>; la función se resuelve en cada llamada.
+    Con coalesce=True las llamadas simultáneas con los mismos argumentos comparten
+    una sola ejecución (services/singleflight.py) antes de ocupar un hilo del pool.
+    Las lecturas por clave (get_item) se agrupan ya en services/storage.py, que
+    además descarta la lectura en curso cuando se escribe esa clave.
+    """
+    flight = AsyncSingleFlight(f"async:{name}") if coalesce else None
+    async def wrapper(*args, **kwargs):
+        func = getattr(storage, name)
+        key = call_key(args, kwargs) if flight else None
+        if key is None:
+            return await run_sync(func, *args, **kwargs)
+        return await flight.do(key, run_sync, func, *args, **kwargs)
+    functools.update_wrapper(wrapper, getattr(storage, name))
+    return wrapper
+
+# --- Funciones de S3 ---
+create_presigned_url = _async_version('create_presigned_url')
+create_presigned_urls = _async_version('create_presigned_urls')
+delete_s3_object = _async_version('delete_s3_object')
+delete_s3_objects = _async_version('delete_s3_objects')
+start_multipart_upload = _async_version('start_multipart_upload')
+create_presigned_part_urls = _async_version('create_presigned_part_urls')
+complete_multipart_upload = _async_version('complete_multipart_upload')
+abort_multipart_upload = _async_version('abort_multipart_upload')
+
+# --- Funciones de DynamoDB ---
+get_item = _async_version('get_item')
+scan_items = _async_version('scan_items')
+put_item = _async_version('put_item')
+put_item_if_absent = _async_version('put_item_if_absent')
+delete_item = _async_version('delete_item')
+scan_page = _async_version('scan_page')
+batch_get_items = _async_version('batch_get_items')
+batch_get_map = _async_version('batch_get_map')
+
+get_task_by_id_from_db = _async_version('get_task_by_id_from_db')
+is_student_enrolled = _async_version('is_student_enrolled')
+get_student_subjects = _async_version('get_student_subjects')
+get_tasks_for_subject = _async_version('get_tasks_for_subject', coalesce=True)
+get_tasks_due_between = _async_version('get_tasks_due_between')
+get_overdue_tasks_closing_between = _async_version('get_overdue_tasks_closing_between')
+get_students_for_subject = _async_version('get_students_for_subject')
+get_submission = _async_version('get_submission')
+get_submissions_for_student = _async_version('get_submissions_for_student')
+create_submission_db = _async_version('create_submission_db')
+delete_submission_db = _async_version('delete_submission_db')
+get_subjects_by_teacher = _async_version('get_subjects_by_teacher', coalesce=True)
+get_submissions_for_task = _async_version('get_submissions_for_task')
+get_submission_dates_for_task = _async_version('get_submission_dates_for_task')
+get_student_subject_items = _async_version('get_student_subject_items')
+get_task_roster = _async_version('get_task_roster')
@@ -3,8 +3,11 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import List
+import hashlib
+import time
 from models.schemas import TokenData, Role
-from core.config import SECRET_KEY, ALGORITHM
+from services.cache import TTLCache, MISSING
+from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, TOKEN_CACHE_MAXSIZE
 
 # Ya no se necesita passlib. Se mantiene OAuth2PasswordBearer para la estructura de seguridad.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login/select-user")
@@ -19,8 +22,12 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Esta función no cambia. Sigue decodificando el token para proteger los endpoints."""
+# Tokens ya verificados, indexados por su digest y con expiración en el `exp` del propio token.
+# Evita repetir la verificación HMAC y la construcción de TokenData en cada petición.
+_verified_tokens = TTLCache(TOKEN_CACHE_MAXSIZE, ttl=0, name="tokens")
+
+def decode_token(token: str):
+    """Verifica y decodifica un JWT. Devuelve (TokenData, exp) o lanza la excepción 401."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -35,8 +42,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(user_id=user_id, rol=Role(rol))
     except (JWTError, ValueError):
         raise credentials_exception
+    return token_data, payload.get("exp")
+
+def verify_token(token: str):
+    """Como decode_token, pero reutiliza el resultado de tokens ya verificados mientras no expiren."""
+    digest = hashlib.sha256(token.encode()).digest()
+    token_data = _verified_tokens.get(digest)
+    if token_data is not MISSING:
+        return token_data
+    token_data, exp = decode_token(token)
+    if exp is not None:
+        _verified_tokens.set(digest, token_data, ttl=exp - time.time())
     return token_data
 
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Sigue validando el token para proteger los endpoints.
+    FastAPI resuelve esta dependencia una sola vez por petición aunque la pidan
+    varios dependientes (p. ej. role_checker y el parámetro current_user).
+    """
+    return verify_token(token)
+
 def role_checker(required_roles: List[Role]):
     """Esta función no cambia. Sigue verificando los roles."""
     def check_user_role(current_user: TokenData = Depends(get_current_user)):
@@ -0,0 +1,26 @@
+"""
+Backends de almacenamiento intercambiables (STORAGE_BACKEND y OBJECT_STORE en core/config.py).
+
+- Tablas: DynamoDB (por defecto) o SQLite embebido con índices equivalentes a los GSIs.
+- Archivos: S3 (por defecto) o el disco local con URLs de subida firmadas por la API.
+"""
+from services.backends.base import TableBackend, ObjectStore
+from core.config import STORAGE_BACKEND, SQLITE_PATH, OBJECT_STORE, OBJECT_STORE_PATH, OBJECT_STORE_BASE_URL
+
+def create_table_backend(name: str = STORAGE_BACKEND):
+    if name == "dynamodb":
+        from services.backends.dynamodb import DynamoDBBackend
+        return DynamoDBBackend()
+    if name == "sqlite":
+        from services.backends.sqlite import SQLiteBackend
+        return SQLiteBackend(SQLITE_PATH)
+    raise ValueError(f"STORAGE_BACKEND desconocido: {name}")
+
+def create_object_store(name: str = OBJECT_STORE):
+    if name == "s3":
+        from services.backends.s3 import S3ObjectStore
+        return S3ObjectStore()
+    if name == "filesystem":
+        from services.backends.filesystem import FilesystemObjectStore
+        return FilesystemObjectStore(OBJECT_STORE_PATH, OBJECT_STORE_BASE_URL)
+    raise ValueError(f"OBJECT_STORE desconocido: {name}")
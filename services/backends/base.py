@@ -0,0 +1,128 @@
+"""
+Interfaces de los backends de almacenamiento.
+
+services/storage.py implementa la caché, la de-duplicación de lotes, la
+paginación y la lógica de negocio una sola vez; los backends solo aportan las
+operaciones básicas con la semántica de DynamoDB (items como dicts, números
+como Decimal, claves por tabla según services/tables.py).
+"""
+
+class TableBackend:
+    """Operaciones sobre tablas. Los argumentos con nombre siguen a boto3 (Table.scan/query)."""
+    name = ""
+    # True si el backend resuelve las vistas de estudiante/docente con joins nativos
+    supports_joins = False
+
+    def prewarm(self):
+        """Abre conexiones y resuelve credenciales antes de la primera petición (opcional)."""
+
+    def get_item(self, table_name: str, key: dict):
+        """Devuelve el item o None."""
+        raise NotImplementedError
+
+    def put_item(self, table_name: str, item: dict, if_absent: bool = False):
+        """Escribe el item. Con if_absent=True no sobrescribe y devuelve False si la clave ya existía."""
+        raise NotImplementedError
+
+    def delete_item(self, table_name: str, key: dict):
+        raise NotImplementedError
+
+    def update_item_paths(self, table_name: str, key: dict, set_paths: dict = None, remove_paths: list = None):
+        """
+        Asigna/elimina rutas anidadas (tuplas de nombres) de un item existente.
+        Devuelve False si el item no existe o falta una ruta intermedia.
+        """
+        raise NotImplementedError
+
+    def append_to_list(self, table_name: str, key: dict, list_name: str, values: list, set_values: dict = None, defaults: dict = None):
+        """
+        Añade `values` al final de la lista `list_name` de forma atómica, creando el
+        item si no existe. También asigna `set_values` y, solo si aún no tienen
+        valor, `defaults`. No escribe nada y devuelve False si alguno de `values`
+        ya está en la lista; con `values` vacío la escritura es incondicional.
+        """
+        raise NotImplementedError
+
+    def scan(self, table_name: str, **kwargs):
+        """Una página de Scan: {'Items': [...], 'LastEvaluatedKey': ...} (Limit, ExclusiveStartKey, FilterExpression)."""
+        raise NotImplementedError
+
+    def query(self, table_name: str, **kwargs):
+        """Una página de Query: KeyConditionExpression e IndexName además de los argumentos de scan."""
+        raise NotImplementedError
+
+    def batch_get(self, table_name: str, keys: list):
+        """Items de las claves indicadas (sin repetir); las inexistentes no aparecen."""
+        raise NotImplementedError
+
+    def batch_write(self, table_name: str, requests: list):
+        """
+        Aplica peticiones PutRequest/DeleteRequest (formato de BatchWriteItem).
+        Devuelve las que no se pudieron escribir.
+        """
+        raise NotImplementedError
+
+    # --- Joins (solo si supports_joins) ---
+    def student_subjects(self, user_id: str):
+        """Materias en las que está inscrito el estudiante."""
+        raise NotImplementedError
+
+    def task_roster(self, task_id: str, subject_id: str):
+        """Pares (usuario, entrega o None) de los inscritos en la materia y de quienes entregaron la tarea."""
+        raise NotImplementedError
+
+
+class ObjectStore:
+    """Almacén de archivos de las entregas (S3 o equivalente)."""
+    name = ""
+
+    def prewarm(self):
+        """Abre conexiones y resuelve credenciales antes de la primera petición (opcional)."""
+
+    def create_presigned_url(self, bucket_name: str, object_name: str, content_type: str, expiration: int):
+        """URL para subir (PUT) un objeto con ese Content-Type, o None si falla."""
+        raise NotImplementedError
+
+    def create_presigned_urls(self, bucket_name: str, objects: list, expiration: int):
+        """URLs de subida de varios pares (object_name, content_type), en orden, o None si alguna falla."""
+        urls = [self.create_presigned_url(bucket_name, name, content_type, expiration) for name, content_type in objects]
+        return None if None in urls else urls
+
+    # --- Subidas multiparte ---
+    def create_multipart_upload(self, bucket_name: str, object_name: str, content_type: str):
+        """Inicia una subida multiparte y devuelve su upload_id, o None si falla."""
+        raise NotImplementedError
+
+    def create_presigned_part_urls(self, bucket_name: str, object_name: str, upload_id: str, part_numbers: list, expiration: int):
+        """URLs de subida (PUT) de las partes indicadas, en orden, o None si falla."""
+        raise NotImplementedError
+
+    def complete_multipart_upload(self, bucket_name: str, object_name: str, upload_id: str, parts: list):
+        """
+        Une las partes [(part_number, etag)] en el objeto final. Devuelve False si la
+        subida no existe o alguna parte falta, no coincide o es demasiado pequeña.
+        """
+        raise NotImplementedError
+
+    def abort_multipart_upload(self, bucket_name: str, object_name: str, upload_id: str):
+        """Descarta la subida y sus partes. True si se descartó (o ya no existía)."""
+        raise NotImplementedError
+
+    def open_object(self, bucket_name: str, object_name: str):
+        """
+        Abre un objeto para leerlo por bloques: (tamaño, flujo con read(n) y close()).
+        None si no existe o no se pudo abrir.
+        """
+        raise NotImplementedError
+
+    def delete_object(self, bucket_name: str, object_name: str):
+        """True si se eliminó (o no existía), False si hubo un error."""
+        raise NotImplementedError
+
+    def delete_objects(self, bucket_name: str, object_names: list):
+        """Elimina varios objetos; devuelve cuántos no se pudieron eliminar."""
+        return sum(0 if self.delete_object(bucket_name, name) else 1 for name in object_names)
+
+    def iter_key_pages(self, bucket_name: str, prefix: str):
+        """Genera listas de claves bajo un prefijo, página a página."""
+        raise NotImplementedError
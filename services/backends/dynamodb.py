@@ -0,0 +1,219 @@
+"""
+Backend de tablas sobre Amazon DynamoDB (boto3).
+
+Los lotes se reparten en bloques del tamaño máximo de cada operación, se envían
+en paralelo y reintentan UnprocessedKeys/UnprocessedItems y el throttling con
+backoff exponencial.
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+from services.backends.base import TableBackend
+from services.metrics import instrument_client
+from services.tables import TABLE_DEFINITIONS
+from core.config import (
+    AWS_REGION, AWS_ENDPOINT_URL, BATCH_GET_MAX_KEYS, BATCH_WRITE_MAX_ITEMS,
+    BATCH_MAX_RETRIES, BATCH_MAX_WORKERS, BATCH_RETRY_BASE_DELAY
+)
+
+logger = logging.getLogger(__name__)
+_THROTTLING_ERRORS = {'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded'}
+# Pool de los bloques de los lotes, compartido por todas las llamadas y creado en el primer uso
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="dynamodb-batch")
+    return _executor
+
+def _map_parallel(func, chunks: list):
+    """
+    Aplica func a cada bloque en hilos (hasta BATCH_MAX_WORKERS) y devuelve los
+    resultados en orden. Cada hilo recibe una copia del contexto de la petición
+    para que sus llamadas se atribuyan a ella (métricas); el último bloque se
+    procesa en el hilo que llama.
+    """
+    executor = _get_executor() if len(chunks) > 1 else None
+    futures = [executor.submit(contextvars.copy_context().run, func, chunk) for chunk in chunks[:-1]]
+    last = func(chunks[-1])
+    return [future.result() for future in futures] + [last]
+
+class DynamoDBBackend(TableBackend):
+    name = "dynamodb"
+
+    def __init__(self):
+        self.resource = boto3.resource('dynamodb', region_name=AWS_REGION, endpoint_url=AWS_ENDPOINT_URL)
+        instrument_client(self.resource.meta.client)
+        self._tables = {}
+
+    def _table(self, table_name: str):
+        """Table de boto3, creada una sola vez por tabla (construirla carga el modelo del recurso)."""
+        table = self._tables.get(table_name)
+        if table is None:
+            table = self._tables.setdefault(table_name, self.resource.Table(table_name))
+        return table
+
+    def prewarm(self):
+        for table_name in TABLE_DEFINITIONS:
+            self._table(table_name)
+        # Primera llamada real: credenciales, resolución del endpoint y conexión TLS del pool
+        try:
+            self.resource.meta.client.describe_endpoints()
+        except (ClientError, BotoCoreError) as e:
+            logger.warning("DynamoDB: no se pudo precalentar la conexión: %s", e)
+
+    def get_item(self, table_name, key):
+        return self._table(table_name).get_item(Key=key).get('Item')
+
+    def put_item(self, table_name, item, if_absent=False):
+        if not if_absent:
+            self._table(table_name).put_item(Item=item)
+            return True
+        try:
+            self._table(table_name).put_item(
+                Item=item, ConditionExpression='attribute_not_exists(#k)',
+                ExpressionAttributeNames={'#k': TABLE_DEFINITIONS[table_name]['key'][0][0]}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+    def delete_item(self, table_name, key):
+        self._table(table_name).delete_item(Key=key)
+
+    def append_to_list(self, table_name, key, list_name, values, set_values=None, defaults=None):
+        names, expression_values = {'#l': list_name}, {':new': list(values), ':empty': []}
+        assignments = ["#l = list_append(if_not_exists(#l, :empty), :new)"]
+        for i, (name, value) in enumerate((set_values or {}).items()):
+            names[f"#s{i}"], expression_values[f":s{i}"] = name, value
+            assignments.append(f"#s{i} = :s{i}")
+        for i, (name, value) in enumerate((defaults or {}).items()):
+            names[f"#d{i}"], expression_values[f":d{i}"] = name, value
+            assignments.append(f"#d{i} = if_not_exists(#d{i}, :d{i})")
+        conditions = []
+        for i, value in enumerate(values):
+            expression_values[f":c{i}"] = value
+            conditions.append(f"NOT contains(#l, :c{i})")
+        kwargs = {'ConditionExpression': " AND ".join(conditions)} if conditions else {}
+        try:
+            self._table(table_name).update_item(
+                Key=key, UpdateExpression="SET " + ", ".join(assignments),
+                ExpressionAttributeNames=names, ExpressionAttributeValues=expression_values, **kwargs
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+    def update_item_paths(self, table_name, key, set_paths=None, remove_paths=None):
+        names, values = {}, {}
+        def path_expression(path):
+            placeholders = []
+            for part in path:
+                placeholder = f"#p{len(names)}"
+                names[placeholder] = part
+                placeholders.append(placeholder)
+            return ".".join(placeholders)
+
+        clauses = []
+        if set_paths:
+            assignments = []
+            for path, value in set_paths.items():
+                placeholder = f":v{len(values)}"
+                values[placeholder] = value
+                assignments.append(f"{path_expression(path)} = {placeholder}")
+            clauses.append("SET " + ", ".join(assignments))
+        if remove_paths:
+            clauses.append("REMOVE " + ", ".join(path_expression(path) for path in remove_paths))
+        key_name = path_expression((TABLE_DEFINITIONS[table_name]['key'][0][0],))
+        kwargs = {'ExpressionAttributeValues': values} if values else {}
+        try:
+            self._table(table_name).update_item(
+                Key=key, UpdateExpression=" ".join(clauses), ExpressionAttributeNames=names,
+                ConditionExpression=f"attribute_exists({key_name})", **kwargs
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('ConditionalCheckFailedException', 'ValidationException'):
+                return False
+            raise
+        return True
+
+    def scan(self, table_name, **kwargs):
+        return self._table(table_name).scan(**kwargs)
+
+    def query(self, table_name, **kwargs):
+        return self._table(table_name).query(**kwargs)
+
+    # --- Lotes ---
+    def _batch_get_chunk(self, table_name: str, keys: list):
+        """
+        Ejecuta BatchGetItem para un bloque de claves. Las claves devueltas en
+        UnprocessedKeys y los errores de throttling se reintentan con backoff
+        exponencial hasta BATCH_MAX_RETRIES veces.
+        """
+        items = []
+        request = {table_name: {'Keys': keys}}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            try:
+                response = self.resource.batch_get_item(RequestItems=request)
+            except ClientError as e:
+                if e.response['Error']['Code'] not in _THROTTLING_ERRORS or attempt == BATCH_MAX_RETRIES:
+                    raise
+            else:
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                request = response.get('UnprocessedKeys') or {}
+                if not request:
+                    return items
+            time.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+        logger.warning("BatchGetItem: claves sin procesar en %s tras %d reintentos", table_name, BATCH_MAX_RETRIES)
+        return items
+
+    def batch_get(self, table_name, keys):
+        """Bloques de BATCH_GET_MAX_KEYS pedidos en paralelo."""
+        chunks = [keys[i:i + BATCH_GET_MAX_KEYS] for i in range(0, len(keys), BATCH_GET_MAX_KEYS)]
+        if not chunks:
+            return []
+        results = _map_parallel(lambda chunk: self._batch_get_chunk(table_name, chunk), chunks)
+        return [item for chunk_items in results for item in chunk_items]
+
+    def _batch_write_chunk(self, table_name: str, requests: list):
+        """
+        Ejecuta BatchWriteItem para un bloque de hasta BATCH_WRITE_MAX_ITEMS peticiones
+        (PutRequest/DeleteRequest). UnprocessedItems y el throttling se reintentan con
+        backoff exponencial. Devuelve las peticiones que no se pudieron escribir.
+        """
+        request = {table_name: requests}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            try:
+                response = self.resource.batch_write_item(RequestItems=request)
+            except ClientError as e:
+                if e.response['Error']['Code'] not in _THROTTLING_ERRORS or attempt == BATCH_MAX_RETRIES:
+                    raise
+            else:
+                request = response.get('UnprocessedItems') or {}
+                if not request:
+                    return []
+            time.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+        logger.warning("BatchWriteItem: items sin procesar en %s tras %d reintentos", table_name, BATCH_MAX_RETRIES)
+        return request.get(table_name, [])
+
+    def batch_write(self, table_name, requests):
+        """Bloques de BATCH_WRITE_MAX_ITEMS enviados en paralelo."""
+        chunks = [requests[i:i + BATCH_WRITE_MAX_ITEMS] for i in range(0, len(requests), BATCH_WRITE_MAX_ITEMS)]
+        if not chunks:
+            return []
+        results = _map_parallel(lambda chunk: self._batch_write_chunk(table_name, chunk), chunks)
+        return [request for chunk_failed in results for request in chunk_failed]
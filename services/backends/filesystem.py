@@ -0,0 +1,225 @@
+"""
+Almacén de archivos en el disco local, para despliegues de un solo nodo.
+
+Sustituye a las URLs prefirmadas de S3 por URLs firmadas con HMAC que apuntan
+al endpoint PUT /local-objects/{bucket}/{key} de la propia API (main.py). La
+firma cubre el método, el bucket, la clave, el Content-Type y la caducidad, así
+que una URL solo sirve para subir ese archivo con ese tipo hasta que caduca.
+
+Las subidas multiparte imitan a S3: cada parte se guarda aparte en
+{root}/.multipart/{upload_id}/, su ETag es el MD5 del contenido y al completar
+las partes se comprueban y se concatenan en el objeto final.
+"""
+import contextlib
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from urllib.parse import quote, urlencode
+
+from services.backends.base import ObjectStore
+from core.config import SECRET_KEY, MULTIPART_PART_SIZE_MIN
+
+_LIST_PAGE_SIZE = 1000 # Como list_objects_v2
+
+class _PartWriter:
+    """Escribe una parte calculando su MD5 a la vez."""
+    def __init__(self, f):
+        self._file = f
+        self._digest = hashlib.md5()
+
+    def write(self, chunk: bytes):
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    @property
+    def etag(self):
+        return f'"{self._digest.hexdigest()}"'
+
+class FilesystemObjectStore(ObjectStore):
+    name = "filesystem"
+
+    def __init__(self, root: str, base_url: str, secret: str = SECRET_KEY):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip('/')
+        self._secret = secret.encode()
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, bucket_name: str, object_name: str):
+        """Ruta del objeto en disco. Lanza ValueError si la clave intenta salir del bucket."""
+        bucket_root = os.path.join(self.root, bucket_name)
+        path = os.path.abspath(os.path.join(bucket_root, object_name))
+        if '..' in object_name.split('/') or not path.startswith(bucket_root + os.sep):
+            raise ValueError(f"Clave de objeto no válida: {object_name}")
+        return path
+
+    # --- URLs firmadas ---
+    def _signature(self, bucket_name: str, object_name: str, content_type: str, expires: int):
+        message = "\n".join(("PUT", bucket_name, object_name, content_type, str(expires)))
+        return hmac.new(self._secret, message.encode(), hashlib.sha256).hexdigest()
+
+    def create_presigned_url(self, bucket_name, object_name, content_type, expiration):
+        expires = int(time.time()) + expiration
+        query = urlencode({'expires': expires, 'signature': self._signature(bucket_name, object_name, content_type, expires)})
+        return f"{self.base_url}/local-objects/{quote(bucket_name)}/{quote(object_name)}?{query}"
+
+    def verify(self, bucket_name: str, object_name: str, content_type: str, expires: int, signature: str):
+        """True si la firma corresponde a esa subida y no ha caducado."""
+        if expires < time.time():
+            return False
+        expected = self._signature(bucket_name, object_name, content_type, expires)
+        return hmac.compare_digest(expected, signature)
+
+    def _part_signature(self, bucket_name: str, object_name: str, upload_id: str, part_number: int, expires: int):
+        # Como en UploadPart de S3, el Content-Type de las partes no forma parte de la firma
+        message = "\n".join(("PUT-PART", bucket_name, object_name, upload_id, str(part_number), str(expires)))
+        return hmac.new(self._secret, message.encode(), hashlib.sha256).hexdigest()
+
+    def verify_part(self, bucket_name: str, object_name: str, upload_id: str, part_number: int, expires: int, signature: str):
+        if expires < time.time():
+            return False
+        expected = self._part_signature(bucket_name, object_name, upload_id, part_number, expires)
+        return hmac.compare_digest(expected, signature)
+
+    # --- Objetos ---
+    @contextlib.contextmanager
+    def open_for_write(self, bucket_name: str, object_name: str):
+        """
+        Archivo donde escribir el objeto. Se escribe en un temporal del mismo
+        directorio y se renombra al salir, así nunca queda un archivo a medias.
+        """
+        path = self.path_for(bucket_name, object_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                yield f
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    # --- Subidas multiparte ---
+    def _upload_dir(self, upload_id: str):
+        if not upload_id.isalnum():
+            raise ValueError(f"upload_id no válido: {upload_id}")
+        return os.path.join(self.root, '.multipart', upload_id)
+
+    def has_upload(self, bucket_name: str, object_name: str, upload_id: str):
+        """True si la subida existe y es de ese objeto."""
+        try:
+            with open(os.path.join(self._upload_dir(upload_id), 'upload.json')) as f:
+                upload = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return upload['bucket'] == bucket_name and upload['key'] == object_name
+
+    def create_multipart_upload(self, bucket_name, object_name, content_type):
+        self.path_for(bucket_name, object_name) # Valida la clave
+        upload_id = uuid.uuid4().hex
+        directory = self._upload_dir(upload_id)
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'upload.json'), 'w') as f:
+            json.dump({'bucket': bucket_name, 'key': object_name, 'content_type': content_type}, f)
+        return upload_id
+
+    def create_presigned_part_urls(self, bucket_name, object_name, upload_id, part_numbers, expiration):
+        expires = int(time.time()) + expiration
+        base = f"{self.base_url}/local-objects/{quote(bucket_name)}/{quote(object_name)}"
+        return [
+            base + "?" + urlencode({
+                'uploadId': upload_id, 'partNumber': part_number, 'expires': expires,
+                'signature': self._part_signature(bucket_name, object_name, upload_id, part_number, expires),
+            })
+            for part_number in part_numbers
+        ]
+
+    @contextlib.contextmanager
+    def open_part_for_write(self, upload_id: str, part_number: int):
+        """
+        Como open_for_write, para una parte de una subida existente (has_upload).
+        Al salir, `etag` tiene el ETag de la parte: su MD5 entre comillas, como en S3.
+        """
+        directory = self._upload_dir(upload_id)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.part-')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                part = _PartWriter(f)
+                yield part
+            os.replace(temporary, os.path.join(directory, f"{part_number:05d}"))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        if not self.has_upload(bucket_name, object_name, upload_id):
+            return False
+        numbers = [number for number, _ in parts]
+        if not numbers or numbers != sorted(set(numbers)):
+            return False # InvalidPartOrder en S3
+        directory = self._upload_dir(upload_id)
+        paths = [os.path.join(directory, f"{number:05d}") for number in numbers]
+        try:
+            sizes = [os.path.getsize(path) for path in paths]
+        except OSError:
+            return False
+        if any(size < MULTIPART_PART_SIZE_MIN for size in sizes[:-1]):
+            return False # EntityTooSmall en S3
+        try:
+            with self.open_for_write(bucket_name, object_name) as target:
+                for path, (_, etag) in zip(paths, parts):
+                    digest = hashlib.md5()
+                    with open(path, 'rb') as part:
+                        while chunk := part.read(1024 * 1024):
+                            digest.update(chunk)
+                            target.write(chunk)
+                    if f'"{digest.hexdigest()}"' != etag and digest.hexdigest() != etag:
+                        raise ValueError("ETag de parte no coincide")
+        except ValueError:
+            return False
+        shutil.rmtree(directory, ignore_errors=True)
+        return True
+
+    def abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        try:
+            if self.has_upload(bucket_name, object_name, upload_id):
+                shutil.rmtree(self._upload_dir(upload_id))
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def open_object(self, bucket_name, object_name):
+        try:
+            f = open(self.path_for(bucket_name, object_name), 'rb')
+        except (OSError, ValueError):
+            return None
+        return os.fstat(f.fileno()).st_size, f
+
+    def delete_object(self, bucket_name, object_name):
+        try:
+            os.remove(self.path_for(bucket_name, object_name))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def iter_key_pages(self, bucket_name, prefix):
+        bucket_root = os.path.join(self.root, bucket_name)
+        page = []
+        for directory, _, files in os.walk(bucket_root):
+            for file_name in sorted(files):
+                if file_name.startswith('.upload-'):
+                    continue
+                key = os.path.relpath(os.path.join(directory, file_name), bucket_root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    page.append(key)
+                    if len(page) == _LIST_PAGE_SIZE:
+                        yield page
+                        page = []
+        if page:
+            yield page
@@ -0,0 +1,143 @@
+"""Almacén de archivos sobre Amazon S3 (URLs prefirmadas de boto3)."""
+import logging
+
+import boto3
+from botocore.exceptions import ClientError
+
+from services.backends.base import ObjectStore
+from services.metrics import instrument_client
+from core.config import AWS_REGION, AWS_ENDPOINT_URL, S3_BUCKET_TASKS, S3_DELETE_MAX_KEYS
+
+logger = logging.getLogger(__name__)
+
+class S3ObjectStore(ObjectStore):
+    name = "s3"
+
+    def __init__(self):
+        self.client = boto3.client('s3', region_name=AWS_REGION, endpoint_url=AWS_ENDPOINT_URL)
+        instrument_client(self.client)
+
+    def prewarm(self):
+        # Las firmas son locales: basta con resolver credenciales y endpoint una vez
+        self.create_presigned_url(S3_BUCKET_TASKS, "prewarm", "application/octet-stream", 60)
+
+    def create_presigned_url(self, bucket_name, object_name, content_type, expiration):
+        """
+        Genera una URL prefirmada explícitamente para subir un archivo (PUT),
+        incluyendo el Content-Type en la firma.
+        """
+        try:
+            return self.client.generate_presigned_url(
+                'put_object',
+                Params={'Bucket': bucket_name, 'Key': object_name, 'ContentType': content_type},
+                ExpiresIn=expiration,
+                HttpMethod='PUT'
+            )
+        except ClientError as e:
+            logger.warning("Error al generar URL prefirmada: %s", e)
+            return None
+
+    def create_presigned_urls(self, bucket_name, objects, expiration):
+        """Todas las firmas reutilizan el mismo cliente, con sus credenciales y su firmante ya resueltos."""
+        try:
+            return [
+                self.client.generate_presigned_url(
+                    'put_object',
+                    Params={'Bucket': bucket_name, 'Key': object_name, 'ContentType': content_type},
+                    ExpiresIn=expiration,
+                    HttpMethod='PUT'
+                )
+                for object_name, content_type in objects
+            ]
+        except ClientError as e:
+            logger.warning("Error al generar URLs prefirmadas: %s", e)
+            return None
+
+    def create_multipart_upload(self, bucket_name, object_name, content_type):
+        try:
+            response = self.client.create_multipart_upload(Bucket=bucket_name, Key=object_name, ContentType=content_type)
+            return response['UploadId']
+        except ClientError as e:
+            logger.warning("Error al iniciar la subida multiparte: %s", e)
+            return None
+
+    def create_presigned_part_urls(self, bucket_name, object_name, upload_id, part_numbers, expiration):
+        """
+        UploadPart firmado por parte. El navegador necesita leer la cabecera ETag de
+        cada respuesta: la configuración CORS del bucket debe exponerla (ExposeHeaders).
+        """
+        try:
+            return [
+                self.client.generate_presigned_url(
+                    'upload_part',
+                    Params={'Bucket': bucket_name, 'Key': object_name, 'UploadId': upload_id, 'PartNumber': part_number},
+                    ExpiresIn=expiration,
+                    HttpMethod='PUT'
+                )
+                for part_number in part_numbers
+            ]
+        except ClientError as e:
+            logger.warning("Error al generar URLs de partes: %s", e)
+            return None
+
+    def complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=bucket_name, Key=object_name, UploadId=upload_id,
+                MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': etag} for number, etag in parts]}
+            )
+            return True
+        except ClientError as e:
+            logger.warning("Error al completar la subida multiparte: %s", e)
+            return False
+
+    def abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        try:
+            self.client.abort_multipart_upload(Bucket=bucket_name, Key=object_name, UploadId=upload_id)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchUpload':
+                return True
+            logger.warning("Error al cancelar la subida multiparte: %s", e)
+            return False
+
+    def open_object(self, bucket_name, object_name):
+        """El cuerpo de GetObject se lee del socket a medida que se consume."""
+        try:
+            response = self.client.get_object(Bucket=bucket_name, Key=object_name)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('NoSuchKey', '404'):
+                logger.warning("Error al leer el objeto %s: %s", object_name, e)
+            return None
+        return response['ContentLength'], response['Body']
+
+    def delete_object(self, bucket_name, object_name):
+        try:
+            self.client.delete_object(Bucket=bucket_name, Key=object_name)
+            return True
+        except ClientError:
+            return False
+
+    def delete_objects(self, bucket_name, object_names):
+        """DeleteObjects en bloques de S3_DELETE_MAX_KEYS."""
+        errors = 0
+        for start in range(0, len(object_names), S3_DELETE_MAX_KEYS):
+            chunk = object_names[start:start + S3_DELETE_MAX_KEYS]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=bucket_name,
+                    Delete={'Objects': [{'Key': name} for name in chunk], 'Quiet': True}
+                )
+                errors += len(response.get('Errors', []))
+            except ClientError as e:
+                logger.warning("Error al eliminar objetos de S3: %s", e)
+                errors += len(chunk)
+        return errors
+
+    def iter_key_pages(self, bucket_name, prefix):
+        """Páginas de list_objects_v2 (hasta 1000 claves)."""
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            keys = [obj['Key'] for obj in page.get('Contents', [])]
+            if keys:
+                yield keys
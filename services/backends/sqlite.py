@@ -0,0 +1,358 @@
+"""
+Backend de tablas embebido en SQLite, para despliegues de un solo nodo.
+
+Cada tabla de services/tables.py es una tabla SQLite con una columna por
+atributo de clave (de la tabla y de sus GSIs) y el item completo en JSON.
+Los GSIs se reproducen como índices reales (user-subject-index,
+subject-tasks-index, user-task-index, task-index, teacher-index...), y las
+condiciones de clave de boto3 (Key(...).eq/between/...) se traducen a SQL sobre
+esas columnas. Las FilterExpression se evalúan en Python sobre cada página,
+como hace DynamoDB después de leer.
+
+Cada hilo usa su propia conexión; la base de datos está en modo WAL para que
+las lecturas no esperen a las escrituras.
+"""
+import json
+import sqlite3
+import threading
+from decimal import Decimal
+
+from services.backends.base import TableBackend
+from services.tables import TABLE_DEFINITIONS
+from core.config import (
+    DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS, DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS
+)
+
+_DEFAULT_PAGE_SIZE = 1000 # Equivalente aproximado al límite de 1 MB por página de DynamoDB
+# Claves por SELECT de batch_get: con claves de dos atributos quedan por debajo
+# del límite clásico de 999 parámetros de SQLite
+_BATCH_GET_CHUNK = 400
+_COMPARISONS = {'=': '=', '<>': '<>', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+def _quote(identifier: str):
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _encode_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Tipo no soportado: {type(value).__name__}")
+
+def _dumps(item: dict):
+    return json.dumps(item, default=_encode_default, ensure_ascii=False, separators=(',', ':'))
+
+def _loads(data: str):
+    # Como en boto3, todos los números se devuelven como Decimal
+    return json.loads(data, parse_float=Decimal, parse_int=Decimal)
+
+def _sql_value(value):
+    """Valor de una columna de clave (sqlite3 no acepta Decimal)."""
+    return _encode_default(value) if isinstance(value, Decimal) else value
+
+# --- Condiciones de boto3 ---
+def _condition_sql(condition, params: list):
+    """Traduce una KeyConditionExpression (Key(...)) a SQL sobre las columnas de clave."""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return f"({_condition_sql(values[0], params)} AND {_condition_sql(values[1], params)})"
+    column = _quote(values[0].name)
+    if operator in _COMPARISONS:
+        params.append(_sql_value(values[1]))
+        return f"{column} {_COMPARISONS[operator]} ?"
+    if operator == 'BETWEEN':
+        params.extend([_sql_value(values[1]), _sql_value(values[2])])
+        return f"{column} BETWEEN ? AND ?"
+    if operator == 'begins_with':
+        params.append(values[1])
+        return f"substr({column}, 1, {len(values[1])}) = ?"
+    raise ValueError(f"Condición de clave no soportada: {operator}")
+
+def _missing(item, name):
+    return name not in item
+
+def _matches(condition, item: dict):
+    """Evalúa una FilterExpression (Attr(...)) sobre un item."""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return _matches(values[0], item) and _matches(values[1], item)
+    if operator == 'OR':
+        return _matches(values[0], item) or _matches(values[1], item)
+    if operator == 'NOT':
+        return not _matches(values[0], item)
+    name = values[0].name
+    if operator == 'attribute_exists':
+        return not _missing(item, name)
+    if operator == 'attribute_not_exists':
+        return _missing(item, name)
+    if _missing(item, name):
+        return False
+    value = item[name]
+    try:
+        if operator == '=':
+            return value == values[1]
+        if operator == '<>':
+            return value != values[1]
+        if operator == '<':
+            return value < values[1]
+        if operator == '<=':
+            return value <= values[1]
+        if operator == '>':
+            return value > values[1]
+        if operator == '>=':
+            return value >= values[1]
+        if operator == 'BETWEEN':
+            return values[1] <= value <= values[2]
+        if operator == 'begins_with':
+            return isinstance(value, str) and value.startswith(values[1])
+        if operator == 'contains':
+            return values[1] in value
+    except TypeError:
+        return False # Tipos no comparables: DynamoDB tampoco devuelve el item
+    raise ValueError(f"Condición de filtro no soportada: {operator}")
+
+
+class SQLiteBackend(TableBackend):
+    name = "sqlite"
+    supports_joins = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._columns = {}
+        self._create_schema()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # isolation_level=None: las transacciones se abren explícitamente con BEGIN
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        connection = self._connection()
+        for table_name, definition in TABLE_DEFINITIONS.items():
+            column_types = dict(definition['key'])
+            for attributes in definition['indexes'].values():
+                for name, attribute_type in attributes:
+                    column_types.setdefault(name, attribute_type)
+            self._columns[table_name] = list(column_types)
+            columns = ", ".join(f"{_quote(name)} {'NUMERIC' if t == 'N' else 'TEXT'}" for name, t in column_types.items())
+            primary_key = ", ".join(_quote(name) for name, _ in definition['key'])
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(table_name)} ({columns}, item TEXT NOT NULL, PRIMARY KEY ({primary_key}))"
+            )
+            for index_name, attributes in definition['indexes'].items():
+                index_columns = ", ".join(_quote(name) for name, _ in attributes)
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(table_name + '.' + index_name)} ON {_quote(table_name)} ({index_columns})"
+                )
+
+    def _key_names(self, table_name: str):
+        return [name for name, _ in TABLE_DEFINITIONS[table_name]['key']]
+
+    def _key_where(self, table_name: str, key: dict):
+        names = self._key_names(table_name)
+        return " AND ".join(f"{_quote(name)} = ?" for name in names), [_sql_value(key[name]) for name in names]
+
+    def _row(self, table_name: str, item: dict):
+        return [_sql_value(item.get(name)) for name in self._columns[table_name]] + [_dumps(item)]
+
+    def _insert_sql(self, table_name: str, verb: str = "INSERT OR REPLACE"):
+        columns = self._columns[table_name]
+        names = ", ".join(_quote(name) for name in columns)
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        return f"{verb} INTO {_quote(table_name)} ({names}, item) VALUES ({placeholders})"
+
+    # --- CRUD ---
+    def get_item(self, table_name, key):
+        where, params = self._key_where(table_name, key)
+        row = self._connection().execute(f"SELECT item FROM {_quote(table_name)} WHERE {where}", params).fetchone()
+        return _loads(row[0]) if row else None
+
+    def put_item(self, table_name, item, if_absent=False):
+        if not if_absent:
+            self._connection().execute(self._insert_sql(table_name), self._row(table_name, item))
+            return True
+        try:
+            self._connection().execute(self._insert_sql(table_name, "INSERT"), self._row(table_name, item))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def delete_item(self, table_name, key):
+        where, params = self._key_where(table_name, key)
+        self._connection().execute(f"DELETE FROM {_quote(table_name)} WHERE {where}", params)
+
+    def append_to_list(self, table_name, key, list_name, values, set_values=None, defaults=None):
+        connection = self._connection()
+        where, params = self._key_where(table_name, key)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(f"SELECT item FROM {_quote(table_name)} WHERE {where}", params).fetchone()
+            item = _loads(row[0]) if row else dict(key)
+            current = item.get(list_name) or []
+            if any(value in current for value in values):
+                connection.execute("ROLLBACK")
+                return False
+            for name, value in (defaults or {}).items():
+                item.setdefault(name, value)
+            item.update(set_values or {})
+            item[list_name] = list(current) + list(values)
+            connection.execute(self._insert_sql(table_name), self._row(table_name, item))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return True
+
+    def update_item_paths(self, table_name, key, set_paths=None, remove_paths=None):
+        connection = self._connection()
+        where, params = self._key_where(table_name, key)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(f"SELECT item FROM {_quote(table_name)} WHERE {where}", params).fetchone()
+            if row is None:
+                connection.execute("ROLLBACK")
+                return False
+            item = _loads(row[0])
+            for path, value in (set_paths or {}).items():
+                parent = self._parent(item, path)
+                if parent is None:
+                    connection.execute("ROLLBACK")
+                    return False
+                parent[path[-1]] = value
+            for path in remove_paths or ():
+                parent = self._parent(item, path)
+                if parent is None:
+                    connection.execute("ROLLBACK")
+                    return False
+                parent.pop(path[-1], None)
+            connection.execute(self._insert_sql(table_name), self._row(table_name, item))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return True
+
+    @staticmethod
+    def _parent(item: dict, path: tuple):
+        """Mapa que contiene el último elemento de la ruta, o None si falta una ruta intermedia."""
+        node = item
+        for part in path[:-1]:
+            node = node.get(part) if isinstance(node, dict) else None
+            if node is None:
+                return None
+        return node if isinstance(node, dict) else None
+
+    # --- Scan y Query ---
+    def _page(self, table_name, conditions, params, order_columns, key_columns, kwargs):
+        """Lee una página ordenada por order_columns y la pagina con ExclusiveStartKey como DynamoDB."""
+        limit = kwargs.get('Limit') or _DEFAULT_PAGE_SIZE
+        start_key = kwargs.get('ExclusiveStartKey')
+        if start_key:
+            columns = ", ".join(_quote(name) for name in order_columns)
+            conditions = conditions + [f"({columns}) > ({', '.join('?' for _ in order_columns)})"]
+            params = params + [_sql_value(start_key[name]) for name in order_columns]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = ", ".join(_quote(name) for name in order_columns)
+        rows = self._connection().execute(
+            f"SELECT item FROM {_quote(table_name)} {where} ORDER BY {order} LIMIT ?", params + [limit]
+        ).fetchall()
+        items = [_loads(row[0]) for row in rows]
+        response = {}
+        if len(items) == limit:
+            last = items[-1]
+            response['LastEvaluatedKey'] = {name: last[name] for name in key_columns}
+        filter_expression = kwargs.get('FilterExpression')
+        if filter_expression is not None:
+            items = [item for item in items if _matches(filter_expression, item)]
+        response['Items'] = items
+        response['Count'] = len(items)
+        return response
+
+    def scan(self, table_name, **kwargs):
+        key_names = self._key_names(table_name)
+        conditions, params = [], []
+        if 'TotalSegments' in kwargs:
+            # Scan paralelo: los segmentos se reparten las filas por rowid
+            conditions.append("rowid % ? = ?")
+            params += [kwargs['TotalSegments'], kwargs['Segment']]
+        return self._page(table_name, conditions, params, key_names, key_names, kwargs)
+
+    def query(self, table_name, **kwargs):
+        params = []
+        conditions = [_condition_sql(kwargs['KeyConditionExpression'], params)]
+        table_key = self._key_names(table_name)
+        index_name = kwargs.get('IndexName')
+        if index_name:
+            index_key = [name for name, _ in TABLE_DEFINITIONS[table_name]['indexes'][index_name]]
+            # Como un GSI disperso: los items sin los atributos del índice no aparecen
+            conditions += [f"{_quote(name)} IS NOT NULL" for name in index_key]
+        else:
+            index_key = table_key
+        # Orden: clave de ordenación del índice y, para desempatar, la clave de la tabla
+        order_columns = index_key[1:] + [name for name in table_key if name not in index_key]
+        key_columns = list(dict.fromkeys(index_key + table_key))
+        response = self._page(table_name, conditions, params, order_columns or table_key, key_columns, kwargs)
+        if kwargs.get('ScanIndexForward') is False:
+            response['Items'].reverse()
+        return response
+
+    # --- Lotes ---
+    def batch_get(self, table_name, keys):
+        # Un SELECT por bloque: WHERE (k1, k2) IN (VALUES (?, ?), ...)
+        names = self._key_names(table_name)
+        columns = ", ".join(_quote(name) for name in names)
+        row = "(" + ", ".join("?" for _ in names) + ")"
+        connection = self._connection()
+        items = []
+        for start in range(0, len(keys), _BATCH_GET_CHUNK):
+            chunk = keys[start:start + _BATCH_GET_CHUNK]
+            params = [_sql_value(key[name]) for key in chunk for name in names]
+            rows = connection.execute(
+                f"SELECT item FROM {_quote(table_name)} WHERE ({columns}) IN (VALUES {', '.join(row for _ in chunk)})", params
+            ).fetchall()
+            items.extend(_loads(item) for item, in rows)
+        return items
+
+    def batch_write(self, table_name, requests):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for request in requests:
+                if 'PutRequest' in request:
+                    connection.execute(self._insert_sql(table_name), self._row(table_name, request['PutRequest']['Item']))
+                else:
+                    where, params = self._key_where(table_name, request['DeleteRequest']['Key'])
+                    connection.execute(f"DELETE FROM {_quote(table_name)} WHERE {where}", params)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return []
+
+    # --- Joins ---
+    def student_subjects(self, user_id):
+        rows = self._connection().execute(
+            f"SELECT s.item FROM {_quote(DYNAMODB_TABLE_ENROLLMENTS)} e "
+            f"JOIN {_quote(DYNAMODB_TABLE_SUBJECTS)} s ON s.subject_id = e.subject_id "
+            f"WHERE e.user_id = ?", [user_id]
+        ).fetchall()
+        return [_loads(row[0]) for row in rows]
+
+    def task_roster(self, task_id, subject_id):
+        rows = self._connection().execute(
+            f"SELECT u.item, sub.item FROM ("
+            f"  SELECT user_id FROM {_quote(DYNAMODB_TABLE_ENROLLMENTS)} WHERE subject_id = ?"
+            f"  UNION SELECT user_id FROM {_quote(DYNAMODB_TABLE_SUBMISSIONS)} WHERE task_id = ?"
+            f") ids JOIN {_quote(DYNAMODB_TABLE_USERS)} u ON u.user_id = ids.user_id "
+            f"LEFT JOIN {_quote(DYNAMODB_TABLE_SUBMISSIONS)} sub ON sub.task_id = ? AND sub.user_id = ids.user_id",
+            [subject_id, task_id, task_id]
+        ).fetchall()
+        return [(_loads(user), _loads(submission) if submission else None) for user, submission in rows]
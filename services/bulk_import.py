@@ -0,0 +1,174 @@
+"""
+Importación masiva de usuarios, materias e inscripciones desde CSV o NDJSON.
+
+El archivo se lee fila a fila (nunca entero en memoria), cada fila se valida con
+los modelos de models/schemas.py y las filas válidas se escriben con
+BatchWriteItem en bloques de 25 repartidos entre varios hilos. Al terminar se
+devuelve un informe con los errores por fila.
+
+Uso como script (desde la raíz del repositorio):
+    python -m services.bulk_import enrollments inscripciones.csv
+    python -m services.bulk_import users usuarios.ndjson --format ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+
+from pydantic import ValidationError
+
+from models.schemas import UserCreate, UserInDB, Subject, Enrollment, ImportKind
+from services.storage import batch_write_items, item_key
+from core.config import (
+    DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS, DYNAMODB_TABLE_ENROLLMENTS,
+    BATCH_WRITE_MAX_ITEMS, IMPORT_MAX_WORKERS, IMPORT_MAX_REPORTED_ERRORS
+)
+
+# --- Conversión fila -> item de DynamoDB ---
+def _user_item(row: dict):
+    if row.get('user_id'):
+        return UserInDB(**row).dict()
+    return UserInDB(user_id=str(uuid.uuid4()), **UserCreate(**row).dict()).dict()
+
+def _subject_item(row: dict):
+    subject = Subject(**{k: v for k, v in row.items() if v not in (None, '')})
+    subject.subject_id = subject.subject_id or str(uuid.uuid4())
+    # Igual que en POST /admin/subjects: no se guardan atributos nulos
+    return {k: v for k, v in subject.dict().items() if v is not None}
+
+def _enrollment_item(row: dict):
+    return Enrollment(**row).dict()
+
+_IMPORTERS = {
+    ImportKind.users: (DYNAMODB_TABLE_USERS, _user_item),
+    ImportKind.subjects: (DYNAMODB_TABLE_SUBJECTS, _subject_item),
+    ImportKind.enrollments: (DYNAMODB_TABLE_ENROLLMENTS, _enrollment_item),
+}
+
+# --- Lectura incremental ---
+def iter_rows(text_stream, fmt: str):
+    """Genera pares (número_de_fila, dict) leyendo el archivo de forma incremental."""
+    if fmt == 'csv':
+        reader = csv.DictReader(text_stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(text_stream, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, e
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+def detect_format(file_name: str):
+    return 'ndjson' if file_name and file_name.lower().endswith(('.ndjson', '.jsonl', '.json')) else 'csv'
+
+# --- Importación ---
+def _key_tuple(table_name: str, item: dict):
+    return tuple(sorted(item_key(table_name, item).items()))
+
+def import_rows(kind: ImportKind, rows, on_written=None):
+    """
+    Valida y escribe las filas de `rows` (pares número_de_fila, dict).
+    Mantiene como máximo IMPORT_MAX_WORKERS * 2 bloques en vuelo, de modo que la
+    memoria no depende del tamaño del archivo. Si se indica, on_written(items)
+    recibe (desde los hilos de escritura) los items escritos de cada bloque.
+    """
+    table_name, to_item = _IMPORTERS[ImportKind(kind)]
+    report = {"kind": ImportKind(kind).value, "rows": 0, "written": 0, "errors": [], "error_count": 0}
+
+    def add_error(row_number, message):
+        report["error_count"] += 1
+        if len(report["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": row_number, "error": message})
+
+    def write_chunk(chunk):
+        """Escribe un bloque; devuelve las filas que fallaron con su mensaje."""
+        try:
+            failed = batch_write_items(table_name, items=[item for _, item in chunk])
+        except Exception as e:
+            return [(row_number, f"Error al escribir: {e}") for row_number, _ in chunk]
+        failed_keys = {_key_tuple(table_name, request['PutRequest']['Item']) for request in failed}
+        if on_written is not None:
+            on_written([item for _, item in chunk if _key_tuple(table_name, item) not in failed_keys])
+        return [
+            (row_number, "No procesado por DynamoDB tras varios reintentos")
+            for row_number, item in chunk if _key_tuple(table_name, item) in failed_keys
+        ]
+
+    def collect(futures, return_when):
+        done, _ = wait(futures, return_when=return_when)
+        for future in done:
+            chunk_size, failures = futures.pop(future), future.result()
+            report["written"] += chunk_size - len(failures)
+            for row_number, message in failures:
+                add_error(row_number, message)
+
+    futures = {}
+    chunk = []
+    chunk_keys = set()
+    with ThreadPoolExecutor(max_workers=IMPORT_MAX_WORKERS) as executor:
+        for row_number, row in rows:
+            report["rows"] += 1
+            if isinstance(row, Exception):
+                add_error(row_number, f"JSON inválido: {row}")
+                continue
+            try:
+                item = to_item(row)
+            except (ValidationError, TypeError, ValueError) as e:
+                add_error(row_number, str(e))
+                continue
+            key = _key_tuple(table_name, item)
+            if key in chunk_keys:
+                # Una misma clave no puede ir dos veces en un BatchWriteItem: se envía lo acumulado
+                chunk_keys = set()
+                futures[executor.submit(write_chunk, chunk)] = len(chunk)
+                chunk = []
+            chunk.append((row_number, item))
+            chunk_keys.add(key)
+            if len(chunk) == BATCH_WRITE_MAX_ITEMS:
+                futures[executor.submit(write_chunk, chunk)] = len(chunk)
+                chunk, chunk_keys = [], set()
+                if len(futures) >= IMPORT_MAX_WORKERS * 2:
+                    collect(futures, FIRST_COMPLETED)
+        if chunk:
+            futures[executor.submit(write_chunk, chunk)] = len(chunk)
+        if futures:
+            collect(futures, ALL_COMPLETED)
+    return report
+
+def import_stream(kind: ImportKind, binary_stream, fmt: str, on_written=None):
+    """Importa desde un archivo binario (p. ej. el de un UploadFile) decodificándolo como UTF-8."""
+    text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    try:
+        return import_rows(kind, iter_rows(text_stream, fmt), on_written)
+    finally:
+        text_stream.detach()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importación masiva de datos de Minimoodle.")
+    parser.add_argument("kind", choices=[k.value for k in ImportKind])
+    parser.add_argument("path", help="Archivo CSV o NDJSON ('-' para la entrada estándar)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Por defecto se deduce de la extensión")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    # Las inscripciones nuevas necesitan su tablero (services/projections.py)
+    written_enrollments = []
+    on_written = written_enrollments.extend if args.kind == ImportKind.enrollments.value else None
+    if args.path == "-":
+        result = import_stream(args.kind, sys.stdin.buffer, fmt, on_written)
+    else:
+        with open(args.path, "rb") as f:
+            result = import_stream(args.kind, f, fmt, on_written)
+    if written_enrollments:
+        from services.projections import rebuild_boards
+        rebuild_boards([(en['user_id'], en['subject_id']) for en in written_enrollments])
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(1 if result["error_count"] else 0)
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Valor centinela: permite distinguir "no está en caché" de un valor None guardado
+MISSING = object()
+
+class TTLCache:
+    """
+    Caché LRU acotada con expiración por entrada, segura entre hilos.
+    Lleva contadores de aciertos, fallos, expulsiones (por tamaño) y
+    expiraciones (por TTL) para poder ajustarla bajo carga.
+
+    Cada clave tiene una generación que set() e invalidate() avanzan. Quien
+    rellena la caché tras un fallo toma generation() antes de leer la fuente y
+    guarda con set_if_unchanged(): si entre medias se escribió la clave, su
+    lectura (anterior a la escritura) se descarta en lugar de pisar el valor nuevo.
+    """
+    def __init__(self, maxsize: int, ttl: float, name: str = ""):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        # Generaciones de las últimas claves escritas (acotadas a maxsize). Al
+        # olvidar una, _floor sube a su generación: una clave sin generación
+        # propia tiene _floor, así que nunca parece intacta si se escribió después.
+        self._generations = OrderedDict()
+        self._clock = self._floor = 0
+
+    def get(self, key):
+        """Devuelve el valor guardado o MISSING si no existe o ya expiró."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """Guarda un valor; `ttl` (segundos) permite una expiración distinta a la por defecto."""
+        with self._lock:
+            self._advance(key)
+            self._store(key, value, ttl)
+
+    def generation(self, key):
+        """Generación actual de la clave, para pasarla después a set_if_unchanged."""
+        with self._lock:
+            return self._generations.get(key, self._floor)
+
+    def set_if_unchanged(self, key, value, generation, ttl: float = None):
+        """
+        Guarda el valor solo si la clave no se ha escrito ni invalidado desde que
+        se obtuvo `generation`. Devuelve True si lo guardó.
+        """
+        with self._lock:
+            if self._generations.get(key, self._floor) != generation:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._advance(key)
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+            self._clock += 1
+            self._floor = self._clock
+
+    def _advance(self, key):
+        self._clock += 1
+        self._generations[key] = self._clock
+        self._generations.move_to_end(key)
+        while len(self._generations) > self.maxsize:
+            _, generation = self._generations.popitem(last=False)
+            self._floor = max(self._floor, generation)
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name, "size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "expirations": self.expirations,
+            }
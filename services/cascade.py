@@ -0,0 +1,57 @@
+"""
+Borrado en cascada de tareas y materias, pensado para ejecutarse como trabajo
+en segundo plano (services/jobs.py).
+
+Las entregas e inscripciones dependientes se recorren página a página y se
+eliminan con BatchWriteItem; los objetos de S3 bajo entregas/{subject_id}/...
+se eliminan con DeleteObjects en bloques de 1000. Los tableros de estudiantes
+(services/projections.py) se actualizan en la misma pasada.
+"""
+from boto3.dynamodb.conditions import Key
+
+from services.jobs import add_progress
+from services.projections import remove_task_from_boards, delete_subject_boards
+from services.storage import (
+    iter_query_pages, iter_s3_key_pages, batch_write_items, delete_s3_objects, item_key
+)
+from core.config import (
+    DYNAMODB_TABLE_TASKS, DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS, S3_BUCKET_TASKS
+)
+
+def _delete_page(job, table_name: str, items: list, counter: str):
+    keys = [item_key(table_name, item) for item in items]
+    failed = batch_write_items(table_name, delete_keys=keys)
+    add_progress(job, counter, len(keys) - len(failed))
+    if failed:
+        add_progress(job, counter + "_fallidos", len(failed))
+
+def _delete_s3_prefix(job, prefix: str):
+    for keys in iter_s3_key_pages(S3_BUCKET_TASKS, prefix):
+        errors = delete_s3_objects(S3_BUCKET_TASKS, keys)
+        add_progress(job, "objetos_s3", len(keys) - errors)
+        if errors:
+            add_progress(job, "objetos_s3_fallidos", errors)
+
+def delete_task_cascade(job, task_id: str, subject_id: str):
+    """Elimina las entregas de una tarea y sus archivos. La tarea ya se borró en el endpoint."""
+    for submissions in iter_query_pages(DYNAMODB_TABLE_SUBMISSIONS, Key('task_id').eq(task_id), index_name='task-index'):
+        _delete_page(job, DYNAMODB_TABLE_SUBMISSIONS, submissions, "entregas")
+    _delete_s3_prefix(job, f"entregas/{subject_id}/{task_id}/")
+    remove_task_from_boards(job, task_id, subject_id)
+
+def delete_subject_cascade(job, subject_id: str):
+    """
+    Elimina las tareas de una materia (con sus entregas), sus inscripciones y
+    cualquier archivo restante bajo entregas/{subject_id}/. La materia ya se borró en el endpoint.
+    """
+    for tasks in iter_query_pages(DYNAMODB_TABLE_TASKS, Key('subject_id').eq(subject_id), index_name='subject-tasks-index'):
+        for task in tasks:
+            for submissions in iter_query_pages(DYNAMODB_TABLE_SUBMISSIONS, Key('task_id').eq(task['task_id']), index_name='task-index'):
+                _delete_page(job, DYNAMODB_TABLE_SUBMISSIONS, submissions, "entregas")
+        _delete_page(job, DYNAMODB_TABLE_TASKS, tasks, "tareas")
+    # Los tableros se localizan a través de las inscripciones: se borran antes que ellas
+    delete_subject_boards(job, subject_id)
+    for enrollments in iter_query_pages(DYNAMODB_TABLE_ENROLLMENTS, Key('subject_id').eq(subject_id)):
+        _delete_page(job, DYNAMODB_TABLE_ENROLLMENTS, enrollments, "inscripciones")
+    # Un único recorrido del prefijo de la materia cubre los archivos de todas sus tareas
+    _delete_s3_prefix(job, f"entregas/{subject_id}/")
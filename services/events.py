@@ -0,0 +1,101 @@
+"""
+Publicación/suscripción en memoria para los flujos Server-Sent Events de main.py.
+
+Cada cliente conectado tiene una cola acotada (SSE_QUEUE_SIZE). Publicar nunca
+espera: si la cola de un cliente lento está llena, ese cliente pasa a "resync"
+(se descartan sus eventos pendientes y el endpoint le reenvía el estado
+completo), sin frenar al resto ni a la petición que publica. Así una escritura
+se difunde a todos los paneles abiertos sin que cada uno consulte DynamoDB.
+
+El hub es local al proceso: con varias instancias, cada cliente recibe los
+eventos de las escrituras que pasan por la suya (y el estado completo al conectar).
+"""
+import asyncio
+import contextlib
+import threading
+
+from services.metrics import registry
+from core.config import SSE_QUEUE_SIZE
+
+RESYNC = "resync"
+
+_lock = threading.Lock()
+_subscribers = {} # tema -> conjunto de Subscription
+
+class Subscription:
+    def __init__(self, topic: str, loop, maxsize: int):
+        self.topic = topic
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize)
+        self._overflowed = False
+
+    def _offer(self, event):
+        if self._overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._overflowed = True
+            registry.inc("minimoodle_sse_resyncs_total", {},
+                         help="Clientes SSE cuya cola se llenó y recibieron de nuevo el estado completo")
+
+    def offer(self, event):
+        """Encola el evento sin esperar; se puede llamar desde cualquier hilo."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._offer(event)
+        else:
+            self._loop.call_soon_threadsafe(self._offer, event)
+
+    async def get(self, timeout: float):
+        """
+        Siguiente evento (tipo, datos); RESYNC si se perdieron eventos por la
+        cola llena; None si no llega ninguno en `timeout` segundos.
+        """
+        if self._overflowed:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._overflowed = False
+            return RESYNC
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+@contextlib.contextmanager
+def subscribe(topic: str, maxsize: int = SSE_QUEUE_SIZE):
+    """Suscribe al cliente actual (dentro de un event loop) mientras dure el bloque."""
+    subscription = Subscription(topic, asyncio.get_running_loop(), maxsize)
+    with _lock:
+        _subscribers.setdefault(topic, set()).add(subscription)
+    try:
+        yield subscription
+    finally:
+        with _lock:
+            subscribers = _subscribers.get(topic)
+            subscribers.discard(subscription)
+            if not subscribers:
+                del _subscribers[topic]
+
+def has_subscribers(topic: str):
+    """Permite a quien publica saltarse el trabajo de preparar el evento si nadie escucha."""
+    return topic in _subscribers
+
+def publish(topic: str, event_type: str, data):
+    """Entrega (event_type, data) a todos los suscriptores del tema. Devuelve cuántos eran."""
+    with _lock:
+        subscribers = list(_subscribers.get(topic, ()))
+    for subscription in subscribers:
+        subscription.offer((event_type, data))
+    if subscribers:
+        registry.inc("minimoodle_sse_events_total", {"event": event_type}, amount=len(subscribers),
+                     help="Eventos SSE entregados a las colas de los clientes")
+    return len(subscribers)
+
+def stats():
+    """Clientes conectados por tema."""
+    with _lock:
+        return {topic: len(subscribers) for topic, subscribers in _subscribers.items()}
@@ -0,0 +1,55 @@
+"""
+Trabajos en segundo plano dentro del proceso (borrados en cascada, etc.).
+
+Los endpoints lanzan el trabajo con submit_job y responden al instante con su
+job_id; el progreso se consulta después con get_job. El registro es en memoria:
+el estado de un trabajo solo se puede consultar en la instancia que lo ejecuta.
+"""
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from models.schemas import JobInfo, JobStatus
+from core.config import JOBS_MAX_WORKERS, JOBS_MAX_KEPT
+
+_executor = ThreadPoolExecutor(max_workers=JOBS_MAX_WORKERS, thread_name_prefix="jobs")
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+def _run(job: JobInfo, func, args, kwargs):
+    job.status = JobStatus.running
+    try:
+        func(job, *args, **kwargs)
+        job.status = JobStatus.completed
+    except Exception as e:
+        traceback.print_exc()
+        job.error = str(e)
+        job.status = JobStatus.failed
+    finally:
+        job.finished_at = datetime.utcnow()
+
+def submit_job(kind: str, func, *args, **kwargs):
+    """
+    Encola func(job, *args, **kwargs) en el pool de trabajos y devuelve su JobInfo.
+    La función informa de su avance actualizando job.progress.
+    """
+    job = JobInfo(job_id=str(uuid.uuid4()), kind=kind)
+    with _lock:
+        _jobs[job.job_id] = job
+        # Se conservan solo los últimos JOBS_MAX_KEPT trabajos
+        while len(_jobs) > JOBS_MAX_KEPT:
+            _jobs.popitem(last=False)
+    _executor.submit(_run, job, func, args, kwargs)
+    return job
+
+def get_job(job_id: str):
+    with _lock:
+        return _jobs.get(job_id)
+
+def add_progress(job: JobInfo, counter: str, amount: int = 1):
+    """Suma `amount` al contador `counter` del progreso del trabajo."""
+    with _lock:
+        job.progress[counter] = job.progress.get(counter, 0) + amount
@@ -0,0 +1,40 @@
+"""
+Sustituto local de DynamoDB y S3 para desarrollo y benchmarks sin cuenta de AWS.
+
+Con STORAGE_STANDIN = "moto" (variable MINIMOODLE_STORAGE_STANDIN) services/storage.py
+arranca, antes de crear sus clientes, un mock de AWS en memoria (moto) con las
+tablas de services/tables.py y el bucket de entregas. moto es una dependencia
+opcional: ver benchmarks/requirements.txt.
+"""
+import os
+
+import boto3
+
+from services.tables import create_tables
+from core.config import AWS_REGION, S3_BUCKET_TASKS
+
+_mock = None
+
+def start_local_standin():
+    """Activa el mock en memoria (una sola vez por proceso) y crea tablas y bucket."""
+    global _mock
+    if _mock is not None:
+        return
+    try:
+        from moto import mock_aws
+    except ImportError as e:
+        raise RuntimeError("STORAGE_STANDIN='moto' requiere el paquete moto (pip install -r benchmarks/requirements.txt)") from e
+
+    # Credenciales ficticias: el mock nunca contacta con AWS
+    for variable in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ.setdefault(variable, "standin")
+    _mock = mock_aws()
+    _mock.start()
+    create_tables(boto3.client('dynamodb', region_name=AWS_REGION))
+    boto3.client('s3', region_name=AWS_REGION).create_bucket(Bucket=S3_BUCKET_TASKS)
+
+def stop_local_standin():
+    global _mock
+    if _mock is not None:
+        _mock.stop()
+        _mock = None
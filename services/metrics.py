@@ -0,0 +1,208 @@
+"""
+Instrumentación de las llamadas a DynamoDB y S3.
+
+Los clientes de boto3 se enganchan a eventos de botocore (instrument_client):
+cada llamada registra servicio, operación, tabla/bucket, latencia y, en DynamoDB,
+la ConsumedCapacity (se pide ReturnConsumedCapacity=TOTAL automáticamente).
+MetricsMiddleware acumula esas llamadas por petición, las agrupa por la plantilla
+de ruta de FastAPI, las publica en formato Prometheus (render_prometheus, /metrics)
+y añade la cabecera Server-Timing a cada respuesta.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+
+# Métricas de la petición en curso (None fuera de una petición HTTP)
+_current = ContextVar("request_metrics", default=None)
+
+# Operaciones de DynamoDB que aceptan ReturnConsumedCapacity
+_CAPACITY_OPERATIONS = {
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+    'BatchGetItem', 'BatchWriteItem', 'TransactGetItems', 'TransactWriteItems',
+}
+_DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_CALLS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+_BACKGROUND_ROUTE = "(sin petición)"
+
+
+class Registry:
+    """Contadores e histogramas en memoria, exportables en formato de texto de Prometheus."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def inc(self, name: str, labels: dict, amount: float = 1, help: str = ""):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help))
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: dict, value: float, buckets, help: str = ""):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram["counts"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def render(self):
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in sorted(self._help.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for (metric, labels), value in sorted(self._counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{fmt_labels(labels)} {value}")
+                else:
+                    for (metric, labels), h in sorted(self._histograms.items()):
+                        if metric != name:
+                            continue
+                        for bound, count in zip(h["buckets"], h["counts"]):
+                            lines.append(f"{name}_bucket{fmt_labels(labels, [('le', bound)])} {count}")
+                        lines.append(f"{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {h['count']}")
+                        lines.append(f"{name}_sum{fmt_labels(labels)} {h['sum']}")
+                        lines.append(f"{name}_count{fmt_labels(labels)} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    """Llamadas a AWS hechas durante una petición (puede recibir datos de varios hilos)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []  # (servicio, operación, recurso, segundos, capacidad)
+
+    def record(self, call):
+        with self._lock:
+            self.calls.append(call)
+
+    def totals(self):
+        """Devuelve {servicio: (número de llamadas, segundos, capacidad)}."""
+        totals = {}
+        with self._lock:
+            for service, _, _, seconds, capacity in self.calls:
+                count, total_seconds, total_capacity = totals.get(service, (0, 0.0, 0.0))
+                totals[service] = (count + 1, total_seconds + seconds, total_capacity + capacity)
+        return totals
+
+    def server_timing(self, elapsed: float):
+        entries = []
+        for service, (count, seconds, capacity) in sorted(self.totals().items()):
+            desc = f"{count} llamadas" + (f", {capacity:g} unidades" if capacity else "")
+            entries.append(f'{service};dur={seconds * 1000:.1f};desc="{desc}"')
+        entries.append(f"total;dur={elapsed * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def _record_call(route: str, call):
+    service, operation, resource, seconds, capacity = call
+    labels = {"route": route, "service": service, "operation": operation, "resource": resource}
+    registry.inc("minimoodle_aws_calls_total", labels, help="Llamadas a AWS por ruta, servicio, operación y tabla/bucket")
+    registry.observe("minimoodle_aws_call_duration_seconds", labels, seconds, _DURATION_BUCKETS, help="Latencia de las llamadas a AWS")
+    if capacity:
+        registry.inc("minimoodle_dynamodb_consumed_capacity_total", labels, capacity, help="ConsumedCapacity de DynamoDB")
+
+
+# --- Enganche con botocore ---
+def _resources(params: dict):
+    if 'TableName' in params:
+        return params['TableName']
+    if 'RequestItems' in params:
+        return ",".join(sorted(params['RequestItems']))
+    return params.get('Bucket', '-')
+
+def _before_parameter_build(params, model, context, **kwargs):
+    service = model.service_model.service_name
+    if service == 'dynamodb' and model.name in _CAPACITY_OPERATIONS:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    context['metrics_call'] = (service, model.name, _resources(params), time.perf_counter())
+
+def _after_call(context, parsed=None, **kwargs):
+    # after-call-error no recibe `model`, por eso los datos de la llamada viajan en el contexto
+    pending = context.pop('metrics_call', None)
+    if pending is None:
+        return
+    service, operation, resource, start = pending
+    capacity = 0.0
+    consumed = (parsed or {}).get('ConsumedCapacity')
+    for entry in consumed if isinstance(consumed, list) else [consumed] if consumed else []:
+        capacity += float(entry.get('CapacityUnits', 0))
+    call = (service, operation, resource, time.perf_counter() - start, capacity)
+    request_metrics = _current.get()
+    if request_metrics is not None:
+        request_metrics.record(call)
+    else:
+        _record_call(_BACKGROUND_ROUTE, call)
+
+def instrument_client(client):
+    """Registra los manejadores de métricas en un cliente de boto3 (o en resource.meta.client)."""
+    client.meta.events.register('before-parameter-build', _before_parameter_build, unique_id='minimoodle-metrics-before')
+    client.meta.events.register('after-call', _after_call, unique_id='minimoodle-metrics-after')
+    client.meta.events.register('after-call-error', _after_call, unique_id='minimoodle-metrics-error')
+    return client
+
+
+# --- Middleware ASGI ---
+def _route_template(scope):
+    route = scope.get('route')
+    return getattr(route, 'path', None) or "(sin ruta)"
+
+class MetricsMiddleware:
+    """
+    Abre un RequestMetrics por petición HTTP, añade la cabecera Server-Timing y
+    al terminar vuelca las llamadas en el registro, agrupadas por plantilla de ruta.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        request_metrics = RequestMetrics()
+        token = _current.set(request_metrics)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', request_metrics.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = _route_template(scope)
+            labels = {"route": route, "method": scope['method'], "status": str(status_code)}
+            registry.observe("minimoodle_http_request_duration_seconds", labels, time.perf_counter() - start,
+                             _DURATION_BUCKETS, help="Duración de las peticiones HTTP por ruta")
+            for call in request_metrics.calls:
+                _record_call(route, call)
+            registry.observe("minimoodle_aws_calls_per_request", {"route": route}, len(request_metrics.calls),
+                             _CALLS_BUCKETS, help="Llamadas a AWS por petición (detecta patrones N+1)")
+
+def render_prometheus():
+    return registry.render()
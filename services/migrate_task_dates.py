@@ -0,0 +1,93 @@
+"""
+Migración de las fechas de las tareas de ISO string a segundos epoch (número).
+
+Las tareas nuevas ya se guardan con fecha_creacion, fecha_entrega y
+fecha_caducidad numéricas (services/storage.py, task_to_item); este script
+reescribe las antiguas y, con --create-indexes, crea los GSIs
+subject-deadline-index y subject-expiry-index que definen services/tables.py.
+
+Orden recomendado: desplegar el código, ejecutar el relleno y después crear los
+índices (DynamoDB rechaza escribir una fecha de tipo texto en un atributo que ya
+es clave numérica de un GSI). Mientras tanto la lectura acepta ambos formatos.
+
+Uso (desde la raíz del repositorio):
+    python -m services.migrate_task_dates --dry-run
+    python -m services.migrate_task_dates --create-indexes
+"""
+import argparse
+import json
+import sys
+import time
+
+from services.storage import (
+    TASK_DATE_FIELDS, batch_write_items, get_backend, iter_scan_pages, parse_task_dates, to_epoch
+)
+from services.tables import create_table_request
+from core.config import DYNAMODB_TABLE_TASKS
+
+def migrated_item(item: dict):
+    """Devuelve el item con las fechas en epoch, o None si ya estaba migrado."""
+    if not any(isinstance(item.get(field), str) for field in TASK_DATE_FIELDS):
+        return None
+    dates = parse_task_dates({field: item[field] for field in TASK_DATE_FIELDS})
+    return {**item, **{field: to_epoch(value) for field, value in dates.items()}}
+
+def backfill(dry_run: bool = False):
+    report = {"revisadas": 0, "migradas": 0, "fallidas": 0}
+    for items in iter_scan_pages(DYNAMODB_TABLE_TASKS):
+        report["revisadas"] += len(items)
+        pending = [migrated for migrated in map(migrated_item, items) if migrated]
+        if pending and not dry_run:
+            failed = batch_write_items(DYNAMODB_TABLE_TASKS, items=pending)
+            report["fallidas"] += len(failed)
+            report["migradas"] += len(pending) - len(failed)
+        elif pending:
+            report["migradas"] += len(pending)
+    return report
+
+def create_missing_indexes(table_name: str = DYNAMODB_TABLE_TASKS):
+    """
+    Crea, de uno en uno (límite de UpdateTable), los GSIs definidos que aún no existen.
+    Solo aplica a DynamoDB: el backend SQLite crea sus índices al arrancar.
+    """
+    backend = get_backend()
+    if backend.name != "dynamodb":
+        return []
+    client = backend.resource.meta.client
+    description = client.describe_table(TableName=table_name)['Table']
+    existing = {index['IndexName'] for index in description.get('GlobalSecondaryIndexes', [])}
+    request = create_table_request(table_name)
+    created = []
+    for index in request.get('GlobalSecondaryIndexes', []):
+        if index['IndexName'] in existing:
+            continue
+        index_attributes = {element['AttributeName'] for element in index['KeySchema']}
+        client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=[d for d in request['AttributeDefinitions'] if d['AttributeName'] in index_attributes],
+            GlobalSecondaryIndexUpdates=[{'Create': index}],
+        )
+        _wait_for_index(client, table_name, index['IndexName'])
+        created.append(index['IndexName'])
+    return created
+
+def _wait_for_index(client, table_name: str, index_name: str, poll_seconds: float = 10):
+    """Espera a que el GSI termine de construirse (IndexStatus ACTIVE)."""
+    while True:
+        indexes = client.describe_table(TableName=table_name)['Table'].get('GlobalSecondaryIndexes', [])
+        if any(i['IndexName'] == index_name and i.get('IndexStatus', 'ACTIVE') == 'ACTIVE' for i in indexes):
+            return
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra las fechas de las tareas a segundos epoch.")
+    parser.add_argument("--dry-run", action="store_true", help="Solo cuenta las tareas que habría que migrar")
+    parser.add_argument("--create-indexes", action="store_true", help="Tras el relleno, crea los GSIs de fechas que falten")
+    args = parser.parse_args()
+
+    result = backfill(args.dry_run)
+    if args.create_indexes and not args.dry_run:
+        result["indices_creados"] = create_missing_indexes()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(1 if result["fallidas"] else 0)
@@ -0,0 +1,289 @@
+"""
+Perfilado por muestreo de peticiones individuales.
+
+Se perfila una petición cuando trae la cabecera X-Debug-Profile con el token
+de PROFILE_TOKEN, o al azar con probabilidad PROFILE_SAMPLE_RATE. Mientras hay
+peticiones perfilándose, un hilo toma cada PROFILE_INTERVAL_SECONDS las pilas
+de todos los hilos (sys._current_frames) y asigna a cada petición:
+  - las del hilo del event loop en las que está su ProfilingMiddleware (así no
+    se mezclan las demás peticiones que comparten el loop);
+  - las de los hilos del pool de services/async_storage.py mientras ejecutan
+    una llamada suya (run_sync envuelve la función con bind).
+Fuera de esas peticiones el coste es una comprobación por petición.
+
+Cada perfil se guarda en PROFILE_DIR en formato speedscope
+(https://www.speedscope.app) con sus metadatos al lado; se conservan los
+últimos PROFILE_MAX_FILES. GET /admin/profiles/{id}?format=collapsed los
+devuelve también como pilas colapsadas (flamegraph.pl, inferno).
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+
+from core.config import PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_SECONDS, PROFILE_DIR, PROFILE_MAX_FILES
+
+logger = logging.getLogger(__name__)
+PROFILE_HEADER = "x-debug-profile"
+_SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+_current = ContextVar("request_profile", default=None)
+
+
+class Profile:
+    """Muestras de una petición: {(hilo, pila): veces}."""
+    def __init__(self, method: str, path: str, trigger: str):
+        self.profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.route = None
+        self.status = None
+        self.started = time.time()
+        self.duration = None
+        self.loop_thread = threading.get_ident()
+        self.marker = None # Frame del middleware en el hilo del loop
+        self.samples = Counter()
+        self._threads = Counter()
+        self._lock = threading.Lock()
+
+    def enter_thread(self):
+        with self._lock:
+            self._threads[threading.get_ident()] += 1
+
+    def exit_thread(self):
+        with self._lock:
+            ident = threading.get_ident()
+            self._threads[ident] -= 1
+            if not self._threads[ident]:
+                del self._threads[ident]
+
+    def sample(self, frames: dict, names: dict):
+        with self._lock:
+            idents = set(self._threads)
+        for ident, frame in frames.items():
+            if ident == self.loop_thread:
+                stack = _stack(frame, self.marker)
+            elif ident in idents:
+                stack = _stack(frame)
+            else:
+                continue
+            if stack:
+                self.samples[(names.get(ident, str(ident)), stack)] += 1
+
+def _stack(frame, root=None):
+    """Pila desde la raíz (o desde `root`, que debe estar en ella) hasta `frame`."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        if frame is root:
+            return tuple(reversed(stack))
+        frame = frame.f_back
+    return None if root is not None else tuple(reversed(stack))
+
+
+class _Sampler:
+    """Hilo de muestreo compartido; solo trabaja mientras hay perfiles activos."""
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def remove(self, profile: Profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+                if not profiles:
+                    self._wake.clear()
+            if not profiles:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            frames.pop(own, None)
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for profile in profiles:
+                profile.sample(frames, names)
+            del frames
+            time.sleep(self.interval)
+
+_sampler = _Sampler(PROFILE_INTERVAL_SECONDS)
+
+def bind(func):
+    """
+    Si la petición actual se está perfilando, envuelve func para que se muestree
+    el hilo que la ejecute (services/async_storage.py, run_sync).
+    """
+    profile = _current.get()
+    if profile is None:
+        return func
+    def run(*args, **kwargs):
+        profile.enter_thread()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.exit_thread()
+    return run
+
+
+# --- Almacenamiento (anillo en disco) ---
+def _path(profile_id: str, suffix: str):
+    if not profile_id.replace('-', '').isalnum():
+        raise ValueError(f"Perfil no válido: {profile_id}")
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{suffix}")
+
+def to_speedscope(profile: Profile):
+    frames, index = [], {}
+    samples, weights = [], []
+    interval_ms = PROFILE_INTERVAL_SECONDS * 1000
+    for (thread_name, stack), count in profile.samples.most_common():
+        # La raíz de cada pila es el hilo: separa el loop del pool de almacenamiento
+        ids = []
+        for frame in ((f"[{thread_name}]", "", 0),) + stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                name, file, line = frame
+                frames.append({"name": name, "file": file, "line": line} if file else {"name": name})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(count * interval_ms)
+    name = f"{profile.method} {profile.path}"
+    return {
+        "$schema": _SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "minimoodle",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights,
+        }],
+    }
+
+def metadata(profile: Profile):
+    return {
+        "profile_id": profile.profile_id, "method": profile.method, "path": profile.path,
+        "route": profile.route, "status": profile.status, "trigger": profile.trigger,
+        "started_at": profile.started, "duration_ms": round(profile.duration * 1000, 2),
+        "samples": sum(profile.samples.values()),
+    }
+
+def store(profile: Profile):
+    """Guarda el perfil y borra los más antiguos por encima de PROFILE_MAX_FILES."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(_path(profile.profile_id, "speedscope.json"), 'w') as f:
+        json.dump(to_speedscope(profile), f)
+    with open(_path(profile.profile_id, "meta.json"), 'w') as f:
+        json.dump(metadata(profile), f)
+    for profile_id in list_profile_ids()[PROFILE_MAX_FILES:]:
+        for suffix in ("speedscope.json", "meta.json"):
+            try:
+                os.remove(_path(profile_id, suffix))
+            except FileNotFoundError:
+                pass
+
+def list_profile_ids():
+    """Perfiles guardados, el más reciente primero."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted((name[:-len(".meta.json")] for name in os.listdir(PROFILE_DIR) if name.endswith(".meta.json")), reverse=True)
+
+def list_profiles():
+    profiles = []
+    for profile_id in list_profile_ids():
+        try:
+            with open(_path(profile_id, "meta.json")) as f:
+                profiles.append(json.load(f))
+        except FileNotFoundError:
+            pass # Borrado por el anillo mientras se listaba
+    return profiles
+
+def load_speedscope(profile_id: str):
+    """Contenido speedscope de un perfil, o None si no existe."""
+    try:
+        with open(_path(profile_id, "speedscope.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def to_collapsed(speedscope: dict):
+    """Pilas colapsadas ("raíz;...;hoja muestras"), una por línea."""
+    frames = speedscope["shared"]["frames"]
+    profile = speedscope["profiles"][0]
+    lines = []
+    for ids, weight in zip(profile["samples"], profile["weights"]):
+        names = [frames[i]["name"] + (f" ({os.path.basename(frames[i]['file'])}:{frames[i]['line']})" if "file" in frames[i] else "") for i in ids]
+        lines.append(f"{';'.join(names)} {round(weight / (PROFILE_INTERVAL_SECONDS * 1000))}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Middleware ASGI ---
+def _trigger(scope):
+    """"header", "sample" o None según si hay que perfilar la petición."""
+    if PROFILE_TOKEN:
+        for name, value in scope.get('headers', ()):
+            if name == PROFILE_HEADER.encode() and hmac.compare_digest(value, PROFILE_TOKEN.encode()):
+                return "header"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+class ProfilingMiddleware:
+    """Perfila las peticiones elegidas por _trigger y añade la cabecera X-Profile-Id a su respuesta."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        trigger = _trigger(scope) if scope['type'] == 'http' else None
+        if trigger is None:
+            return await self.app(scope, receive, send)
+        profile = Profile(scope['method'], scope['path'], trigger)
+        profile.marker = sys._getframe()
+        token = _current.set(profile)
+
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                profile.status = message['status']
+                MutableHeaders(scope=message).append('X-Profile-Id', profile.profile_id)
+            await send(message)
+
+        start = time.perf_counter()
+        _sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _sampler.remove(profile)
+            _current.reset(token)
+            profile.duration = time.perf_counter() - start
+            profile.marker = None
+            route = scope.get('route')
+            profile.route = getattr(route, 'path', None)
+            try:
+                # Fuera del event loop: escribe los archivos y recorre PROFILE_DIR
+                await asyncio.get_running_loop().run_in_executor(None, store, profile)
+            except OSError as e:
+                logger.warning("Error al guardar el perfil %s: %s", profile.profile_id, e)
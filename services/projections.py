@@ -0,0 +1,193 @@
+"""
+Proyección materializada "tablero de tareas del estudiante".
+
+Hay un item por (estudiante, materia) en DYNAMODB_TABLE_TASK_BOARDS con un mapa
+`tasks` task_id -> tarea (tal como se guarda en la tabla de tareas) y, si el
+estudiante ya entregó, su entrega en `submission`. GET /student/tasks lee los
+tableros con una sola query y solo calcula el estado según la hora actual.
+
+Los endpoints de escritura mantienen el tablero al día de forma incremental
+(una actualización de una ruta del mapa). Si un tablero no existe o le falta la
+tarea, se reconstruye desde las tablas base. Para rellenar o reparar la
+proyección completa:
+    python -m services.projections rebuild
+    python -m services.projections rebuild --user-id <user_id>
+"""
+import argparse
+import json
+import sys
+
+from boto3.dynamodb.conditions import Key
+
+from services.jobs import add_progress
+from services.storage import (
+    BatchLoader, iter_query, iter_query_pages, iter_scan_pages, batch_write_items,
+    update_item_paths, is_student_enrolled, get_student_subjects, get_submissions_for_student
+)
+from core.config import (
+    DYNAMODB_TABLE_TASKS, DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_TASK_BOARDS
+)
+
+def _board_key(user_id: str, subject_id: str):
+    return {'user_id': user_id, 'subject_id': subject_id}
+
+def board_entry(task_item: dict, submission: dict = None):
+    """Entrada del mapa `tasks` de un tablero: la tarea y, si existe, la entrega."""
+    entry = dict(task_item)
+    entry.pop('submission', None)
+    if submission:
+        entry['submission'] = submission
+    return entry
+
+def board_item(user_id: str, subject_id: str, task_items: list, submissions_by_task: dict):
+    """Construye el tablero completo a partir de las tareas de la materia y las entregas del estudiante."""
+    return {
+        **_board_key(user_id, subject_id),
+        'tasks': {
+            task['task_id']: board_entry(task, submissions_by_task.get(task['task_id']))
+            for task in task_items
+        },
+    }
+
+# --- Reconstrucción desde las tablas base ---
+def rebuild_boards(pairs, job=None, tasks_by_subject: dict = None):
+    """
+    Reconstruye los tableros de los pares (user_id, subject_id). Las tareas de
+    cada materia se consultan una sola vez y se cargan todas juntas con
+    BatchLoader; las entregas, con una query por estudiante. `tasks_by_subject`
+    permite reutilizar las tareas ya cargadas entre llamadas (rebuild_all).
+    Devuelve los tableros escritos.
+    """
+    if tasks_by_subject is None:
+        tasks_by_subject = {}
+    subjects_by_user = {}
+    for user_id, subject_id in pairs:
+        subjects_by_user.setdefault(user_id, set()).add(subject_id)
+    pending_subjects = {s for subjects in subjects_by_user.values() for s in subjects} - tasks_by_subject.keys()
+
+    task_ids_by_subject = {
+        subject_id: [t['task_id'] for t in iter_query(DYNAMODB_TABLE_TASKS, Key('subject_id').eq(subject_id), index_name='subject-tasks-index')]
+        for subject_id in pending_subjects
+    }
+    loader = BatchLoader()
+    for task_ids in task_ids_by_subject.values():
+        for task_id in task_ids:
+            loader.add(DYNAMODB_TABLE_TASKS, {'task_id': task_id})
+    loader.load()
+    for subject_id, task_ids in task_ids_by_subject.items():
+        tasks_by_subject[subject_id] = [t for t in (loader.get(DYNAMODB_TABLE_TASKS, {'task_id': i}) for i in task_ids) if t]
+
+    boards = []
+    for user_id, user_subjects in subjects_by_user.items():
+        submissions_by_task = {s['task_id']: s for s in get_submissions_for_student(user_id)}
+        boards.extend(
+            board_item(user_id, subject_id, tasks_by_subject[subject_id], submissions_by_task)
+            for subject_id in user_subjects
+        )
+    failed = batch_write_items(DYNAMODB_TABLE_TASK_BOARDS, items=boards)
+    if job is not None:
+        add_progress(job, "tableros", len(boards) - len(failed))
+        if failed:
+            add_progress(job, "tableros_fallidos", len(failed))
+    return boards
+
+def rebuild_board(user_id: str, subject_id: str):
+    return rebuild_boards([(user_id, subject_id)])[0]
+
+def rebuild_all(job=None, user_id: str = None):
+    """
+    Reconstruye los tableros de todas las inscripciones (o solo las de `user_id`)
+    y elimina los tableros que ya no tienen inscripción.
+    """
+    if user_id:
+        enrollments_pages = [get_student_subjects(user_id)]
+        boards_pages = [list(iter_query(DYNAMODB_TABLE_TASK_BOARDS, Key('user_id').eq(user_id)))]
+    else:
+        enrollments_pages = iter_scan_pages(DYNAMODB_TABLE_ENROLLMENTS)
+        boards_pages = iter_scan_pages(DYNAMODB_TABLE_TASK_BOARDS)
+
+    enrolled, tasks_by_subject = set(), {}
+    for enrollments in enrollments_pages:
+        pairs = [(en['user_id'], en['subject_id']) for en in enrollments]
+        enrolled.update(pairs)
+        if pairs:
+            rebuild_boards(pairs, job, tasks_by_subject)
+
+    for boards in boards_pages:
+        orphans = [_board_key(b['user_id'], b['subject_id']) for b in boards if (b['user_id'], b['subject_id']) not in enrolled]
+        if orphans:
+            failed = batch_write_items(DYNAMODB_TABLE_TASK_BOARDS, delete_keys=orphans)
+            if job is not None:
+                add_progress(job, "tableros_huerfanos", len(orphans) - len(failed))
+
+# --- Actualizaciones incrementales (llamadas desde los endpoints de escritura) ---
+def add_task_to_boards(job, task_item: dict):
+    """Añade una tarea recién creada al tablero de cada estudiante inscrito en su materia."""
+    subject_id, task_id = task_item['subject_id'], task_item['task_id']
+    entry = board_entry(task_item)
+    for enrollments in iter_query_pages(DYNAMODB_TABLE_ENROLLMENTS, Key('subject_id').eq(subject_id)):
+        missing = []
+        for enrollment in enrollments:
+            key = _board_key(enrollment['user_id'], subject_id)
+            if not update_item_paths(DYNAMODB_TABLE_TASK_BOARDS, key, set_paths={('tasks', task_id): entry}):
+                missing.append((enrollment['user_id'], subject_id))
+        add_progress(job, "tableros", len(enrollments) - len(missing))
+        if missing:
+            rebuild_boards(missing, job)
+
+def remove_task_from_boards(job, task_id: str, subject_id: str):
+    """Quita una tarea eliminada de los tableros de los estudiantes de su materia."""
+    for enrollments in iter_query_pages(DYNAMODB_TABLE_ENROLLMENTS, Key('subject_id').eq(subject_id)):
+        for enrollment in enrollments:
+            key = _board_key(enrollment['user_id'], subject_id)
+            update_item_paths(DYNAMODB_TABLE_TASK_BOARDS, key, remove_paths=[('tasks', task_id)])
+        add_progress(job, "tableros", len(enrollments))
+
+def delete_subject_boards(job, subject_id: str):
+    """Elimina los tableros de una materia. Debe ejecutarse antes de borrar sus inscripciones."""
+    for enrollments in iter_query_pages(DYNAMODB_TABLE_ENROLLMENTS, Key('subject_id').eq(subject_id)):
+        keys = [_board_key(en['user_id'], subject_id) for en in enrollments]
+        failed = batch_write_items(DYNAMODB_TABLE_TASK_BOARDS, delete_keys=keys)
+        add_progress(job, "tableros", len(keys) - len(failed))
+
+def set_board_submission(submission_item: dict):
+    """Registra (o sustituye) la entrega de un estudiante en su tablero."""
+    key = _board_key(submission_item['user_id'], submission_item['subject_id'])
+    path = ('tasks', submission_item['task_id'], 'submission')
+    if not update_item_paths(DYNAMODB_TABLE_TASK_BOARDS, key, set_paths={path: submission_item}):
+        # Sin tablero solo se reconstruye si hay inscripción (un docente o admin también puede subir)
+        if is_student_enrolled(key['user_id'], key['subject_id']):
+            rebuild_boards([(key['user_id'], key['subject_id'])])
+
+def remove_board_submission(submission_item: dict):
+    """Quita la entrega del tablero del estudiante."""
+    key = _board_key(submission_item['user_id'], submission_item['subject_id'])
+    update_item_paths(DYNAMODB_TABLE_TASK_BOARDS, key, remove_paths=[('tasks', submission_item['task_id'], 'submission')])
+
+def get_student_boards(user_id: str):
+    """
+    Tableros de un estudiante (una query, más la de sus inscripciones). Los de
+    las materias en las que está inscrito pero que aún no tienen tablero, por
+    ejemplo porque se inscribió antes de que existiera la proyección, se
+    construyen en el momento.
+    """
+    boards = list(iter_query(DYNAMODB_TABLE_TASK_BOARDS, Key('user_id').eq(user_id)))
+    have = {board['subject_id'] for board in boards}
+    missing = [(user_id, en['subject_id']) for en in get_student_subjects(user_id) if en['subject_id'] not in have]
+    if missing:
+        boards.extend(rebuild_boards(missing))
+    return boards
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de la proyección de tableros de estudiantes.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Rellena o repara los tableros desde las tablas base")
+    rebuild_parser.add_argument("--user-id", help="Reconstruir solo los tableros de este estudiante")
+    args = parser.parse_args()
+
+    from models.schemas import JobInfo
+    job = JobInfo(job_id="cli", kind="rebuild_boards")
+    rebuild_all(job, user_id=args.user_id)
+    print(json.dumps(job.progress, indent=2))
+    sys.exit(1 if any(counter.endswith("_fallidos") for counter in job.progress) else 0)
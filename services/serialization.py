@@ -0,0 +1,97 @@
+"""
+Serialización rápida de respuestas JSON (modo opcional, FAST_RESPONSES).
+
+FastJSONResponse usa orjson (dependencia opcional; si no está instalado se usa
+json de la biblioteca estándar) con un codificador para Decimal y datetime.
+
+trusted_response es el camino "de confianza" para los listados: los items que
+ya vienen con la forma correcta de la capa de datos se recortan a los campos
+del modelo de respuesta y se serializan directamente, sin volver a validarlos
+con pydantic. Con FAST_RESPONSES desactivado devuelve los items tal cual y
+FastAPI los valida con el response_model del endpoint, como siempre.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from core.config import FAST_RESPONSES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_default(obj):
+    """Tipos que ni orjson ni json saben codificar por sí mismos."""
+    if isinstance(obj, Decimal):
+        # DynamoDB devuelve todos los números como Decimal
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# --- Camino de confianza ---
+class ModelShape:
+    """
+    Recorta dicts a los campos de un modelo pydantic (v1 o v2), rellenando los
+    valores por defecto que falten, sin validar tipos.
+    """
+    def __init__(self, model):
+        fields = getattr(model, 'model_fields', None) or model.__fields__
+        self.names = list(fields)
+        self.defaults = {}
+        for name, field in fields.items():
+            if field.default_factory is not None:
+                self.defaults[name] = field.default_factory
+            else:
+                required = field.is_required() if callable(getattr(field, 'is_required', None)) else field.required
+                if not required:
+                    self.defaults[name] = lambda value=field.default: value
+
+    def __call__(self, item: dict):
+        shaped = {}
+        for name in self.names:
+            if name in item:
+                shaped[name] = item[name]
+            elif name in self.defaults:
+                shaped[name] = self.defaults[name]()
+        return shaped
+
+_shapes = {}
+
+def _shape_for(model):
+    model_shape = _shapes.get(model)
+    if model_shape is None:
+        model_shape = _shapes[model] = ModelShape(model)
+    return model_shape
+
+def shape(model, item: dict):
+    """Recorta `item` a los campos de `model` (ver ModelShape)."""
+    return _shape_for(model)(item)
+
+def trusted_response(items: list, model, response=None):
+    """
+    Con FAST_RESPONSES activo devuelve una FastJSONResponse con los items
+    recortados a `model`, copiando las cabeceras fijadas en `response` (p. ej.
+    X-Next-Cursor). Si no, devuelve `items` para la validación habitual.
+    """
+    if not FAST_RESPONSES:
+        return items
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k not in ('content-length', 'content-type')}
+    model_shape = _shape_for(model)
+    return FastJSONResponse([model_shape(item) for item in items], headers=headers)
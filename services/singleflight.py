@@ -0,0 +1,174 @@
+"""
+Agrupación de lecturas concurrentes idénticas (single-flight).
+
+Cuando llegan a la vez muchas peticiones que leen lo mismo (p. ej. todos los
+estudiantes de una materia al acercarse la fecha de entrega), solo la primera
+llamada va a DynamoDB; las demás esperan su resultado y reciben una copia.
+Hay dos variantes con la misma semántica:
+  - SingleFlight: para hilos (services/storage.py, trabajos, endpoints síncronos);
+  - AsyncSingleFlight: para corrutinas (services/async_storage.py), agrupa antes
+    de ocupar un hilo del pool.
+Solo se agrupan llamadas que están en curso a la vez; nada se guarda después
+(para eso está la caché de services/storage.py).
+"""
+import asyncio
+import functools
+import threading
+import weakref
+
+from services.metrics import registry
+
+_flights = []
+
+def copy_result(value):
+    """
+    Copia para cada llamador: los items son dicts que los endpoints modifican
+    (p. ej. parse_task_dates), así que nadie debe recibir el mismo objeto.
+    """
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [copy_result(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(copy_result(v) for v in value)
+    return value
+
+def freeze(value):
+    """Convierte argumentos (dicts, listas) en una clave hashable."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+def call_key(args: tuple, kwargs: dict):
+    """Clave de una llamada, o None si algún argumento no es hashable (entonces no se agrupa)."""
+    key = (freeze(args), freeze(kwargs))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class _Flight:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = self.executed = self.coalesced = 0
+        _flights.append(self)
+
+    def _count(self, coalesced: bool):
+        self.calls += 1
+        if coalesced:
+            self.coalesced += 1
+            registry.inc("minimoodle_storage_coalesced_calls_total", {"operation": self.name},
+                         help="Lecturas que esperaron a otra idéntica en curso en lugar de llamar al almacenamiento")
+        else:
+            self.executed += 1
+
+    def stats(self):
+        return {
+            "name": self.name, "calls": self.calls, "executed": self.executed,
+            "coalesced": self.coalesced, "in_flight": self.in_flight(),
+        }
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(_Flight):
+    """Versión para hilos: los seguidores esperan en un threading.Event."""
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Ejecuta func(*args, **kwargs), o espera a la llamada en curso con la misma clave."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(coalesced=not leader)
+        if leader:
+            try:
+                call.result = func(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return copy_result(call.result)
+
+    def forget(self, key):
+        """Tras una escritura: las llamadas siguientes no se unen a la lectura en curso (anterior a ella)."""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight(_Flight):
+    """
+    Versión para asyncio: la llamada se ejecuta en una tarea propia y todos la
+    esperan con asyncio.shield, así que si el cliente que la inició se desconecta
+    los demás no reciben su cancelación.
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        # Una tabla por event loop: las tareas pertenecen al loop que las crea
+        self._calls = weakref.WeakKeyDictionary()
+
+    async def do(self, key, func, *args, **kwargs):
+        """Espera func(*args, **kwargs) (una corrutina), compartida entre las llamadas con la misma clave."""
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        self._count(coalesced=task is not None)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(func(*args, **kwargs))
+            task.add_done_callback(functools.partial(self._finished, calls, key))
+        return copy_result(await asyncio.shield(task))
+
+    @staticmethod
+    def _finished(calls: dict, key, task):
+        if calls.get(key) is task:
+            del calls[key]
+        if not task.cancelled():
+            task.exception() # Marca la excepción como recuperada aunque nadie espere ya
+
+    def in_flight(self):
+        return sum(len(calls) for calls in list(self._calls.values()))
+
+
+def coalesced(func):
+    """Decorador: las llamadas concurrentes a func con los mismos argumentos comparten una ejecución."""
+    flight = SingleFlight(func.__name__)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = call_key(args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+        return flight.do(key, func, *args, **kwargs)
+    wrapper.flight = flight
+    return wrapper
+
+def stats():
+    """Contadores de cada operación agrupada: llamadas, ejecutadas y ahorradas (coalesced)."""
+    return [flight.stats() for flight in _flights]
@@ -0,0 +1,203 @@
+"""
+Copias completas de las tablas (exportación y restauración).
+
+La exportación usa el scan paralelo de DynamoDB: cada tabla se divide en
+SNAPSHOT_SEGMENTS segmentos (Segment/TotalSegments) y un pool de
+SNAPSHOT_WORKERS hilos los recorre a la vez, cada uno escribiendo su propio
+archivo NDJSON comprimido con gzip. Cada línea es {"Item": {...}} con los
+tipos de DynamoDB (el formato de la exportación nativa de DynamoDB a S3), así
+que números, conjuntos y fechas vuelven tal cual. Estructura de una copia:
+
+    {directorio}/manifest.json                      tablas y totales
+    {directorio}/{tabla}/manifest.json              clave, segmentos, items y sha256 de cada archivo
+    {directorio}/{tabla}/segment-0000.ndjson.gz ...
+
+Los segmentos se leen en momentos distintos: la copia no es una foto en un
+instante exacto (como ocurre con cualquier scan). La restauración comprueba
+los sha256, escribe con BatchWriteItem por bloques (los archivos en paralelo)
+y renueva los sellos de versión (services/versions.py) para que ningún ETag
+anterior a la restauración siga validando. La tabla de versiones no se copia.
+
+Uso (desde la raíz del repositorio):
+    python -m services.snapshot export [--out DIRECTORIO] [--segments 8] [--tables Minimoodle-Usuarios ...]
+    python -m services.snapshot restore DIRECTORIO [--tables ...]
+"""
+import argparse
+import contextvars
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+
+from services.jobs import add_progress
+from services.storage import TABLE_KEY_NAMES, batch_write_items, get_backend, iter_scan_pages
+from services.versions import SCOPE_USERS, SCOPE_SUBJECTS, SCOPE_TASKS, bump, enrollments_scope, submissions_scope
+from core.config import (
+    DYNAMODB_TABLE_VERSIONS, DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS,
+    SNAPSHOT_DIR, SNAPSHOT_SEGMENTS, SNAPSHOT_WORKERS, SNAPSHOT_RESTORE_BATCH
+)
+
+SNAPSHOT_TABLES = [table for table in TABLE_KEY_NAMES if table != DYNAMODB_TABLE_VERSIONS]
+MANIFEST_NAME = "manifest.json"
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+def _run_pool(calls: list):
+    """Ejecuta las funciones sin argumentos en SNAPSHOT_WORKERS hilos y devuelve sus resultados en orden."""
+    with ThreadPoolExecutor(max_workers=max(1, min(SNAPSHOT_WORKERS, len(calls))), thread_name_prefix="snapshot") as executor:
+        futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+        return [future.result() for future in futures]
+
+def _sha256(path: str):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_json(path: str, data: dict):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+# --- Exportación ---
+def _export_segment(job, directory: str, table_name: str, segment: int, total_segments: int):
+    file_name = f"segment-{segment:04d}.ndjson.gz"
+    path = os.path.join(directory, table_name, file_name)
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for items in iter_scan_pages(table_name, Segment=segment, TotalSegments=total_segments):
+            for item in items:
+                f.write(json.dumps({"Item": {name: _serializer.serialize(value) for name, value in item.items()}}) + "\n")
+            count += len(items)
+            if job is not None:
+                add_progress(job, table_name, len(items))
+    return {"file": file_name, "segment": segment, "items": count, "bytes": os.path.getsize(path), "sha256": _sha256(path)}
+
+def export_snapshot(job=None, directory: str = None, tables=None, segments: int = SNAPSHOT_SEGMENTS):
+    """
+    Exporta las tablas a `directory` (por defecto SNAPSHOT_DIR/<fecha>) y devuelve
+    el manifiesto general. Se puede lanzar como trabajo (services/jobs.py).
+    """
+    tables = list(tables or SNAPSHOT_TABLES)
+    directory = directory or os.path.join(SNAPSHOT_DIR, datetime.utcnow().strftime("%Y%m%dT%H%M%SZ"))
+    for table_name in tables:
+        os.makedirs(os.path.join(directory, table_name), exist_ok=True)
+    started = time.time()
+    # Todos los segmentos de todas las tablas comparten el pool
+    calls = [
+        (lambda t=table_name, s=segment: _export_segment(job, directory, t, s, segments))
+        for table_name in tables for segment in range(segments)
+    ]
+    results = iter(_run_pool(calls))
+    manifest = {
+        "created_at": datetime.utcfromtimestamp(started).isoformat() + "Z",
+        "backend": get_backend().name,
+        "segments": segments,
+        "tables": {},
+    }
+    for table_name in tables:
+        files = [next(results) for _ in range(segments)]
+        _write_json(os.path.join(directory, table_name, MANIFEST_NAME), {
+            "table": table_name, "key": list(TABLE_KEY_NAMES[table_name]), "format": "dynamodb-json+gzip",
+            "items": sum(f["items"] for f in files), "files": files,
+        })
+        manifest["tables"][table_name] = sum(f["items"] for f in files)
+    manifest["seconds"] = round(time.time() - started, 3)
+    _write_json(os.path.join(directory, MANIFEST_NAME), manifest)
+    return manifest
+
+# --- Restauración ---
+def _restore_file(job, directory: str, table_name: str, entry: dict, touched_users: set):
+    path = os.path.join(directory, table_name, entry["file"])
+    if _sha256(path) != entry["sha256"]:
+        raise ValueError(f"{table_name}/{entry['file']}: el sha256 no coincide con el manifiesto")
+    written = failed = 0
+    def flush(batch):
+        nonlocal written, failed
+        errors = len(batch_write_items(table_name, items=batch))
+        written += len(batch) - errors
+        failed += errors
+        if job is not None:
+            add_progress(job, table_name, len(batch) - errors)
+            if errors:
+                add_progress(job, table_name + "_fallidos", errors)
+    batch = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            item = {name: _deserializer.deserialize(value) for name, value in json.loads(line)["Item"].items()}
+            if table_name in (DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS):
+                touched_users.add((table_name, item['user_id']))
+            batch.append(item)
+            if len(batch) == SNAPSHOT_RESTORE_BATCH:
+                flush(batch)
+                batch = []
+    if batch:
+        flush(batch)
+    return written, failed
+
+def restore_snapshot(job=None, directory: str = None, tables=None):
+    """
+    Escribe en las tablas los items de una copia (sobrescribe los que tengan la
+    misma clave; no borra los demás). Devuelve {tabla: {"escritos", "fallidos"}}.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        tables = list(tables or json.load(f)["tables"])
+    calls, owners = [], []
+    touched_users = set()
+    for table_name in tables:
+        with open(os.path.join(directory, table_name, MANIFEST_NAME)) as f:
+            table_manifest = json.load(f)
+        for entry in table_manifest["files"]:
+            calls.append(lambda t=table_name, e=entry: _restore_file(job, directory, t, e, touched_users))
+            owners.append(table_name)
+    report = {table_name: {"escritos": 0, "fallidos": 0} for table_name in tables}
+    for table_name, (written, failed) in zip(owners, _run_pool(calls)):
+        report[table_name]["escritos"] += written
+        report[table_name]["fallidos"] += failed
+    scopes = [SCOPE_USERS, SCOPE_SUBJECTS, SCOPE_TASKS] + [
+        enrollments_scope(user_id) if table_name == DYNAMODB_TABLE_ENROLLMENTS else submissions_scope(user_id)
+        for table_name, user_id in touched_users
+    ]
+    bump(*scopes)
+    return report
+
+def list_snapshots(root: str = SNAPSHOT_DIR):
+    """Copias de `root` (la más reciente primero), con su manifiesto general."""
+    if not os.path.isdir(root):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(root), reverse=True):
+        path = os.path.join(root, name, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path) as f:
+                snapshots.append({"name": name, **json.load(f)})
+    return snapshots
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta o restaura una copia completa de las tablas.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Exporta las tablas con scans paralelos")
+    export_parser.add_argument("--out", help=f"Directorio de la copia (por defecto {SNAPSHOT_DIR}/<fecha>)")
+    export_parser.add_argument("--segments", type=int, default=SNAPSHOT_SEGMENTS, help="Segmentos de scan por tabla")
+    export_parser.add_argument("--tables", nargs="+", choices=SNAPSHOT_TABLES)
+    restore_parser = commands.add_parser("restore", help="Restaura una copia con escrituras por lotes")
+    restore_parser.add_argument("directory")
+    restore_parser.add_argument("--tables", nargs="+", choices=SNAPSHOT_TABLES)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        result = export_snapshot(directory=args.out, tables=args.tables, segments=args.segments)
+        failed = 0
+    else:
+        result = restore_snapshot(directory=args.directory, tables=args.tables)
+        failed = sum(counts["fallidos"] for counts in result.values())
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(1 if failed else 0)
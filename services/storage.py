@@ -1,151 +1,675 @@
-import boto3
+import base64
+import calendar
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import Binary, TypeSerializer, TypeDeserializer
 from botocore.exceptions import ClientError
-from datetime import datetime
+from datetime import datetime, timezone
+from decimal import Decimal
 
 # Importaciones de nuestro proyecto
+from services.backends import create_table_backend, create_object_store
+from services.cache import TTLCache, MISSING
+from services.singleflight import SingleFlight, coalesced
+from services.local_standin import start_local_standin
 from models.schemas import UserInDB, TaskInDB, Enrollment, SubmissionInDB, SubmissionStatus
 from core.config import (
-    AWS_REGION, DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS,
+    STORAGE_STANDIN, DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS,
     DYNAMODB_TABLE_TASKS, DYNAMODB_TABLE_ENROLLMENTS, S3_BUCKET_TASKS,
-    DYNAMODB_TABLE_SUBMISSIONS # Necesitarás añadir esta tabla en config.py
+    DYNAMODB_TABLE_SUBMISSIONS, # Necesitarás añadir esta tabla en config.py
+    DYNAMODB_TABLE_TASK_BOARDS, DYNAMODB_TABLE_VERSIONS,
+    BATCH_MAX_WORKERS,
+    CACHE_USERS_MAXSIZE, CACHE_USERS_TTL, CACHE_SUBJECTS_MAXSIZE, CACHE_SUBJECTS_TTL,
+    CACHE_TASKS_MAXSIZE, CACHE_TASKS_TTL,
+    MULTIPART_PART_SIZE_MIN, MULTIPART_PART_SIZE, MULTIPART_MAX_PARTS, MULTIPART_URL_EXPIRATION
 )
 
-# Inicializar clientes de AWS
-dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
-s3_client = boto3.client('s3', region_name=AWS_REGION)
+logger = logging.getLogger(__name__)
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+# Espacio de nombres de los submission_id deterministas (submission_id_for)
+_SUBMISSION_ID_NAMESPACE = uuid.UUID('6f1c2a5e-3d4b-5f60-9a7b-8c9d0e1f2a3b')
+
+# Los backends (DynamoDB/S3 o SQLite/disco local, según core/config.py) se crean
+# en la primera llamada o en prewarm(): importar el módulo no crea clientes de AWS,
+# que es lo más caro del arranque de un contenedor.
+_backend = None
+_object_store = None
+_init_lock = threading.Lock()
+
+def _start_standin():
+    if STORAGE_STANDIN == "moto":
+        start_local_standin()
+
+def get_backend():
+    """Backend de tablas del proceso, creado una sola vez."""
+    global _backend
+    if _backend is None:
+        with _init_lock:
+            if _backend is None:
+                _start_standin()
+                _backend = create_table_backend()
+    return _backend
+
+def get_object_store():
+    """Almacén de archivos del proceso, creado una sola vez."""
+    global _object_store
+    if _object_store is None:
+        with _init_lock:
+            if _object_store is None:
+                _start_standin()
+                _object_store = create_object_store()
+    return _object_store
+
+def prewarm():
+    """
+    Crea los backends y abre sus conexiones (credenciales, endpoints, TLS) antes
+    de la primera petición. main.py lo lanza en segundo plano al arrancar.
+    """
+    started = time.perf_counter()
+    try:
+        get_backend().prewarm()
+        get_object_store().prewarm()
+    except Exception:
+        # Las peticiones volverán a intentarlo al crear los backends bajo demanda
+        logger.exception("Error al precalentar el almacenamiento")
+        return None
+    elapsed = time.perf_counter() - started
+    logger.info("Almacenamiento precalentado en %.3f s", elapsed)
+    return elapsed
 
 # --- Funciones de S3 ---
-# Reemplaza la función existente con esta
 def create_presigned_url(bucket_name: str, object_name: str, content_type: str, expiration=604800):
     """
     Genera una URL prefirmada explícitamente para subir un archivo (PUT),
     incluyendo el Content-Type en la firma.
     """
-    try:
-        response = s3_client.generate_presigned_url(
-            'put_object',
-            Params={'Bucket': bucket_name,
-                    'Key': object_name,
-                    'ContentType': content_type}, # <-- AÑADIDO
-            ExpiresIn=expiration,
-            HttpMethod='PUT'
-        )
-    except ClientError as e:
-        print(f"Error al generar URL prefirmada: {e}")
-        return None
-    return response
+    return get_object_store().create_presigned_url(bucket_name, object_name, content_type, expiration)
+
+def create_presigned_urls(bucket_name: str, objects: list, expiration=604800):
+    """
+    Genera en una sola pasada las URLs prefirmadas (PUT) de varios objetos.
+    `objects` es una lista de pares (object_name, content_type).
+    Devuelve la lista de URLs en el mismo orden, o None si alguna falla.
+    """
+    return get_object_store().create_presigned_urls(bucket_name, objects, expiration)
 
+def multipart_plan(size: int):
+    """
+    (tamaño de parte, número de partes) para subir `size` bytes. Parte de
+    MULTIPART_PART_SIZE y la agranda (en MiB enteros) cuando el archivo no cabría
+    en MULTIPART_MAX_PARTS partes.
+    """
+    mib = 1024 * 1024
+    needed = -(-size // MULTIPART_MAX_PARTS)
+    part_size = max(MULTIPART_PART_SIZE, MULTIPART_PART_SIZE_MIN, -(-needed // mib) * mib)
+    return part_size, max(1, -(-size // part_size))
+
+def start_multipart_upload(bucket_name: str, object_name: str, content_type: str):
+    """Inicia una subida multiparte. Devuelve el upload_id, o None si falla."""
+    return get_object_store().create_multipart_upload(bucket_name, object_name, content_type)
+
+def create_presigned_part_urls(bucket_name: str, object_name: str, upload_id: str, part_numbers: list, expiration=MULTIPART_URL_EXPIRATION):
+    """URLs prefirmadas (PUT) de las partes indicadas, en el mismo orden, o None si falla."""
+    return get_object_store().create_presigned_part_urls(bucket_name, object_name, upload_id, part_numbers, expiration)
+
+def complete_multipart_upload(bucket_name: str, object_name: str, upload_id: str, parts: list):
+    """Une las partes [(part_number, etag)] en el objeto. True si el objeto quedó creado."""
+    return get_object_store().complete_multipart_upload(bucket_name, object_name, upload_id, parts)
+
+def abort_multipart_upload(bucket_name: str, object_name: str, upload_id: str):
+    """Descarta una subida multiparte y sus partes."""
+    return get_object_store().abort_multipart_upload(bucket_name, object_name, upload_id)
 
 def delete_s3_object(bucket_name: str, object_name: str):
     """Elimina un objeto específico de un bucket de S3."""
-    try:
-        s3_client.delete_object(Bucket=bucket_name, Key=object_name)
-        return True
-    except ClientError:
-        return False
+    return get_object_store().delete_object(bucket_name, object_name)
+
+def delete_s3_objects(bucket_name: str, object_names: list):
+    """Elimina varios objetos. Devuelve el número de objetos que no se pudieron eliminar."""
+    return get_object_store().delete_objects(bucket_name, object_names)
+
+def open_s3_object(bucket_name: str, object_name: str):
+    """Abre un objeto para leerlo por bloques. Devuelve (tamaño, flujo), o None si no existe."""
+    return get_object_store().open_object(bucket_name, object_name)
+
+def iter_s3_key_pages(bucket_name: str, prefix: str):
+    """Genera, página a página (hasta 1000 claves), las claves de S3 bajo un prefijo."""
+    return get_object_store().iter_key_pages(bucket_name, prefix)
 
 # --- Funciones de DynamoDB ---
 
+# Atributos de la clave primaria de cada tabla
+TABLE_KEY_NAMES = {
+    DYNAMODB_TABLE_USERS: ('user_id',),
+    DYNAMODB_TABLE_SUBJECTS: ('subject_id',),
+    DYNAMODB_TABLE_TASKS: ('task_id',),
+    DYNAMODB_TABLE_ENROLLMENTS: ('subject_id', 'user_id'),
+    DYNAMODB_TABLE_SUBMISSIONS: ('submission_id',),
+    DYNAMODB_TABLE_TASK_BOARDS: ('user_id', 'subject_id'),
+    DYNAMODB_TABLE_VERSIONS: ('scope',),
+}
+
+def item_key(table_name: str, item: dict):
+    """Extrae la clave primaria de un item."""
+    return {name: item[name] for name in TABLE_KEY_NAMES[table_name]}
+
 # -- CRUD Genérico --
-def get_item(table_name, key): return dynamodb.Table(table_name).get_item(Key=key).get('Item')
-def scan_items(table_name): return dynamodb.Table(table_name).scan().get('Items', [])
-def put_item(table_name, item): dynamodb.Table(table_name).put_item(Item=item); return item
-def delete_item(table_name, key): dynamodb.Table(table_name).delete_item(Key=key); return True
+# Lecturas por clave en curso: las peticiones simultáneas de la misma clave
+# (p. ej. la misma tarea al acercarse la fecha de entrega) comparten un GetItem
+_get_item_flight = SingleFlight("get_item")
+
+def _fetch_item(table_name, key):
+    return _get_item_flight.do((table_name, _key_id(key)), get_backend().get_item, table_name, key)
+
+def get_item(table_name, key):
+    cache = _caches.get(table_name)
+    if cache is None:
+        return _fetch_item(table_name, key)
+    key_id = _key_id(key)
+    cached = cache.get(key_id)
+    if cached is not MISSING:
+        return dict(cached) # Copia: los llamadores modifican el item (p. ej. al parsear fechas)
+    generation = cache.generation(key_id)
+    item = _fetch_item(table_name, key)
+    if item:
+        # Si se escribió mientras se leía, el valor de la caché ya es el nuevo
+        cache.set_if_unchanged(key_id, dict(item), generation)
+    return item
+def scan_items(table_name): return list(iter_scan(table_name))
+def put_item(table_name, item):
+    get_backend().put_item(table_name, item)
+    _refresh_cached(table_name, item)
+    return item
+def put_item_if_absent(table_name: str, item: dict):
+    """
+    Escribe el item solo si no existe otro con la misma clave, en una sola llamada
+    (ConditionExpression attribute_not_exists). Devuelve False si ya existía.
+    """
+    if not get_backend().put_item(table_name, item, if_absent=True):
+        return False
+    _refresh_cached(table_name, item)
+    return True
+def delete_item(table_name, key):
+    get_backend().delete_item(table_name, key)
+    invalidate_cached(table_name, key)
+    return True
+
+def update_item_paths(table_name: str, key: dict, set_paths: dict = None, remove_paths: list = None):
+    """
+    Actualiza atributos anidados de un item existente con un solo UpdateItem.
+    `set_paths` es {ruta: valor} y `remove_paths` una lista de rutas; cada ruta es
+    una tupla de nombres, p. ej. ('tasks', task_id, 'submission').
+    Devuelve False si el item no existe o alguna ruta intermedia falta
+    (el llamador decide si reconstruirlo), True en caso contrario.
+    """
+    try:
+        return get_backend().update_item_paths(table_name, key, set_paths, remove_paths)
+    finally:
+        invalidate_cached(table_name, key)
+
+# -- Caché de lectura (usuarios, materias y tareas) --
+# Se leen en casi todas las peticiones (permisos, nombres) y se escriben muy poco.
+# Cada proceso tiene su propia caché; el TTL acota cuánto puede tardar en verse
+# una escritura hecha desde otra instancia.
+_caches = {
+    DYNAMODB_TABLE_USERS: TTLCache(CACHE_USERS_MAXSIZE, CACHE_USERS_TTL, name=DYNAMODB_TABLE_USERS),
+    DYNAMODB_TABLE_SUBJECTS: TTLCache(CACHE_SUBJECTS_MAXSIZE, CACHE_SUBJECTS_TTL, name=DYNAMODB_TABLE_SUBJECTS),
+    DYNAMODB_TABLE_TASKS: TTLCache(CACHE_TASKS_MAXSIZE, CACHE_TASKS_TTL, name=DYNAMODB_TABLE_TASKS),
+}
+
+def _refresh_cached(table_name: str, item: dict):
+    """Tras escribir un item completo, lo deja actualizado en la caché de su tabla."""
+    key_id = _key_id(item_key(table_name, item))
+    _get_item_flight.forget((table_name, key_id))
+    cache = _caches.get(table_name)
+    if cache is not None:
+        cache.set(key_id, dict(item))
+
+def invalidate_cached(table_name: str, key: dict):
+    """Elimina de la caché la entrada de una clave (tras borrarla o modificarla parcialmente)."""
+    _get_item_flight.forget((table_name, _key_id(key)))
+    cache = _caches.get(table_name)
+    if cache is not None:
+        cache.invalidate(_key_id(key))
+
+def cache_stats():
+    """Contadores de aciertos/fallos/expulsiones de cada caché, para ajustarlas bajo carga."""
+    return [cache.stats() for cache in _caches.values()]
+
+# -- Paginación --
+# Scan y Query devuelven como máximo 1 MB por llamada; estos generadores siguen
+# LastEvaluatedKey y recorren todas las páginas de forma perezosa.
+def iter_pages(operation, **kwargs):
+    """Genera las respuestas sucesivas de una operación Scan/Query paginada."""
+    while True:
+        response = operation(**kwargs)
+        yield response
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+def iter_scan_pages(table_name: str, **kwargs):
+    """Genera los items de una tabla como una lista por página."""
+    for page in iter_pages(functools.partial(get_backend().scan, table_name), **kwargs):
+        yield page.get('Items', [])
+
+def iter_scan(table_name: str, **kwargs):
+    """Recorre todos los items de una tabla, página a página."""
+    for items in iter_scan_pages(table_name, **kwargs):
+        yield from items
+
+def iter_query_pages(table_name: str, key_condition, index_name: str = None, **kwargs):
+    """Genera los resultados de una query (sobre la tabla o un GSI) como una lista por página."""
+    if index_name:
+        kwargs['IndexName'] = index_name
+    for page in iter_pages(functools.partial(get_backend().query, table_name), KeyConditionExpression=key_condition, **kwargs):
+        yield page.get('Items', [])
+
+def iter_query(table_name: str, key_condition, index_name: str = None, **kwargs):
+    """Recorre todos los resultados de una query (sobre la tabla o un GSI), página a página."""
+    for items in iter_query_pages(table_name, key_condition, index_name, **kwargs):
+        yield from items
+
+def encode_cursor(last_key: dict):
+    """Convierte un LastEvaluatedKey en un cursor opaco para los clientes."""
+    wire = {name: _serializer.serialize(value) for name, value in last_key.items()}
+    return base64.urlsafe_b64encode(json.dumps(wire, separators=(',', ':')).encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Operación inversa de encode_cursor. Lanza ValueError si el cursor no es válido."""
+    try:
+        wire = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {name: _deserializer.deserialize(value) for name, value in wire.items()}
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+
+def scan_page(table_name: str, limit: int, cursor: str = None):
+    """
+    Lee una página acotada de una tabla. Devuelve (items, next_cursor);
+    next_cursor es None cuando no quedan más resultados.
+    """
+    kwargs = {'Limit': limit}
+    if cursor:
+        start_key = decode_cursor(cursor)
+        # Un cursor bien formado pero de otra tabla (o manipulado) no llega al backend
+        if sorted(start_key) != sorted(TABLE_KEY_NAMES[table_name]) or not all(
+            isinstance(value, (str, Decimal, Binary)) for value in start_key.values()
+        ):
+            raise ValueError("Cursor inválido")
+        kwargs['ExclusiveStartKey'] = start_key
+    response = get_backend().scan(table_name, **kwargs)
+    last_key = response.get('LastEvaluatedKey')
+    return response.get('Items', []), encode_cursor(last_key) if last_key else None
+
+# -- Lectura por lotes --
+def _key_id(key: dict):
+    """Identificador hashable de una clave de DynamoDB (independiente del orden de los atributos)."""
+    return tuple(sorted(key.items()))
+
+# Pool compartido de _run_parallel, creado en el primer uso como los backends. Sus
+# tareas no vuelven a usarlo (los lotes del backend tienen su propio pool), así
+# que no puede quedarse bloqueado esperándose a sí mismo.
+_parallel_executor = None
+
+def _get_parallel_executor():
+    global _parallel_executor
+    if _parallel_executor is None:
+        with _init_lock:
+            if _parallel_executor is None:
+                _parallel_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="storage-parallel")
+    return _parallel_executor
+
+def _run_parallel(*calls):
+    """
+    Ejecuta varias funciones sin argumentos en hilos y devuelve sus resultados en orden.
+    Cada hilo recibe una copia del contexto de la petición (métricas); la última
+    función se ejecuta en el hilo que llama.
+    """
+    executor = _get_parallel_executor()
+    futures = [executor.submit(contextvars.copy_context().run, call) for call in calls[:-1]]
+    last = calls[-1]()
+    return [future.result() for future in futures] + [last]
+
+def batch_get_items(table_name: str, keys: list):
+    """
+    Obtiene varios items de una tabla con BatchGetItem. Las claves se
+    de-duplican, se agrupan en bloques de BATCH_GET_MAX_KEYS y los bloques
+    se piden en paralelo. Devuelve la lista de items encontrados (sin orden
+    garantizado); las claves inexistentes simplemente no aparecen.
+    En las tablas con caché solo se piden a DynamoDB las claves que no están en ella.
+    """
+    unique_keys = {_key_id(key): key for key in keys}
+    items = []
+    generations = {}
+    cache = _caches.get(table_name)
+    if cache is not None:
+        for key_id in list(unique_keys):
+            cached = cache.get(key_id)
+            if cached is not MISSING:
+                items.append(dict(cached))
+                del unique_keys[key_id]
+            else:
+                generations[key_id] = cache.generation(key_id)
+    fetched = get_backend().batch_get(table_name, list(unique_keys.values())) if unique_keys else []
+    if cache is not None:
+        for item in fetched:
+            key_id = _key_id(item_key(table_name, item))
+            cache.set_if_unchanged(key_id, dict(item), generations[key_id])
+    return items + fetched
+
+def batch_get_map(table_name: str, key_name: str, values):
+    """Atajo para tablas con clave simple: devuelve {valor_de_clave: item}."""
+    items = batch_get_items(table_name, [{key_name: value} for value in values])
+    return {item[key_name]: item for item in items}
+
+# -- Escritura por lotes --
+def batch_write_items(table_name: str, items=(), delete_keys=()):
+    """
+    Escribe y/o borra varios items con BatchWriteItem, en bloques de
+    BATCH_WRITE_MAX_ITEMS enviados en paralelo. Si una clave se repite, prevalece
+    la última operación (DynamoDB rechaza claves duplicadas en una misma llamada).
+    Devuelve las peticiones que quedaron sin escribir tras los reintentos.
+    """
+    requests = {}
+    for item in items:
+        requests[_key_id(item_key(table_name, item))] = {'PutRequest': {'Item': item}}
+    for key in delete_keys:
+        requests[_key_id(key)] = {'DeleteRequest': {'Key': key}}
+    failed = get_backend().batch_write(table_name, list(requests.values())) if requests else []
+    for key_id in requests:
+        invalidate_cached(table_name, dict(key_id))
+    return failed
+
+class BatchLoader:
+    """
+    Cargador por petición: acumula las claves que un endpoint necesita
+    (de una o varias tablas) y las resuelve todas juntas con BatchGetItem
+    al llamar a load(), en lugar de hacer un GetItem por cada clave.
+    """
+    def __init__(self):
+        self._pending = {}
+        self._loaded = {}
+
+    def add(self, table_name: str, key: dict):
+        """Registra una clave para cargarla en el próximo load()."""
+        key_id = _key_id(key)
+        if (table_name, key_id) not in self._loaded:
+            self._pending.setdefault(table_name, {})[key_id] = key
+
+    def load(self):
+        """Resuelve todas las claves pendientes con el menor número de llamadas posible."""
+        for table_name, keys in self._pending.items():
+            key_names = next(iter(keys.values())).keys()
+            for item in batch_get_items(table_name, list(keys.values())):
+                key_id = _key_id({name: item[name] for name in key_names})
+                self._loaded[(table_name, key_id)] = item
+            for key_id in keys:
+                self._loaded.setdefault((table_name, key_id), None)
+        self._pending = {}
+        return self
+
+    def get(self, table_name: str, key: dict):
+        """Devuelve el item ya cargado para la clave, o None si no existe."""
+        return self._loaded.get((table_name, _key_id(key)))
 
 # -- Lógica de Negocio --
+# Las consultas de tareas y asignaturas llevan @coalesced (services/singleflight.py):
+# las llamadas simultáneas con los mismos argumentos comparten una sola query. Las
+# escrituras no descartan esas queries en curso, así que quien se una a una que
+# empezó antes de su escritura puede no verla (sin read-your-writes; igual que
+# cualquier lectura de un GSI, que ya es eventualmente consistente). Por eso las
+# consultas de matrículas y entregas, que el mismo usuario lee justo después de
+# escribir, no se agrupan.
+# Las fechas de las tareas se guardan como segundos epoch (UTC) para poder usarlas
+# como clave de ordenación de los GSIs subject-deadline-index y subject-expiry-index
+TASK_DATE_FIELDS = ('fecha_creacion', 'fecha_entrega', 'fecha_caducidad')
+
+def to_epoch(value: datetime):
+    """Segundos epoch de un datetime; los datetime sin zona se interpretan como UTC."""
+    return calendar.timegm(value.utctimetuple())
+
+def from_epoch(value):
+    """Inverso de to_epoch: datetime UTC sin zona, como datetime.utcnow()."""
+    return datetime.fromtimestamp(int(value), timezone.utc).replace(tzinfo=None)
+
+def _parse_task_date(value):
+    if isinstance(value, str):
+        # Formato antiguo (ISO) de los items aún no migrados (services/migrate_task_dates.py)
+        parsed = datetime.fromisoformat(value)
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+    if isinstance(value, datetime):
+        return value
+    return from_epoch(value)
+
+def task_to_item(task: TaskInDB):
+    """Convierte una tarea al item que se guarda en DynamoDB (fechas en segundos epoch)."""
+    item = task.dict()
+    for field in TASK_DATE_FIELDS:
+        item[field] = to_epoch(item[field])
+    return item
+
+def parse_task_dates(item: dict):
+    """Convierte las fechas de una tarea (epoch o, en items antiguos, ISO string) a datetime."""
+    for field in TASK_DATE_FIELDS:
+        item[field] = _parse_task_date(item[field])
+    return item
+
 def get_task_by_id_from_db(task_id: str):
     item = get_item(DYNAMODB_TABLE_TASKS, {'task_id': task_id})
     if item:
-        item['fecha_creacion'] = datetime.fromisoformat(item['fecha_creacion'])
-        item['fecha_entrega'] = datetime.fromisoformat(item['fecha_entrega'])
-        item['fecha_caducidad'] = datetime.fromisoformat(item['fecha_caducidad'])
+        parse_task_dates(item)
     return item
 
 def is_student_enrolled(user_id: str, subject_id: str):
     return get_item(DYNAMODB_TABLE_ENROLLMENTS, {'subject_id': subject_id, 'user_id': user_id}) is not None
 
 def get_student_subjects(user_id: str):
-    table = dynamodb.Table(DYNAMODB_TABLE_ENROLLMENTS)
-    response = table.query(
-        IndexName='user-subject-index', # Necesitarás crear un GSI en esta tabla
-        KeyConditionExpression=boto3.dynamodb.conditions.Key('user_id').eq(user_id)
-    )
-    return response.get('Items', [])
+    return list(iter_query(
+        DYNAMODB_TABLE_ENROLLMENTS, Key('user_id').eq(user_id),
+        index_name='user-subject-index' # Necesitarás crear un GSI en esta tabla
+    ))
 
+@coalesced
 def get_tasks_for_subject(subject_id: str):
-    table = dynamodb.Table(DYNAMODB_TABLE_TASKS)
-    response = table.query(
-        IndexName='subject-tasks-index', # Necesitarás crear un GSI en esta tabla
-        KeyConditionExpression=boto3.dynamodb.conditions.Key('subject_id').eq(subject_id)
-    )
-    return response.get('Items', [])
+    return list(iter_query(
+        DYNAMODB_TABLE_TASKS, Key('subject_id').eq(subject_id),
+        index_name='subject-tasks-index' # Necesitarás crear un GSI en esta tabla
+    ))
+
+# Las consultas por rango de fechas se hacen sobre el rango ampliado a minutos
+# completos: cada petición llega con su propio utcnow() y, sin redondear, nunca
+# coincidirían dos claves de @coalesced. El resultado se recorta después al rango pedido.
+_WINDOW_SECONDS = 60
+
+def _window(start: datetime, end: datetime):
+    """(inicio, fin) en segundos epoch y su ampliación a minutos completos."""
+    start, end = to_epoch(start), to_epoch(end)
+    return start, end, start - start % _WINDOW_SECONDS, -(-end // _WINDOW_SECONDS) * _WINDOW_SECONDS
+
+@coalesced
+def _tasks_due_between(subject_id: str, start: int, end: int):
+    return list(iter_query(
+        DYNAMODB_TABLE_TASKS,
+        Key('subject_id').eq(subject_id) & Key('fecha_entrega').between(start, end),
+        index_name='subject-deadline-index'
+    ))
+
+def get_tasks_due_between(subject_id: str, start: datetime, end: datetime):
+    """Tareas de una materia con fecha de entrega en [start, end]; el rango se resuelve en el GSI."""
+    start, end, query_start, query_end = _window(start, end)
+    return [task for task in _tasks_due_between(subject_id, query_start, query_end) if start <= task['fecha_entrega'] <= end]
+
+@coalesced
+def _overdue_tasks_closing_between(subject_id: str, start: int, end: int, due_before: int):
+    return list(iter_query(
+        DYNAMODB_TABLE_TASKS,
+        Key('subject_id').eq(subject_id) & Key('fecha_caducidad').between(start, end),
+        index_name='subject-expiry-index',
+        FilterExpression=Attr('fecha_entrega').lt(due_before)
+    ))
+
+def get_overdue_tasks_closing_between(subject_id: str, start: datetime, end: datetime):
+    """
+    Tareas de una materia cuya fecha de entrega ya pasó (antes de `start`) pero que
+    aún admiten entregas tardías y cierran (fecha de caducidad) en [start, end].
+    """
+    start, end, query_start, query_end = _window(start, end)
+    return [
+        task for task in _overdue_tasks_closing_between(subject_id, query_start, query_end, query_start + _WINDOW_SECONDS)
+        if start <= task['fecha_caducidad'] <= end and task['fecha_entrega'] < start
+    ]
 
 def get_students_for_subject(subject_id: str):
     """Obtiene todos los user_id de los estudiantes inscritos en una materia."""
-    table = dynamodb.Table(DYNAMODB_TABLE_ENROLLMENTS)
     try:
         # La clave de partición de la tabla base es subject_id, por lo que una query es eficiente.
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('subject_id').eq(subject_id)
-        )
-        return response.get('Items', [])
+        return list(iter_query(DYNAMODB_TABLE_ENROLLMENTS, Key('subject_id').eq(subject_id)))
     except ClientError:
         return []
 
 def get_submission(user_id: str, task_id: str):
     """Obtiene la entrega de un estudiante para una tarea específica."""
-    table = dynamodb.Table(DYNAMODB_TABLE_SUBMISSIONS)
     try:
         # Se requiere un Índice Secundario Global (GSI) para esta consulta.
-        response = table.query(
-            IndexName='user-task-index', # Asegúrate de que este índice exista
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('user_id').eq(user_id) & boto3.dynamodb.conditions.Key('task_id').eq(task_id)
+        items = iter_query(
+            DYNAMODB_TABLE_SUBMISSIONS, Key('user_id').eq(user_id) & Key('task_id').eq(task_id),
+            index_name='user-task-index' # Asegúrate de que este índice exista
         )
-        items = response.get('Items', [])
-        return items[0] if items else None
+        return next(items, None)
     except ClientError:
         return None
 
+def get_submissions_for_student(user_id: str):
+    """Obtiene todas las entregas de un estudiante con una sola query al GSI user-task-index."""
+    try:
+        return list(iter_query(DYNAMODB_TABLE_SUBMISSIONS, Key('user_id').eq(user_id), index_name='user-task-index'))
+    except ClientError:
+        return []
+
+def submission_id_for(user_id: str, task_id: str):
+    """
+    Id determinista de la entrega de un estudiante en una tarea: los reintentos y
+    los reenvíos sobrescriben el mismo item en lugar de crear uno nuevo.
+    """
+    return str(uuid.uuid5(_SUBMISSION_ID_NAMESPACE, f"{user_id}/{task_id}"))
+
+def submission_object_names(submission: dict):
+    """Todas las claves de S3 de una entrega (los registros antiguos de un archivo tienen la lista vacía)."""
+    names = list(submission.get('s3_object_names') or [])
+    if submission['s3_object_name'] not in names:
+        names.insert(0, submission['s3_object_name'])
+    return names
+
 def create_submission_db(submission: SubmissionInDB):
-    """Guarda un registro de entrega en DynamoDB."""
-    table = dynamodb.Table(DYNAMODB_TABLE_SUBMISSIONS)
+    """
+    Registra la entrega de un estudiante en una tarea (un item por estudiante y
+    tarea, ver submission_id_for). Si ya existe, se le añaden los objetos nuevos:
+    varias llamadas a upload-url (una por archivo) o una subida multiparte
+    posterior acumulan sus archivos en lugar de sustituirse. Repetir la llamada
+    con los mismos objetos no los duplica, pero sí actualiza fecha_entrega: el
+    archivo se ha vuelto a subir. Devuelve el item resultante.
+    """
     try:
         item = submission.dict()
-        item['fecha_entrega'] = item['fecha_entrega'].isoformat()
-        table.put_item(Item=item)
-        return item
+        key = {'submission_id': item.pop('submission_id')}
+        pending = item.pop('s3_object_names') or [item['s3_object_name']]
+        set_values = {'fecha_entrega': item.pop('fecha_entrega').isoformat()}
+        backend = get_backend()
+        # Si algún objeto ya estaba registrado, se reintenta solo con los que faltan;
+        # sin ninguno pendiente la escritura es incondicional y solo fija fecha_entrega
+        while not backend.append_to_list(
+            DYNAMODB_TABLE_SUBMISSIONS, key, 's3_object_names', pending, set_values=set_values, defaults=item
+        ):
+            current = backend.get_item(DYNAMODB_TABLE_SUBMISSIONS, key)
+            present = set(submission_object_names(current)) if current else set()
+            pending = [name for name in pending if name not in present]
+        invalidate_cached(DYNAMODB_TABLE_SUBMISSIONS, key)
+        return backend.get_item(DYNAMODB_TABLE_SUBMISSIONS, key)
     except ClientError:
         return None
 
 def delete_submission_db(submission_id: str):
     """Elimina un registro de entrega de DynamoDB."""
-    table = dynamodb.Table(DYNAMODB_TABLE_SUBMISSIONS)
     try:
-        table.delete_item(Key={'submission_id': submission_id})
+        get_backend().delete_item(DYNAMODB_TABLE_SUBMISSIONS, {'submission_id': submission_id})
         return True
     except ClientError:
         return False
 
+@coalesced
 def get_subjects_by_teacher(teacher_id: str):
     """Obtiene todas las materias asignadas a un docente usando un GSI."""
-    table = dynamodb.Table(DYNAMODB_TABLE_SUBJECTS)
     try:
-        response = table.query(
-            IndexName='teacher-index', # Asegúrate de que este GSI exista
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('teacher_id').eq(teacher_id)
-        )
-        return response.get('Items', [])
+        return list(iter_query(
+            DYNAMODB_TABLE_SUBJECTS, Key('teacher_id').eq(teacher_id),
+            index_name='teacher-index' # Asegúrate de que este GSI exista
+        ))
     except ClientError:
         return []
 
 def get_submissions_for_task(task_id: str):
     """Obtiene todas las entregas para una tarea específica usando un GSI."""
-    table = dynamodb.Table(DYNAMODB_TABLE_SUBMISSIONS)
     try:
-        response = table.query(
-            IndexName='task-index', # Asegúrate de que este GSI exista
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('task_id').eq(task_id)
-        )
-        return response.get('Items', [])
+        return list(iter_query(
+            DYNAMODB_TABLE_SUBMISSIONS, Key('task_id').eq(task_id),
+            index_name='task-index' # Asegúrate de que este GSI exista
+        ))
+    except ClientError:
+        return []
+
+def get_submission_dates_for_task(task_id: str):
+    """
+    Versión compacta de get_submissions_for_task: {user_id: fecha_entrega}.
+    Las páginas se reducen a medida que llegan, sin guardar las entregas completas.
+    """
+    dates = {}
+    try:
+        for page in iter_query_pages(
+            DYNAMODB_TABLE_SUBMISSIONS, Key('task_id').eq(task_id), index_name='task-index',
+            ProjectionExpression='user_id, fecha_entrega'
+        ):
+            for submission in page:
+                dates[submission['user_id']] = submission['fecha_entrega']
     except ClientError:
-        return []
\ No newline at end of file
+        pass
+    return dates
+
+# -- Vistas compuestas --
+# Con un backend relacional (supports_joins) cada vista es un solo join;
+# en DynamoDB se componen con queries a los GSIs y lecturas por lotes.
+def get_student_subject_items(user_id: str):
+    """Materias (items completos) en las que está inscrito un estudiante."""
+    backend = get_backend()
+    if backend.supports_joins:
+        return backend.student_subjects(user_id)
+    enrollments = get_student_subjects(user_id)
+    subjects = batch_get_map(DYNAMODB_TABLE_SUBJECTS, 'subject_id', [en['subject_id'] for en in enrollments])
+    # Las materias eliminadas no aparecen en el resultado del lote
+    return [subjects[en['subject_id']] for en in enrollments if en['subject_id'] in subjects]
+
+def get_task_roster(task_id: str, subject_id: str):
+    """
+    Pares (estudiante, entrega o None) de una tarea: primero quienes entregaron y
+    después los inscritos que aún no lo han hecho. Los usuarios eliminados no aparecen.
+    """
+    backend = get_backend()
+    if backend.supports_joins:
+        rows = backend.task_roster(task_id, subject_id)
+        return sorted(rows, key=lambda row: row[1] is None)
+    submissions, enrollments = _run_parallel(
+        lambda: get_submissions_for_task(task_id),
+        lambda: get_students_for_subject(subject_id),
+    )
+    by_user = {submission['user_id']: submission for submission in submissions}
+    user_ids = list(dict.fromkeys(list(by_user) + [en['user_id'] for en in enrollments]))
+    students = batch_get_map(DYNAMODB_TABLE_USERS, 'user_id', user_ids)
+    return [(students[user_id], by_user.get(user_id)) for user_id in user_ids if user_id in students]
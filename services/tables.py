@@ -0,0 +1,84 @@
+"""
+Definición de las tablas de DynamoDB (claves e índices) que usa la aplicación.
+
+Sirve para crear las tablas en un entorno local (services/local_standin.py,
+DynamoDB Local) con exactamente los mismos GSIs que en AWS.
+"""
+from core.config import (
+    DYNAMODB_TABLE_USERS, DYNAMODB_TABLE_SUBJECTS, DYNAMODB_TABLE_TASKS,
+    DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_SUBMISSIONS, DYNAMODB_TABLE_TASK_BOARDS,
+    DYNAMODB_TABLE_VERSIONS
+)
+
+# Cada clave o índice es una lista de (atributo, tipo); el primero es HASH y el segundo RANGE.
+TABLE_DEFINITIONS = {
+    DYNAMODB_TABLE_USERS: {
+        "key": [("user_id", "S")],
+        "indexes": {},
+    },
+    DYNAMODB_TABLE_SUBJECTS: {
+        "key": [("subject_id", "S")],
+        "indexes": {"teacher-index": [("teacher_id", "S")]},
+    },
+    DYNAMODB_TABLE_TASKS: {
+        "key": [("task_id", "S")],
+        "indexes": {
+            "subject-tasks-index": [("subject_id", "S")],
+            # Fechas en segundos epoch: consultas por rango de fechas dentro de una materia
+            "subject-deadline-index": [("subject_id", "S"), ("fecha_entrega", "N")],
+            "subject-expiry-index": [("subject_id", "S"), ("fecha_caducidad", "N")],
+        },
+    },
+    DYNAMODB_TABLE_ENROLLMENTS: {
+        "key": [("subject_id", "S"), ("user_id", "S")],
+        "indexes": {"user-subject-index": [("user_id", "S")]},
+    },
+    DYNAMODB_TABLE_SUBMISSIONS: {
+        "key": [("submission_id", "S")],
+        "indexes": {
+            "user-task-index": [("user_id", "S"), ("task_id", "S")],
+            "task-index": [("task_id", "S")],
+        },
+    },
+    DYNAMODB_TABLE_TASK_BOARDS: {
+        "key": [("user_id", "S"), ("subject_id", "S")],
+        "indexes": {},
+    },
+    DYNAMODB_TABLE_VERSIONS: {
+        "key": [("scope", "S")],
+        "indexes": {},
+    },
+}
+
+def _key_schema(attributes):
+    return [
+        {"AttributeName": name, "KeyType": "HASH" if position == 0 else "RANGE"}
+        for position, (name, _) in enumerate(attributes)
+    ]
+
+def create_table_request(table_name: str):
+    """Parámetros de CreateTable (modo PAY_PER_REQUEST, GSIs con proyección ALL)."""
+    definition = TABLE_DEFINITIONS[table_name]
+    attribute_types = dict(definition["key"])
+    for attributes in definition["indexes"].values():
+        attribute_types.update(attributes)
+    request = {
+        "TableName": table_name,
+        "KeySchema": _key_schema(definition["key"]),
+        "AttributeDefinitions": [{"AttributeName": n, "AttributeType": t} for n, t in attribute_types.items()],
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+    if definition["indexes"]:
+        request["GlobalSecondaryIndexes"] = [
+            {"IndexName": name, "KeySchema": _key_schema(attributes), "Projection": {"ProjectionType": "ALL"}}
+            for name, attributes in definition["indexes"].items()
+        ]
+    return request
+
+def create_tables(dynamodb_client):
+    """Crea las tablas que aún no existen y espera a que estén activas."""
+    existing = set(dynamodb_client.list_tables().get("TableNames", []))
+    for table_name in TABLE_DEFINITIONS:
+        if table_name not in existing:
+            dynamodb_client.create_table(**create_table_request(table_name))
+            dynamodb_client.get_waiter("table_exists").wait(TableName=table_name)
@@ -0,0 +1,77 @@
+"""
+Sellos de versión por recurso para los ETag de los listados.
+
+Cada ámbito ("users", "subjects", "tasks", "enrollments:{user_id}",
+"submissions:{user_id}") tiene un item en la tabla de versiones con un sello
+aleatorio que las rutas de escritura renuevan (bump). El ETag de un listado es
+un hash de los sellos de los ámbitos de los que depende, así que comprobar
+If-None-Match cuesta una sola lectura por lotes en lugar de todas las queries
+del listado. Los sellos no se guardan en la caché de lectura: un 304 nunca
+puede ocultar una escritura hecha desde otra instancia.
+"""
+import hashlib
+import logging
+import uuid
+
+from botocore.exceptions import ClientError
+
+from services.storage import batch_get_map, batch_write_items
+from core.config import DYNAMODB_TABLE_VERSIONS
+
+logger = logging.getLogger(__name__)
+SCOPE_USERS = "users"
+SCOPE_SUBJECTS = "subjects"
+SCOPE_TASKS = "tasks" # Tareas de cualquier materia (tableros de los estudiantes)
+
+def enrollments_scope(user_id: str):
+    return f"enrollments:{user_id}"
+
+def submissions_scope(user_id: str):
+    return f"submissions:{user_id}"
+
+def bump(*scopes):
+    """Renueva el sello de los ámbitos tras una escritura. Un fallo no anula la escritura."""
+    if not scopes:
+        return
+    items = [{'scope': scope, 'version': uuid.uuid4().hex} for scope in set(scopes)]
+    try:
+        failed = batch_write_items(DYNAMODB_TABLE_VERSIONS, items=items)
+    except ClientError as e:
+        logger.warning("Error al actualizar las versiones %s: %s", sorted(set(scopes)), e)
+        return
+    if failed:
+        logger.warning("Versiones sin actualizar: %d", len(failed))
+
+def bumping(func, *scopes):
+    """Envuelve la función de un trabajo (services/jobs.py) para renovar `scopes` al terminar."""
+    def run(job, *args, **kwargs):
+        try:
+            return func(job, *args, **kwargs)
+        finally:
+            bump(*scopes)
+    return run
+
+def current_versions(scopes: list):
+    """{ámbito: sello}; los ámbitos aún sin escrituras tienen el sello "0"."""
+    try:
+        items = batch_get_map(DYNAMODB_TABLE_VERSIONS, 'scope', scopes)
+    except ClientError as e:
+        logger.warning("Error al leer las versiones: %s", e)
+        return None
+    return {scope: items[scope]['version'] if scope in items else "0" for scope in scopes}
+
+def etag_for(versions: dict, *parts):
+    """ETag fuerte a partir de los sellos y de lo que distingue la respuesta (usuario, query string...)."""
+    digest = hashlib.sha256()
+    for scope in sorted(versions):
+        digest.update(f"{scope}={versions[scope]}\n".encode())
+    for part in parts:
+        digest.update(f"{part}\n".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: str, etag: str):
+    """Comparación de If-None-Match (RFC 9110): débil, admite listas y "*"."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
@@ -0,0 +1,33 @@
+"""
+Configuración común: las pruebas usan el backend SQLite y el almacén en disco
+en un directorio temporal, sin AWS.
+"""
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+import pytest
+
+_DATA_DIR = tempfile.mkdtemp(prefix="minimoodle-tests-")
+os.environ.update(
+    MINIMOODLE_STORAGE_BACKEND="sqlite",
+    MINIMOODLE_SQLITE_PATH=os.path.join(_DATA_DIR, "minimoodle.db"),
+    MINIMOODLE_OBJECT_STORE_PATH=os.path.join(_DATA_DIR, "objects"),
+    MINIMOODLE_OBJECT_STORE_BASE_URL="http://testserver",
+    MINIMOODLE_STARTUP_PREWARM="0",
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def auth_headers(user_id: str, rol: str):
+    from services.auth import create_access_token
+    token = create_access_token({"sub": user_id, "rol": rol}, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
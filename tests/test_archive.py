@@ -0,0 +1,26 @@
+from services.archive import task_archive_entries
+
+
+def _submission(user_id, object_names):
+    return {
+        'user_id': user_id, 'subject_id': 's', 'task_id': 't',
+        's3_object_name': object_names[0], 's3_object_names': object_names,
+    }
+
+
+def test_entries_drop_parent_directory_parts():
+    key = "entregas/s/t/u1/../../../../etc/cron.d/x"
+    entries = task_archive_entries([_submission('u1', [key])], {'u1': {'nombre': 'Stu'}})
+    assert entries == [("Stu/etc/cron.d/x", key)]
+
+
+def test_entries_never_leave_student_folder():
+    keys = ["entregas/s/t/u1/..", "entregas/s/t/u1/./a\\..\\b.pdf", "otro/prefijo/../x.pdf"]
+    entries = task_archive_entries([_submission('u1', keys)], {'u1': {'nombre': '..'}})
+    assert [arcname for arcname, _ in entries] == ["_/_", "_/a/b.pdf", "_/x.pdf"]
+
+
+def test_entries_keep_plain_names_and_disambiguate_folders():
+    submissions = [_submission('u1', ["entregas/s/t/u1/a.pdf"]), _submission('u2', ["entregas/s/t/u2/b.pdf"])]
+    students = {'u1': {'nombre': 'Ana'}, 'u2': {'nombre': 'Ana'}}
+    assert [arcname for arcname, _ in task_archive_entries(submissions, students)] == ["Ana (u1)/a.pdf", "Ana (u2)/b.pdf"]
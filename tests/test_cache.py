@@ -0,0 +1,61 @@
+import threading
+
+from core.config import DYNAMODB_TABLE_SUBJECTS
+from services import storage
+from services.cache import TTLCache, MISSING
+
+
+def test_fill_is_discarded_after_a_write():
+    cache = TTLCache(10, 60)
+    generation = cache.generation("k")
+    cache.set("k", "new")
+    assert not cache.set_if_unchanged("k", "old", generation)
+    assert cache.get("k") == "new"
+
+
+def test_fill_is_discarded_after_an_invalidation():
+    cache = TTLCache(10, 60)
+    generation = cache.generation("k")
+    cache.invalidate("k")
+    assert not cache.set_if_unchanged("k", "old", generation)
+    assert cache.get("k") is MISSING
+
+
+def test_fill_without_concurrent_writes_is_stored():
+    cache = TTLCache(10, 60)
+    assert cache.set_if_unchanged("k", "v", cache.generation("k"))
+    assert cache.get("k") == "v"
+
+
+def test_forgotten_generations_never_look_unchanged():
+    cache = TTLCache(2, 60)
+    generation = cache.generation("k")
+    cache.set("k", "new")
+    cache.set("a", 1)
+    cache.set("b", 2) # Olvida la generación de "k"
+    assert not cache.set_if_unchanged("k", "old", generation)
+
+
+def test_get_item_does_not_cache_a_read_older_than_a_concurrent_write(monkeypatch):
+    key = {'subject_id': "subject-race"}
+    storage.put_item(DYNAMODB_TABLE_SUBJECTS, {**key, 'nombre_materia': "antes", 'descripcion': "", 'teacher_id': "t"})
+    storage.invalidate_cached(DYNAMODB_TABLE_SUBJECTS, key)
+
+    backend = storage.get_backend()
+    fetched, release = threading.Event(), threading.Event()
+    get_item = backend.get_item
+    def slow_get_item(table_name, key):
+        item = get_item(table_name, key)
+        fetched.set()
+        release.wait(5) # La escritura ocurre entre la lectura y el relleno de la caché
+        return item
+    monkeypatch.setattr(backend, "get_item", slow_get_item)
+
+    reader = threading.Thread(target=storage.get_item, args=(DYNAMODB_TABLE_SUBJECTS, key))
+    reader.start()
+    fetched.wait(5)
+    monkeypatch.setattr(backend, "get_item", get_item)
+    storage.put_item(DYNAMODB_TABLE_SUBJECTS, {**key, 'nombre_materia': "después", 'descripcion': "", 'teacher_id': "t"})
+    release.set()
+    reader.join()
+    assert storage.get_item(DYNAMODB_TABLE_SUBJECTS, key)['nombre_materia'] == "después"
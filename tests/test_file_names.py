@@ -0,0 +1,50 @@
+from conftest import auth_headers
+
+STUDENT = auth_headers("student-1", "estudiante")
+
+
+def test_batch_upload_rejects_parent_directory(client):
+    response = client.post(
+        "/tasks/task-1/upload-urls",
+        json={"files": [{"file_name": "../x", "content_type": "application/pdf"}]},
+        headers=STUDENT,
+    )
+    assert response.status_code == 422
+
+
+def test_batch_upload_rejects_invalid_names(client):
+    for name in ("", ".", "..", "a/b", "a\\b", "a\nb"):
+        response = client.post(
+            "/tasks/task-1/upload-urls",
+            json={"files": [{"file_name": name, "content_type": "application/pdf"}]},
+            headers=STUDENT,
+        )
+        assert response.status_code == 422, name
+
+
+def test_single_upload_rejects_parent_directory(client):
+    response = client.post("/tasks/%2E%2E/task-1/upload-url", json={"content_type": "application/pdf"}, headers=STUDENT)
+    assert response.status_code == 422
+
+
+def test_multipart_endpoints_reject_parent_directory(client):
+    response = client.post(
+        "/tasks/task-1/multipart-uploads",
+        json={"file_name": "../x", "content_type": "application/pdf", "size": 1024},
+        headers=STUDENT,
+    )
+    assert response.status_code == 422
+    response = client.post(
+        "/tasks/task-1/multipart-uploads/upload-1/part-urls",
+        json={"file_name": "..", "part_numbers": [1]},
+        headers=STUDENT,
+    )
+    assert response.status_code == 422
+    response = client.post(
+        "/tasks/task-1/multipart-uploads/upload-1/complete",
+        json={"file_name": "a/../../b", "parts": [{"part_number": 1, "etag": "x"}]},
+        headers=STUDENT,
+    )
+    assert response.status_code == 422
+    response = client.delete("/tasks/task-1/multipart-uploads/upload-1?file_name=..", headers=STUDENT)
+    assert response.status_code == 422
@@ -0,0 +1,42 @@
+from urllib.parse import urlsplit
+
+from core.config import S3_BUCKET_TASKS
+from services import storage
+
+
+def _path(url):
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}"
+
+
+def test_put_writes_the_whole_object(client):
+    object_name = "entregas/s/t/u/whole.bin"
+    url = storage.create_presigned_url(S3_BUCKET_TASKS, object_name, "application/octet-stream")
+    body = b"0123456789" * 10000
+    response = client.put(_path(url), content=body, headers={"Content-Type": "application/octet-stream"})
+    assert response.status_code == 200
+    size, stream = storage.open_s3_object(S3_BUCKET_TASKS, object_name)
+    with stream:
+        assert size == len(body) and stream.read() == body
+
+
+def test_multipart_parts_are_written_and_completed(client):
+    object_name = "entregas/s/t/u/parts.bin"
+    upload_id = storage.start_multipart_upload(S3_BUCKET_TASKS, object_name, "application/octet-stream")
+    urls = storage.create_presigned_part_urls(S3_BUCKET_TASKS, object_name, upload_id, [1, 2])
+    chunks = [b"a" * (5 * 1024 * 1024), b"b" * 10]
+    etags = []
+    for url, chunk in zip(urls, chunks):
+        response = client.put(_path(url), content=chunk)
+        assert response.status_code == 200
+        etags.append(response.headers["ETag"])
+    assert storage.complete_multipart_upload(S3_BUCKET_TASKS, object_name, upload_id, list(zip([1, 2], etags)))
+    size, stream = storage.open_s3_object(S3_BUCKET_TASKS, object_name)
+    with stream:
+        assert size == sum(map(len, chunks)) and stream.read() == b"".join(chunks)
+
+
+def test_part_for_unknown_upload_is_rejected(client):
+    object_name = "entregas/s/t/u/missing.bin"
+    url = storage.create_presigned_part_urls(S3_BUCKET_TASKS, object_name, "0" * 32, [1])[0]
+    assert client.put(_path(url), content=b"x").status_code == 404
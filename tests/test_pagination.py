@@ -0,0 +1,23 @@
+from conftest import auth_headers
+from services.storage import encode_cursor
+
+ADMIN = auth_headers("admin-1", "administrador")
+
+
+def test_malformed_cursor_is_rejected(client):
+    assert client.get("/users", params={"limit": 2, "cursor": "no-es-un-cursor"}).status_code == 400
+
+
+def test_cursor_with_foreign_key_attributes_is_rejected(client):
+    for cursor in (encode_cursor({'foo': 'x'}), encode_cursor({'user_id': 'x', 'foo': 'y'}), encode_cursor({'user_id': {'a': 1}})):
+        assert client.get("/users", params={"limit": 2, "cursor": cursor}).status_code == 400
+
+
+def test_cursor_from_another_table_is_rejected(client):
+    cursor = encode_cursor({'user_id': 'u1'})
+    response = client.get("/admin/subjects", params={"limit": 2, "cursor": cursor}, headers=ADMIN)
+    assert response.status_code == 400
+
+
+def test_valid_cursor_still_pages(client):
+    assert client.get("/users", params={"limit": 2, "cursor": encode_cursor({'user_id': 'u1'})}).status_code == 200
@@ -0,0 +1,21 @@
+import threading
+
+from services import storage
+from services.backends import dynamodb
+
+
+def test_run_parallel_reuses_one_pool():
+    first = storage._run_parallel(lambda: threading.current_thread().name, lambda: 2)
+    executor = storage._parallel_executor
+    second = storage._run_parallel(lambda: threading.current_thread().name, lambda: threading.current_thread().name)
+    assert storage._parallel_executor is executor
+    assert first[0].startswith("storage-parallel") and first[1] == 2
+    assert second[1] == threading.current_thread().name # La última, en el hilo que llama
+
+
+def test_map_parallel_reuses_one_pool_and_keeps_order():
+    assert dynamodb._map_parallel(lambda chunk: chunk * 2, [1]) == [2]
+    assert dynamodb._map_parallel(lambda chunk: chunk * 2, [1, 2, 3]) == [2, 4, 6]
+    executor = dynamodb._executor
+    assert dynamodb._map_parallel(lambda chunk: threading.current_thread().name, [1, 2])[0].startswith("dynamodb-batch")
+    assert dynamodb._executor is executor
@@ -0,0 +1,16 @@
+import logging
+
+from services import storage
+
+
+def test_prewarm_logs_the_error_and_returns_none(monkeypatch, caplog):
+    def fail():
+        raise RuntimeError("sin credenciales")
+    monkeypatch.setattr(storage, "get_backend", fail)
+    with caplog.at_level(logging.ERROR, logger="services.storage"):
+        assert storage.prewarm() is None
+    assert "precalentar" in caplog.text and "sin credenciales" in caplog.text
+
+
+def test_prewarm_returns_the_elapsed_time():
+    assert storage.prewarm() >= 0
@@ -0,0 +1,21 @@
+import threading
+
+from services import profiling
+
+
+def test_profile_is_stored_off_the_event_loop(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    stored = []
+    store = profiling.store
+    def spy(profile):
+        stored.append((threading.get_ident(), profile.loop_thread))
+        store(profile)
+    monkeypatch.setattr(profiling, "store", spy)
+
+    response = client.get("/", headers={profiling.PROFILE_HEADER: "secret"})
+    assert response.status_code == 200
+    assert len(stored) == 1
+    thread, loop_thread = stored[0]
+    assert thread != loop_thread
+    assert profiling.list_profile_ids() == [response.headers["X-Profile-Id"]]
@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta
+
+from core.config import DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_TASKS
+from models.schemas import TaskInDB
+from services import storage
+from services.projections import get_student_boards, rebuild_board
+
+
+def test_boards_missing_for_older_enrollments_are_rebuilt():
+    now = datetime.utcnow()
+    for subject_id in ("subject-old", "subject-new"):
+        storage.put_item(DYNAMODB_TABLE_ENROLLMENTS, {'user_id': "student-boards", 'subject_id': subject_id})
+        storage.put_item(DYNAMODB_TABLE_TASKS, storage.task_to_item(TaskInDB(
+            task_id=f"task-{subject_id}", subject_id=subject_id, titulo=subject_id,
+            fecha_entrega=now + timedelta(days=1), fecha_caducidad=now + timedelta(days=2),
+        )))
+    # Inscripción posterior a la proyección: solo esta materia tiene tablero
+    rebuild_board("student-boards", "subject-new")
+
+    boards = get_student_boards("student-boards")
+    assert sorted(board['subject_id'] for board in boards) == ["subject-new", "subject-old"]
+    assert "task-subject-old" in next(b for b in boards if b['subject_id'] == "subject-old")['tasks']
+    # Ya escritos: la siguiente lectura no reconstruye nada
+    assert sorted(board['subject_id'] for board in get_student_boards("student-boards")) == ["subject-new", "subject-old"]
@@ -0,0 +1,27 @@
+from core.config import DYNAMODB_TABLE_ENROLLMENTS, DYNAMODB_TABLE_USERS
+from services import storage
+from services.backends import sqlite
+
+
+def test_batch_get_reads_each_chunk_with_one_select(monkeypatch):
+    backend = storage.get_backend()
+    for n in range(5):
+        backend.put_item(DYNAMODB_TABLE_ENROLLMENTS, {'subject_id': f"subject-batch-{n % 2}", 'user_id': f"student-batch-{n}"})
+    monkeypatch.setattr(sqlite, "_BATCH_GET_CHUNK", 2)
+    monkeypatch.setattr(backend, "get_item", None) # Ya no se lee clave a clave
+    statements = []
+    backend._connection().set_trace_callback(statements.append)
+    try:
+        keys = [{'subject_id': f"subject-batch-{n % 2}", 'user_id': f"student-batch-{n}"} for n in range(5)]
+        keys.append({'subject_id': "subject-batch-0", 'user_id': "student-batch-1"}) # No existe
+        items = backend.batch_get(DYNAMODB_TABLE_ENROLLMENTS, keys)
+    finally:
+        backend._connection().set_trace_callback(None)
+    assert sorted(item['user_id'] for item in items) == [f"student-batch-{n}" for n in range(5)]
+    assert len([sql for sql in statements if sql.startswith("SELECT")]) == 3
+
+
+def test_batch_get_with_a_single_key_attribute():
+    backend = storage.get_backend()
+    backend.put_item(DYNAMODB_TABLE_USERS, {'user_id': "user-batch", 'nombre': "Ana", 'rol': "estudiante"})
+    assert [item['user_id'] for item in backend.batch_get(DYNAMODB_TABLE_USERS, [{'user_id': "user-batch"}, {'user_id': "nadie"}])] == ["user-batch"]
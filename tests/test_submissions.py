@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from models.schemas import SubmissionInDB
+from services import storage
+
+
+def _submission(object_names, **fields):
+    return SubmissionInDB(
+        submission_id=storage.submission_id_for("student-merge", "task-merge"),
+        task_id="task-merge", user_id="student-merge", subject_id="subject-merge",
+        s3_object_name=object_names[0], s3_object_names=object_names, **fields,
+    )
+
+
+def test_uploads_to_the_same_task_accumulate_objects():
+    storage.create_submission_db(_submission(["entregas/a.pdf"]))
+    storage.create_submission_db(_submission(["entregas/b.pdf", "entregas/c.pdf"]))
+    item = storage.create_submission_db(_submission(["entregas/d.bin"]))
+    assert item['s3_object_name'] == "entregas/a.pdf"
+    assert storage.submission_object_names(item) == [
+        "entregas/a.pdf", "entregas/b.pdf", "entregas/c.pdf", "entregas/d.bin"
+    ]
+
+
+def test_retry_with_known_objects_does_not_duplicate_them():
+    first = storage.create_submission_db(_submission(["entregas/r1.pdf"]))
+    again = storage.create_submission_db(_submission(["entregas/r1.pdf"]))
+    assert storage.submission_object_names(again) == storage.submission_object_names(first)
+    partial = storage.create_submission_db(_submission(["entregas/r1.pdf", "entregas/r2.pdf"]))
+    assert storage.submission_object_names(partial).count("entregas/r1.pdf") == 1
+    assert storage.submission_object_names(partial)[-1] == "entregas/r2.pdf"
+
+
+def test_reupload_of_a_known_object_updates_the_submission_date():
+    first = storage.create_submission_db(_submission(["entregas/late.pdf"], fecha_entrega=datetime(2030, 1, 1)))
+    again = storage.create_submission_db(_submission(["entregas/late.pdf"], fecha_entrega=datetime(2030, 1, 3)))
+    assert storage.submission_object_names(again) == storage.submission_object_names(first)
+    assert again['fecha_entrega'] == datetime(2030, 1, 3).isoformat()
+
+
+def test_legacy_single_file_records_keep_their_object():
+    assert storage.submission_object_names({'s3_object_name': "x", 's3_object_names': []}) == ["x"]
+    assert storage.submission_object_names({'s3_object_name': "x", 's3_object_names': ["y"]}) == ["x", "y"]
+
+
+def test_submission_and_enrollment_queries_are_not_coalesced():
+    # Se leen justo después de escribir: unirse a una query en curso perdería la escritura
+    for name in ("get_submission", "get_submissions_for_task", "get_task_roster", "get_student_subjects"):
+        assert not hasattr(getattr(storage, name), "flight")
+    assert hasattr(storage.get_tasks_for_subject, "flight")
+
+
+def test_deleting_a_submission_removes_its_objects_in_one_batch(client, monkeypatch):
+    from datetime import datetime, timedelta
+    from conftest import auth_headers
+    from core.config import DYNAMODB_TABLE_TASKS, DYNAMODB_TABLE_SUBMISSIONS, S3_BUCKET_TASKS
+    from models.schemas import TaskInDB
+
+    now = datetime.utcnow()
+    storage.put_item(DYNAMODB_TABLE_TASKS, storage.task_to_item(TaskInDB(
+        task_id="task-delete", subject_id="subject-delete", titulo="Borrar",
+        fecha_entrega=now + timedelta(days=1), fecha_caducidad=now + timedelta(days=2),
+    )))
+    object_names = [f"entregas/subject-delete/task-delete/student-delete/{name}" for name in ("a.pdf", "b.pdf")]
+    object_store = storage.get_object_store()
+    for object_name in object_names:
+        with object_store.open_for_write(S3_BUCKET_TASKS, object_name) as f:
+            f.write(b"x")
+    submission_id = storage.submission_id_for("student-delete", "task-delete")
+    storage.create_submission_db(SubmissionInDB(
+        submission_id=submission_id, task_id="task-delete", user_id="student-delete", subject_id="subject-delete",
+        s3_object_name=object_names[0], s3_object_names=object_names,
+    ))
+
+    batches = []
+    delete_objects = storage.delete_s3_objects
+    monkeypatch.setattr(storage, "delete_s3_objects", lambda bucket, names: batches.append(list(names)) or delete_objects(bucket, names))
+    response = client.delete(f"/student/submissions/{submission_id}", headers=auth_headers("student-delete", "estudiante"))
+    assert response.status_code == 204
+    assert batches == [object_names]
+    assert all(object_store.open_object(S3_BUCKET_TASKS, name) is None for name in object_names)
+    assert storage.get_item(DYNAMODB_TABLE_SUBMISSIONS, {'submission_id': submission_id}) is None
@@ -0,0 +1,56 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from core.config import DYNAMODB_TABLE_TASKS
+from models.schemas import TaskInDB
+from services import storage
+
+NOW = datetime(2030, 5, 6, 10, 30, 15)
+
+
+def _put_task(task_id, fecha_entrega, fecha_caducidad):
+    storage.put_item(DYNAMODB_TABLE_TASKS, storage.task_to_item(TaskInDB(
+        task_id=task_id, subject_id="subject-window", titulo=task_id,
+        fecha_entrega=fecha_entrega, fecha_caducidad=fecha_caducidad,
+    )))
+
+
+def test_concurrent_window_reads_share_one_query(monkeypatch):
+    calls = []
+    joined = threading.Event()
+    iter_query = storage.iter_query
+    def slow_iter_query(*args, **kwargs):
+        calls.append(args)
+        joined.wait(5) # Espera a que la segunda lectura se una a esta
+        return iter_query(*args, **kwargs)
+    monkeypatch.setattr(storage, "iter_query", slow_iter_query)
+
+    flight = storage._tasks_due_between.flight
+    coalesced = flight.coalesced
+    results = []
+    def read(now):
+        results.append(storage.get_tasks_due_between("subject-window", now, now + timedelta(days=7)))
+    threads = [threading.Thread(target=read, args=(NOW + timedelta(microseconds=n),)) for n in (1, 2)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.001)
+    threads[1].start()
+    while flight.coalesced == coalesced:
+        time.sleep(0.001)
+    joined.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results[0] == results[1]
+
+
+def test_window_results_are_trimmed_to_the_exact_range():
+    _put_task("due-before", NOW - timedelta(seconds=5), NOW + timedelta(days=1))
+    _put_task("due-inside", NOW + timedelta(hours=1), NOW + timedelta(days=1))
+    _put_task("due-after", NOW + timedelta(days=7, seconds=20), NOW + timedelta(days=8))
+    due = storage.get_tasks_due_between("subject-window", NOW, NOW + timedelta(days=7))
+    assert [task['task_id'] for task in due] == ["due-inside"]
+
+    overdue = storage.get_overdue_tasks_closing_between("subject-window", NOW, NOW + timedelta(days=7))
+    assert sorted(task['task_id'] for task in overdue) == ["due-before"]
@@ -0,0 +1,10 @@
+import logging
+
+from services import versions
+
+
+def test_failed_bump_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(versions, "batch_write_items", lambda table_name, items: items)
+    with caplog.at_level(logging.WARNING, logger="services.versions"):
+        versions.bump(versions.SCOPE_TASKS)
+    assert "Versiones sin actualizar: 1" in caplog.text